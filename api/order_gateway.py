@@ -0,0 +1,305 @@
+""" asyncio order gateway in front of a matching engine
+
+clients connect over a local TCP or Unix socket and exchange JSON objects,
+one per line. every client gets its own reader task, all messages go through
+a single queue to one engine task, so the matching engine is only touched by
+one coroutine and needs no locking. many thousands of clients are served by
+one thread.
+
+client messages have an action:
+
+    {"action": "order", "type": "limit", "side": "bid", "quantity": 5,
+     "price": 99, "dealer_or_broker_id": "AA"}
+    {"action": "cancel", "order_id": 12}
+    {"action": "amend", "order_id": 12, "quantity": 3, "price": 98}
+    {"action": "subscribe", "stream": "trades"}
+    {"action": "subscribe", "stream": "market_data"}
+
+an optional request_id is echoed in the reply. an accepted order is
+acknowledged with its order id and remaining quantity, every trade is sent as
+a fill to the clients owning the aggressor and the resting order. errors are
+replied as a reject. subscribers of the trades stream get every trade,
+subscribers of the market data stream get a snapshot of the book followed by
+the level updates of the market data feed. with cancel_on_disconnect the
+resting orders of a client are cancelled when its connection closes.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict
+
+from market.order import Order
+from market.order_factory import create_order
+from orderbook.market_data_feed import LevelUpdate
+from orderbook.matching_engine import MatchingEngine
+
+STREAMS = ('trades', 'market_data')
+
+
+class GatewaySession:
+    """ connection of one client
+    """
+    def __init__(self, writer: asyncio.StreamWriter):
+        """ initialize
+        """
+        self.writer = writer
+        self.orders = set()     # ids of orders of this client in the book
+
+    def send(self, message: Dict):
+        """ queue message for the client, lost when the client is gone
+        """
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message).encode() + b'\n')
+
+
+class OrderGateway:
+    """ serves a matching engine to clients over a socket
+    """
+    def __init__(self,
+                 engine: MatchingEngine = None,
+                 cancel_on_disconnect: bool = True):
+        """ initialize, a new engine is created when none is given
+        """
+        self.engine = engine if engine is not None else MatchingEngine()
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.sessions = set()
+        self.owners = {}    # order id -> session
+        self.subscribers = {stream: set() for stream in STREAMS}
+        self.server = None
+        self._queue = None
+        self._engine_task = None
+        self._market_data = False
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0,
+                    path: str = None):
+        """ listen on host and port, or on the Unix socket path when given,
+        port 0 picks a free port
+        """
+        self._queue = asyncio.Queue()
+        self._engine_task = asyncio.ensure_future(self._run_engine())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._serve_client,
+                                                          path=path)
+        else:
+            self.server = await asyncio.start_server(self._serve_client,
+                                                     host=host, port=port)
+
+        return self.server
+
+    @property
+    def address(self):
+        """ address the gateway listens on
+        """
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """ stop accepting clients, close all connections and stop the
+        engine task
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        for session in list(self.sessions):
+            session.writer.close()
+
+        await self._queue.put(None)
+        await self._engine_task
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _serve_client(self,
+                            reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+        """ read messages of one client and queue them for the engine
+        """
+        session = GatewaySession(writer)
+        await self._queue.put((session, {'action': 'connect'}))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    message = json.loads(line)
+                except ValueError as exc:
+                    session.send({'type': 'reject', 'error': str(exc)})
+                    continue
+
+                await self._queue.put((session, message))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            await self._queue.put((session, {'action': 'disconnect'}))
+
+    async def _run_engine(self):
+        """ single writer, handles queued messages in arrival order until it
+        gets None
+        """
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            session, message = item
+            try:
+                self.handle(session, message)
+            except Exception as exc:  # pylint: disable=broad-except
+                # client input must never stop the engine task
+                logging.debug('rejected %s: %r', message, exc)
+                reply = {'type': 'reject', 'error': repr(exc)}
+                if isinstance(message, dict) and 'request_id' in message:
+                    reply['request_id'] = message['request_id']
+                session.send(reply)
+
+    def handle(self, session: GatewaySession, message: Dict):
+        """ apply a client message to the engine and send the replies
+        """
+        action = message['action']
+
+        if action == 'order':
+            quote = dict(message)
+            del quote['action']
+            quote.pop('request_id', None)
+            order = create_order(quote)
+            order_id = order.order_id
+            # owned before matching so fills of the order reach the client
+            self.owners[order_id] = session
+            session.orders.add(order_id)
+            try:
+                trades, order = self.engine.submit_order(order, quote)
+                self._acknowledge(session, message, order_id, order)
+                self._publish_trades(trades)
+            finally:
+                self._settle(order_id)
+        elif action == 'cancel':
+            order_id = self._own_order(session, message)
+            self.engine.cancel_order(order_id)
+            self._release(order_id)
+            self._acknowledge(session, message, order_id, None)
+        elif action == 'amend':
+            order_id = self._own_order(session, message)
+            trades, order = self.engine.amend_order(
+                order_id, quantity=message.get('quantity'),
+                price=message.get('price'))
+            self._acknowledge(session, message, order_id, order)
+            self._publish_trades(trades)
+            self._settle(order_id)
+        elif action == 'subscribe':
+            self._subscribe(session, message['stream'])
+        elif action == 'connect':
+            self.sessions.add(session)
+        elif action == 'disconnect':
+            self._disconnect(session)
+        else:
+            raise KeyError(action)
+
+    def _own_order(self, session: GatewaySession, message: Dict) -> int:
+        """ order id of message, clients can only touch their own orders
+        """
+        order_id = message['order_id']
+        if self.owners.get(order_id) is not session:
+            raise KeyError(order_id)
+
+        return order_id
+
+    def _acknowledge(self,
+                     session: GatewaySession,
+                     message: Dict,
+                     order_id: int,
+                     order: Order):
+        """ reply to the client, order is the order in the book if any
+        """
+        reply = {'type': 'ack',
+                 'order_id': order_id,
+                 'quantity': 0 if order is None else order.quantity}
+        if 'request_id' in message:
+            reply['request_id'] = message['request_id']
+        session.send(reply)
+
+    def _publish_trades(self, trades):
+        """ send fills to the owners of both orders of every trade and the
+        trades to the subscribers of the trade stream
+        """
+        filled = set()
+        for trade in trades:
+            for order_id in (trade.aggressor_id, trade.resting_id):
+                session = self.owners.get(order_id)
+                if session is not None:
+                    session.send({'type': 'fill',
+                                  'order_id': order_id,
+                                  'price': trade.price,
+                                  'quantity': trade.quantity})
+                    filled.add(order_id)
+
+            message = {'type': 'trade',
+                       'price': trade.price,
+                       'quantity': trade.quantity}
+            for session in self.subscribers['trades']:
+                session.send(message)
+
+        for order_id in filled:
+            self._settle(order_id)
+
+    def _subscribe(self, session: GatewaySession, stream: str):
+        """ add session to the subscribers of stream
+        """
+        self.subscribers[stream].add(session)
+        if stream == 'market_data':
+            if not self._market_data:
+                self.engine.market_data_feed.subscribe(self._publish_level)
+                self._market_data = True
+
+            snapshot = self.engine.market_data_feed.snapshot()
+            session.send({'type': 'snapshot',
+                          'sequence': snapshot.sequence,
+                          'bids': snapshot.bids,
+                          'asks': snapshot.asks})
+
+    def _publish_level(self, update: LevelUpdate):
+        """ send a level update to the subscribers of the market data stream
+        """
+        message = {'type': 'level',
+                   'sequence': update.sequence,
+                   'side': str(update.side),
+                   'price': update.price,
+                   'volume': update.volume}
+        for session in self.subscribers['market_data']:
+            session.send(message)
+
+    def _disconnect(self, session: GatewaySession):
+        """ forget session, cancelling its orders if configured
+        """
+        self.sessions.discard(session)
+        for subscribers in self.subscribers.values():
+            subscribers.discard(session)
+        for order_id in list(session.orders):
+            if self.cancel_on_disconnect and self._resting(order_id):
+                self.engine.cancel_order(order_id)
+            self._release(order_id)
+
+        if not session.writer.is_closing():
+            session.writer.close()
+
+    def _resting(self, order_id: int) -> bool:
+        """ is order_id in the book or waiting as stop
+        """
+        return order_id in self.engine.orders or \
+            order_id in self.engine.stops
+
+    def _settle(self, order_id: int):
+        """ release order_id when it is no longer in the book
+        """
+        if not self._resting(order_id):
+            self._release(order_id)
+
+    def _release(self, order_id: int):
+        """ order_id is no longer in the book
+        """
+        session = self.owners.pop(order_id, None)
+        if session is not None:
+            session.orders.discard(order_id)
@@ -0,0 +1,291 @@
+"""
+throughput and latency benchmark of MatchingEngine.match_order
+
+order flow is generated synthetically and reproducibly from a seed, the
+scenarios are
+    poisson         orders arrive with exponential inter arrival times
+                    around a random walking mid price
+    deep_book       many levels with many orders, incoming orders rest
+                    mostly behind the top
+    cancel_heavy    most messages cancel a resting order
+    market_sweep    market orders sweep through a deep book
+
+every message is timed separately. a scenario reports orders per second,
+the 50th and 99th percentile latency in microseconds and the memory per
+resting order. results are written as json, two result files can be
+compared with --compare.
+
+    python -m benchmarks.matching_engine_benchmark --orders 100000 \\
+        --output after.json --compare before.json
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from market.quote import Quote
+from orderbook.matching_engine import MatchingEngine
+
+BROKERS = ['AA', 'BB', 'CC', 'DD', 'EE', 'FF', 'GG', 'HH']
+TICK = 0.01
+SESSION_START = datetime(2020, 1, 2, 9, 30)
+
+# a message is ('order', quote) or ('cancel', position of the order among
+# the earlier order messages)
+Message = Tuple[str, object]
+
+
+def _limit_quote(rnd: random.Random, side: str, price: float,
+                 quantity: int, timestamp: datetime = None) -> Dict:
+    """ quote dict for a limit order
+    """
+    quote = asdict(Quote(type='limit',
+                         dealer_or_broker_id=rnd.choice(BROKERS),
+                         side=side,
+                         quantity=quantity,
+                         price=round(price, 2)))
+    if timestamp is not None:
+        quote['timestamp'] = timestamp
+    return quote
+
+
+def poisson_order_flow(orders: int, seed: int = 1, rate: float = 1000.0,
+                       mid: float = 100.0, spread_ticks: int = 20) \
+        -> Iterator[Message]:
+    """ limit orders arriving as a poisson process around a random walk,
+    timestamped from the start of a session
+    """
+    rnd = random.Random(seed)
+    seconds = 0.0
+    for _ in range(orders):
+        seconds += rnd.expovariate(rate)
+        timestamp = SESSION_START + timedelta(seconds=seconds)
+        mid += rnd.choice((-TICK, 0.0, TICK))
+        side = rnd.choice(('bid', 'ask'))
+        offset = rnd.randint(-spread_ticks // 4, spread_ticks) * TICK
+        price = mid - offset if side == 'bid' else mid + offset
+        yield 'order', _limit_quote(rnd, side, price, rnd.randint(1, 10) * 100,
+                                    timestamp)
+
+
+def deep_book(levels: int, orders_per_level: int, seed: int = 1,
+              mid: float = 100.0) -> Iterator[Message]:
+    """ non crossing orders building a book of levels deep on each side
+    """
+    rnd = random.Random(seed)
+    for _ in range(orders_per_level):
+        for level in range(1, levels + 1):
+            for side, sign in (('bid', -1), ('ask', 1)):
+                yield 'order', _limit_quote(rnd, side,
+                                            mid + sign * level * TICK,
+                                            rnd.randint(1, 10) * 100)
+
+
+def deep_book_flow(orders: int, seed: int = 1, levels: int = 500) \
+        -> Iterator[Message]:
+    """ orders resting at random depth in a deep book
+    """
+    rnd = random.Random(seed)
+    for _ in range(orders):
+        side, sign = rnd.choice((('bid', -1), ('ask', 1)))
+        level = int(rnd.expovariate(1.0 / 20)) % levels + 1
+        yield 'order', _limit_quote(rnd, side, 100.0 + sign * level * TICK,
+                                    rnd.randint(1, 10) * 100)
+
+
+def cancel_heavy_flow(orders: int, seed: int = 1,
+                      cancel_ratio: float = 0.8, min_resting: int = 1000) \
+        -> Iterator[Message]:
+    """ new non crossing orders mixed with cancels of random resting ones,
+    cancels start when min_resting orders are in the book
+    """
+    rnd = random.Random(seed)
+    placed = 0
+    live = []
+    for _ in range(orders):
+        if len(live) > min_resting and rnd.random() < cancel_ratio:
+            index = rnd.randrange(len(live))
+            live[index], live[-1] = live[-1], live[index]
+            yield 'cancel', live.pop()
+        else:
+            side, sign = rnd.choice((('bid', -1), ('ask', 1)))
+            level = rnd.randint(1, 50)
+            yield 'order', _limit_quote(rnd, side,
+                                        100.0 + sign * level * TICK,
+                                        rnd.randint(1, 10) * 100)
+            live.append(placed)
+            placed += 1
+
+
+def market_sweep_flow(orders: int, seed: int = 1, size: int = 5000) \
+        -> Iterator[Message]:
+    """ market orders, each sweeping several levels
+    """
+    rnd = random.Random(seed)
+    for _ in range(orders):
+        yield 'order', asdict(Quote(type='market',
+                                    dealer_or_broker_id=rnd.choice(BROKERS),
+                                    side=rnd.choice(('bid', 'ask')),
+                                    quantity=size))
+
+
+def _percentile(sorted_values: List[int], percentile: float) -> float:
+    """ nearest rank percentile of sorted values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percentile / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(rank, 0)]
+
+
+def run_messages(engine: MatchingEngine, messages: List[Message]) \
+        -> List[int]:
+    """ feed messages to engine, returns the latency of each in nanoseconds
+    """
+    order_ids = []
+    latencies = []
+    clock = time.perf_counter_ns
+    for kind, payload in messages:
+        if kind == 'order':
+            start = clock()
+            _, order = engine.match_order(payload)
+            latencies.append(clock() - start)
+            order_ids.append(None if order is None else order.order_id)
+        else:
+            order_id = order_ids[payload]
+            if order_id is None or order_id not in engine.orders:
+                continue
+            start = clock()
+            engine.cancel_order(order_id)
+            latencies.append(clock() - start)
+
+    return latencies
+
+
+def memory_per_order(messages: List[Message]) -> float:
+    """ bytes allocated per resting order when building a book
+    """
+    gc.collect()
+    tracemalloc.start()
+    engine = MatchingEngine()
+    before = tracemalloc.get_traced_memory()[0]
+    run_messages(engine, messages)
+    # the tape holds trades, not resting orders
+    engine.tape.clear()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    resting = len(engine.orders)
+
+    return (after - before) / resting if resting else 0.0
+
+
+def scenarios(orders: int, seed: int) -> Dict[str, Tuple[List[Message],
+                                                         List[Message]]]:
+    """ name -> (messages to set up the book, timed messages)
+    """
+    levels = 100
+    per_level = max(1, orders // (4 * levels))
+    book = list(deep_book(levels, per_level, seed))
+    return {'poisson': ([], list(poisson_order_flow(orders, seed))),
+            'deep_book': (book, list(deep_book_flow(orders, seed))),
+            'cancel_heavy': ([], list(cancel_heavy_flow(orders, seed))),
+            'market_sweep': (book + list(deep_book(levels, per_level * 10,
+                                                   seed + 1)),
+                             list(market_sweep_flow(max(1, orders // 100),
+                                                    seed)))}
+
+
+def run_benchmark(orders: int = 10000, seed: int = 1,
+                  names: List[str] = None) -> Dict:
+    """ run the scenarios, returns the results as a json serializable dict
+    """
+    results = {'orders': orders,
+               'seed': seed,
+               'python': platform.python_version(),
+               'scenarios': {}}
+
+    for name, (setup, messages) in scenarios(orders, seed).items():
+        if names and name not in names:
+            continue
+
+        engine = MatchingEngine()
+        run_messages(engine, setup)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            latencies = run_messages(engine, messages)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+
+        latencies.sort()
+        results['scenarios'][name] = {
+            'messages': len(latencies),
+            'seconds': elapsed,
+            'orders_per_second': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_latency_us': _percentile(latencies, 50) / 1000.0,
+            'p99_latency_us': _percentile(latencies, 99) / 1000.0,
+            'resting_orders': len(engine.orders),
+            'bytes_per_resting_order': memory_per_order(setup + messages)}
+
+    return results
+
+
+def compare(baseline: Dict, current: Dict) -> Dict[str, Dict[str, float]]:
+    """ ratio current / baseline of throughput and latencies per scenario
+    """
+    ratios = {}
+    for name, result in current['scenarios'].items():
+        if name not in baseline['scenarios']:
+            continue
+        base = baseline['scenarios'][name]
+        ratios[name] = {key: result[key] / base[key]
+                        for key in ('orders_per_second', 'p50_latency_us',
+                                    'p99_latency_us',
+                                    'bytes_per_resting_order')
+                        if base[key]}
+    return ratios
+
+
+def main():
+    """ command line entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scenario', action='append', dest='names')
+    parser.add_argument('--output', help='json file for the results')
+    parser.add_argument('--compare', help='json file of an earlier run')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.orders, args.seed, args.names)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    for name, result in results['scenarios'].items():
+        print('%-14s %12.0f orders/s  p50 %8.2f us  p99 %8.2f us  '
+              '%8.1f bytes/order' % (name, result['orders_per_second'],
+                                     result['p50_latency_us'],
+                                     result['p99_latency_us'],
+                                     result['bytes_per_resting_order']))
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            ratios = compare(json.load(baseline), results)
+        for name, ratio in ratios.items():
+            changes = ', '.join('%s x%.2f' % item for item in ratio.items())
+            print('%-14s %s' % (name, changes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+iceberg order, a limit order that shows only part of its quantity in the book
+"""
+from market.limit_order import LimitOrder
+
+
+class IcebergOrder(LimitOrder):
+    """iceberg order, quantity is the visible part, hidden_quantity the
+    reserve"""
+    __slots__ = ('display_quantity', 'hidden_quantity')
+
+    def __init__(self, quote):
+        assert 'display_quantity' in quote
+        super().__init__(quote)
+        self.display_quantity = int(quote['display_quantity'])
+        assert self.display_quantity > 0
+        self.hidden_quantity = 0
+
+    def hide(self):
+        """show at most display quantity, the rest goes to the reserve"""
+        total = self.quantity + self.hidden_quantity
+        self.quantity = min(self.display_quantity, total)
+        self.hidden_quantity = total - self.quantity
+
+    def replenish(self):
+        """show the next part of the reserve"""
+        self.hide()
+
+    def __getitem__(self, item):
+        """for quering properties in dict style"""
+        if item == 'type':
+            return 'iceberg'
+
+        if item == 'display_quantity':
+            return self.display_quantity
+
+        if item == 'hidden_quantity':
+            return self.hidden_quantity
+
+        return super().__getitem__(item)
@@ -6,21 +6,13 @@ from market.order import Order
 
 class LimitOrder(Order):
     """Limit order"""
+    __slots__ = ()
+
     def __init__(self, quote):
-        self._limit = None
         assert 'price' in quote
-        self.limit = quote['price']
         super().__init__(quote)
-
-    @property
-    def limit(self):
-        """limit"""
-        return self._limit
-
-    @limit.setter
-    def limit(self, price: float):
-        """limit"""
-        self._limit = float(price)
+        self.limit = float(quote['price'])
+        self.ticks = self.limit
 
     def __getitem__(self, item: str):
         """for quering properties in dict style"""
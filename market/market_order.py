@@ -7,6 +7,17 @@ from market.side import Side
 
 class MarketOrder(Order):
     """market order, execute always"""
+    __slots__ = ()
+
+    def __init__(self, quote):
+        super().__init__(quote)
+        # to ensure it lands in front of the list
+        if self.side == Side.ASK:
+            self.limit = 0
+        else:
+            self.limit = float('inf')
+        self.ticks = self.limit
+
     def __getitem__(self, item):
         """for quering properties in dict style"""
         if item == 'type':
@@ -20,13 +31,3 @@ class MarketOrder(Order):
         """for debugging and printing"""
         return "{}/{} - {}".format(self.quantity, self.dealer_or_broker_id,
                                    self.order_id)
-
-    @property
-    def limit(self):
-        """to ensure it lands in front of the list"""
-        if self._side == Side.ASK:
-            retval = 0
-        else:
-            retval = float('inf')
-
-        return retval
@@ -1,115 +1,94 @@
 """ order base class
+
+orders use slots and plain attributes, a book holds many of them and the
+matching engine reads and updates them on every fill. the side is stored as
+the integer enum Side. ticks is the price used to compare orders and to
+group them in price levels, by default the limit itself, an order book with a
+tick size replaces it by the limit in integer ticks. when no timestamp is
+given the creation time is kept as a float and only turned into a datetime
+when asked for. stop_price is None unless the order waits for a stop to be
+triggered.
 """
 import itertools
-import logging
+import time
 from datetime import datetime
 from typing import Dict
 
 from market.side import Side
+from market.time_in_force import TimeInForce
 
 
 class Order:
     """
     Orders represent the core piece of the exchange. Every bid/ask is an Order.
     """
+    __slots__ = ('order_id', 'dealer_or_broker_id', 'side', 'quantity',
+                 'limit', 'ticks', 'symbol', 'time_in_force', 'stop_price',
+                 '_timestamp', '_created')
+
     newid = itertools.count(1)
 
     def __init__(self, quote: Dict):
         """ check if quote has required properties and assign them
         """
         if 'trade_id' in quote:
-            self._dealer_or_broker_id = quote['trade_id']
+            self.dealer_or_broker_id = quote['trade_id']
         else:
-            self._dealer_or_broker_id = quote['dealer_or_broker_id']
+            self.dealer_or_broker_id = quote['dealer_or_broker_id']
 
-        self._side = Side[quote['side'].upper()]
-        self._quantity = int(quote['quantity'])
-        assert self._quantity >= 0
+        self.side = Side[quote['side'].upper()]
+        self.quantity = int(quote['quantity'])
+        assert self.quantity >= 0
         self.order_id = next(Order.newid)
-
-        logging.debug("*** Order: broker %s, side %s, qty %s, id %s, limit %s",
-                      self.dealer_or_broker_id, self.side, self.quantity,
-                      self.order_id, self.limit)
-
-        if "symbol" in quote:
-            self._symbol = quote["symbol"]
-        else:
-            self._symbol = None
-
-        if "timestamp" in quote:
-            self._timestamp = quote["timestamp"]
-        else:
-            self._timestamp = datetime.utcnow()
+        self.symbol = quote.get('symbol')
+        self.time_in_force = TimeInForce[quote.get('time_in_force',
+                                                   'gtc').upper()]
+        self.stop_price = None
+        self._timestamp = quote.get('timestamp')
+        self._created = time.time()
+
+    @staticmethod
+    def skip_ids(last_id: int):
+        """make sure new orders get an id after last_id"""
+        Order.newid = itertools.count(max(next(Order.newid), last_id + 1))
 
     @property
-    def timestamp(self):
+    def timestamp(self) -> datetime:
+        """time of the order, creation time if not given in the quote"""
+        if self._timestamp is None:
+            self._timestamp = datetime.utcfromtimestamp(self._created)
+
         return self._timestamp
 
     @timestamp.setter
     def timestamp(self, value: datetime):
         self._timestamp = value
 
-    @property
-    def symbol(self):
-        return self._symbol
-
-    @symbol.setter
-    def symbol(self, value: str):
-        self._symbol = value
-
     def __getitem__(self, item):
         """for quering properties in dict style"""
-        items = {'order_id': self.order_id,
-                 'quantity': self.quantity,
-                 'side': str(self.side),
-                 'dealer_or_broker': self.dealer_or_broker_id,
-                 'trade_id': self.dealer_or_broker_id}
-
-        return items[item]
-
-    @property
-    def dealer_or_broker_id(self):
-        """dealer broker"""
-        return self._dealer_or_broker_id
-
-    @dealer_or_broker_id.setter
-    def dealer_or_broker_id(self, cpty: str):
-        """dealer broker"""
-        self._dealer_or_broker_id = cpty
+        if item == 'order_id':
+            return self.order_id
 
-    @property
-    def quantity(self):
-        """quantity"""
-        return self._quantity
+        if item == 'quantity':
+            return self.quantity
 
-    @quantity.setter
-    def quantity(self, qty: int):
-        """quantity"""
-        qty = int(qty)
-        assert qty >= 0
-        self._quantity = qty
+        if item == 'side':
+            return str(self.side)
 
-    @property
-    def side(self):
-        """bid or ask"""
-        return self._side
+        if item in ('dealer_or_broker', 'trade_id'):
+            return self.dealer_or_broker_id
 
-    @side.setter
-    def side(self, ask_bid: str):
-        """bid or ask"""
-        self._side = Side[ask_bid.upper()]
+        if item == 'time_in_force':
+            return str(self.time_in_force)
 
-    @property
-    def limit(self):
-        """to be implemented by derived class"""
-        raise NotImplementedError
+        raise KeyError(item)
 
     def matches(self, potential_match):
         """calculate if incoming order matches this one"""
-        if self._side == Side.BID:
-            retval = self.limit > potential_match.limit
+        if self.side == Side.BID:
+            retval = self.ticks > potential_match.ticks
         else:
-            retval = self.limit < potential_match.limit
+            retval = self.ticks < potential_match.ticks
 
         return retval
 
@@ -129,18 +108,12 @@ class Order:
             | C      | Sell/ask | 100 | 10.7  |
             | D      | Sell/ask | 200 | 10.8  |
         """
-        if self._side == Side.BID:
-            if self.limit == other.limit:
-                retval = self.order_id < other.order_id
-            else:
-                retval = self.limit > other.limit
+        if self.ticks == other.ticks:
+            retval = self.order_id < other.order_id
+        elif self.side == Side.BID:
+            retval = self.ticks > other.ticks
         else:
-            if self.limit == other.limit:
-                retval = self.order_id < other.order_id
-            else:
-                retval = self.limit < other.limit
-
-        logging.debug('%s __lt__ %s: %s', self, other, retval)
+            retval = self.ticks < other.ticks
 
         return retval
 
@@ -150,9 +123,7 @@ class Order:
 
     def __gt__(self, other):
         """not __lt__"""
-        retval = not self.__lt__(other)
-        logging.debug('%s __gt__ %s: %s', self, other, retval)
-        return retval
+        return not self.__lt__(other)
 
     def __ge__(self, other):
         """greater or equal"""
@@ -3,19 +3,24 @@ order factory method
 """
 from typing import Dict
 
+from market.iceberg_order import IcebergOrder
 from market.limit_order import LimitOrder
 from market.market_order import MarketOrder
+from market.stop_limit_order import StopLimitOrder
+from market.stop_order import StopOrder
+
+ORDER_TYPES = {'limit': LimitOrder,
+               'market': MarketOrder,
+               'stop': StopOrder,
+               'stop_limit': StopLimitOrder,
+               'iceberg': IcebergOrder}
 
 
 def create_order(quote: Dict):
     """factory method to create order object from input dictionary"""
     assert 'type' in quote
 
-    if quote['type'] == 'limit':
-        retval = LimitOrder(quote)
-    elif quote['type'] == 'market':
-        retval = MarketOrder(quote)
-    else:
+    if quote['type'] not in ORDER_TYPES:
         raise KeyError('Unknown order type %s' % quote['type'])
 
-    return retval
+    return ORDER_TYPES[quote['type']](quote)
@@ -0,0 +1,25 @@
+"""
+stop limit order, becomes a limit order when the market trades through the
+stop price
+"""
+from market.limit_order import LimitOrder
+
+
+class StopLimitOrder(LimitOrder):
+    """stop limit order"""
+    __slots__ = ()
+
+    def __init__(self, quote):
+        assert 'stop_price' in quote
+        super().__init__(quote)
+        self.stop_price = float(quote['stop_price'])
+
+    def __getitem__(self, item):
+        """for quering properties in dict style"""
+        if item == 'type':
+            return 'stop_limit'
+
+        if item == 'stop_price':
+            return self.stop_price
+
+        return super().__getitem__(item)
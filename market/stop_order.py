@@ -0,0 +1,25 @@
+"""
+stop order, becomes a market order when the market trades through the stop
+price
+"""
+from market.market_order import MarketOrder
+
+
+class StopOrder(MarketOrder):
+    """stop order"""
+    __slots__ = ()
+
+    def __init__(self, quote):
+        assert 'stop_price' in quote
+        super().__init__(quote)
+        self.stop_price = float(quote['stop_price'])
+
+    def __getitem__(self, item):
+        """for quering properties in dict style"""
+        if item == 'type':
+            return 'stop'
+
+        if item == 'stop_price':
+            return self.stop_price
+
+        return super().__getitem__(item)
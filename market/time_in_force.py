@@ -0,0 +1,16 @@
+"""
+time in force of an order
+"""
+from enum import IntEnum
+# pylint: disable=no-member
+
+
+class TimeInForce(IntEnum):
+    """good till cancel, immediate or cancel, fill or kill"""
+    GTC = 0
+    IOC = 1
+    FOK = 2
+
+    def __str__(self) -> str:
+        """prints gtc, ioc or fok"""
+        return super().name.lower()
@@ -1,9 +1,12 @@
 import logging
 from datetime import date
-from math import log, sqrt, exp
+from math import log, sqrt, exp, pi
 
-from scipy.stats import norm
+import numpy as np
 from constants import PRECISION, MAX_ITERATIONS
+from options.greeks import Greeks
+from options.normal_distribution import cdf, cdf_array, pdf, pdf_array
+from options.pricing_context import PricingContext
 from options.option_style import OptionStyle
 from term_structures.curve import Curve
 from term_structures.surface import Surface
@@ -31,18 +34,46 @@ class BlackScholesPricer:
         self.maturity_date = maturity_date
         self.day_count_convention = day_count(convention)
         self.style = style
+        self.context = None
+
+    @classmethod
+    def from_context(cls,
+                     context: PricingContext,
+                     spot: float,
+                     strike: float,
+                     maturity_date: date,
+                     style: OptionStyle = OptionStyle.CALL):
+        """pricer that takes its market data from the memoized context"""
+        pricer = cls.__new__(cls)
+        pricer.spot = spot
+        pricer.strike = strike
+        pricer.discount_curve = context.discount_curve
+        pricer.volatility_surface = context.volatility_surface
+        pricer.valuation_date = context.valuation_date
+        pricer.maturity_date = maturity_date
+        pricer.day_count_convention = context.day_count_convention
+        pricer.style = style
+        pricer.context = context
+
+        return pricer
 
     @property
     def time_to_maturity(self) -> float:
+        if self.context is not None:
+            return self.context.time_to_maturity(self.maturity_date)
         return self.day_count_convention.year_fraction(self.valuation_date,
                                                        self.maturity_date)
 
     @property
     def interest_rate(self) -> float:
+        if self.context is not None:
+            return self.context.interest_rate(self.maturity_date)
         return self.discount_curve(self.time_to_maturity)
 
     @property
     def volatility(self) -> float:
+        if self.context is not None:
+            return self.context.volatility(self.maturity_date, self.strike)
         return self.volatility_surface(self.time_to_maturity, self.strike)
 
     @property
@@ -69,10 +100,30 @@ class BlackScholesPricer:
         d2 = d1 - sig * sqrt(t)
 
         cp = call_put_flag
-        n = norm.cdf
+        n = cdf
 
         return cp * s * n(cp * d1) - cp * k * exp(-r * t) * n(cp * d2)
 
+    @staticmethod
+    def calculate_prices(call_put_flag, spot, strike, time_to_maturity,
+                         interest_rate, volatility) -> np.ndarray:
+        """prices of many options at once, the arguments are numpy arrays
+        or scalars that broadcast against each other"""
+        cp = np.asarray(call_put_flag)
+        assert np.all((cp == -1) | (cp == 1))
+        sig = np.asarray(volatility, dtype=float)
+        t = np.asarray(time_to_maturity, dtype=float)
+        r = np.asarray(interest_rate, dtype=float)
+        s = np.asarray(spot, dtype=float)
+        k = np.asarray(strike, dtype=float)
+
+        sqrt_t = np.sqrt(t)
+        d1 = (np.log(s / k) + (r + 0.5 * sig * sig) * t) / (sig * sqrt_t)
+        d2 = d1 - sig * sqrt_t
+
+        return cp * s * cdf_array(cp * d1) - \
+            cp * k * np.exp(-r * t) * cdf_array(cp * d2)
+
     @property
     def vega(self) -> float:
         return BlackScholesPricer.calculate_vega(spot=self.spot,
@@ -89,12 +140,82 @@ class BlackScholesPricer:
         r = interest_rate
         s = spot
         k = strike
-        n = norm.pdf
+        n = pdf
 
         d1 = (log(s/k)+(r+sig*sig/2.)*t)/(sig*sqrt(t))
 
         return s * sqrt(t)*n(d1)
 
+    @staticmethod
+    def calculate_vegas(spot, strike, time_to_maturity, interest_rate,
+                        volatility) -> np.ndarray:
+        """vegas of many options at once, the arguments are numpy arrays or
+        scalars that broadcast against each other"""
+        sig = np.asarray(volatility, dtype=float)
+        t = np.asarray(time_to_maturity, dtype=float)
+        r = np.asarray(interest_rate, dtype=float)
+        s = np.asarray(spot, dtype=float)
+        k = np.asarray(strike, dtype=float)
+
+        sqrt_t = np.sqrt(t)
+        d1 = (np.log(s / k) + (r + 0.5 * sig * sig) * t) / (sig * sqrt_t)
+
+        return s * sqrt_t * pdf_array(d1)
+
+    @property
+    def greeks(self) -> Greeks:
+        """price and all greeks, the year fraction, rate and volatility are
+        looked up once"""
+        t = self.time_to_maturity
+        if self.context is not None:
+            r = self.interest_rate
+            sig = self.volatility
+        else:
+            r = self.discount_curve(t)
+            sig = self.volatility_surface(t, self.strike)
+
+        return BlackScholesPricer.calculate_greeks(call_put_flag=self.style,
+                                                   spot=self.spot,
+                                                   strike=self.strike,
+                                                   time_to_maturity=t,
+                                                   interest_rate=r,
+                                                   volatility=sig)
+
+    @staticmethod
+    def calculate_greeks(call_put_flag, spot, strike, time_to_maturity,
+                         interest_rate, volatility) -> Greeks:
+        """price and greeks of many options at once, d1, d2, the discount
+        factor and the normal distribution are evaluated once and shared,
+        the arguments are numpy arrays or scalars that broadcast against each
+        other"""
+        cp = np.asarray(call_put_flag)
+        assert np.all((cp == -1) | (cp == 1))
+        sig = np.asarray(volatility, dtype=float)
+        t = np.asarray(time_to_maturity, dtype=float)
+        r = np.asarray(interest_rate, dtype=float)
+        s = np.asarray(spot, dtype=float)
+        k = np.asarray(strike, dtype=float)
+
+        sqrt_t = np.sqrt(t)
+        sig_sqrt_t = sig * sqrt_t
+        d1 = (np.log(s / k) + (r + 0.5 * sig * sig) * t) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+        discount = np.exp(-r * t)
+        pdf = pdf_array(d1)
+        cdf1 = cdf_array(cp * d1)
+        cdf2 = cdf_array(cp * d2)
+        vega = s * sqrt_t * pdf
+
+        return Greeks(price=cp * (s * cdf1 - k * discount * cdf2),
+                      delta=cp * cdf1,
+                      gamma=pdf / (s * sig_sqrt_t),
+                      vega=vega,
+                      theta=-s * pdf * sig / (2 * sqrt_t) -
+                      cp * r * k * discount * cdf2,
+                      rho=cp * k * t * discount * cdf2,
+                      vanna=-pdf * d2 / sig,
+                      volga=vega * d1 * d2 / sig)
+
     @staticmethod
     def implied_vol(observed_price: float,
                     call_put_flag: int,
@@ -102,35 +223,94 @@ class BlackScholesPricer:
                     strike: float,
                     time_to_maturity: float,
                     interest_rate: float) -> float:
-        """solve for volatility with known observed price
-        Newton-Raphson to approximate implied volatility"""
+        """solve for volatility with known observed price, see
+        implied_vols"""
         assert call_put_flag in(-1, 1)
 
-        sigma = 0.5     # initial guess
-        i = 0
-        diff = PRECISION + 1
+        return float(BlackScholesPricer.implied_vols(observed_price,
+                                                     call_put_flag,
+                                                     spot,
+                                                     strike,
+                                                     time_to_maturity,
+                                                     interest_rate))
+
+    @staticmethod
+    def implied_vols(observed_price, call_put_flag, spot, strike,
+                     time_to_maturity, interest_rate,
+                     precision: float = PRECISION,
+                     max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+        """solve for the volatilities of many observed prices at once, the
+        arguments are numpy arrays or scalars that broadcast against each
+        other. prices outside the no arbitrage bounds give nan
+
+        the initial guess is the Corrado-Miller approximation, the solution
+        is kept in a bracket that is narrowed on every iteration. Halley
+        steps, using vega and volga, are taken when they stay inside the
+        bracket, otherwise the bracket is bisected. every option stops when
+        its volatility step or its bracket is within precision, a price
+        tolerance would stop deep in or out of the money options, where the
+        price hardly depends on the volatility, far from the solution"""
+        arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                       (observed_price, call_put_flag, spot,
+                                        strike, time_to_maturity,
+                                        interest_rate)))
+        shape = arrays[0].shape
+        price, cp, s, k, t, r = (a.ravel() for a in arrays)
+        assert np.all((cp == -1) | (cp == 1))
+
+        # price of the call by put call parity, bounded by intrinsic and spot
+        discounted_strike = k * np.exp(-r * t)
+        call = np.where(cp == 1, price, price + s - discounted_strike)
+        valid = (call >= np.maximum(s - discounted_strike, 0)) & (call < s)
+
+        half = call - 0.5 * (s - discounted_strike)
+        root = np.sqrt(np.maximum(half * half -
+                                  (s - discounted_strike) ** 2 / pi, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma = sqrt(2 * pi) / np.sqrt(t) * (half + root) / \
+                (s + discounted_strike)
+        sigma = np.clip(np.nan_to_num(sigma, nan=0.5), 1e-3, 5.0)
+
+        low = np.full(sigma.shape, 1e-9)
+        high = np.full(sigma.shape, 10.0)
+        active = np.flatnonzero(valid)
+        for _ in range(max_iterations):
+            if not active.size:
+                break
+
+            greeks = BlackScholesPricer.calculate_greeks(cp[active],
+                                                         s[active],
+                                                         k[active],
+                                                         t[active],
+                                                         r[active],
+                                                         sigma[active])
+            diff = greeks.price - price[active]
+
+            x = sigma[active]
+            low[active] = np.where(diff < 0, x, low[active])
+            high[active] = np.where(diff > 0, x, high[active])
 
-        while i < MAX_ITERATIONS and abs(diff) > PRECISION:
-            price = BlackScholesPricer.calculate_price(call_put_flag=call_put_flag,         # noqa
-                                                       spot=spot,
-                                                       strike=strike,
-                                                       time_to_maturity=time_to_maturity,   # noqa
-                                                       interest_rate=interest_rate,         # noqa
-                                                       volatility=sigma)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = diff * greeks.vega / \
+                    (greeks.vega ** 2 - 0.5 * diff * greeks.volga)
+            candidate = x - step
+            inside = np.isfinite(candidate) & \
+                (candidate > low[active]) & (candidate < high[active])
+            new = np.where(diff == 0, x, np.where(
+                inside, candidate, 0.5 * (low[active] + high[active])))
+            sigma[active] = new
+            done = (np.abs(new - x) <= precision) | \
+                (high[active] - low[active] <= precision)
 
-            vega = BlackScholesPricer.calculate_vega(spot=spot,
-                                                     strike=strike,
-                                                     time_to_maturity=time_to_maturity,     # noqa
-                                                     interest_rate=interest_rate,           # noqa
-                                                     volatility=sigma)
+            active = active[~done]
 
-            diff = observed_price - price   # root
-            logging.debug(i, sigma, diff)
-            sigma = sigma + diff/vega       # f(x) / f'(x)
+        if active.size:
+            logging.debug('implied volatility not converged for %d options',
+                          active.size)
 
-            i += 1
+        sigma[~valid] = np.nan
 
-        return sigma
+        return sigma.reshape(shape)[()]
 
     def implied_volatility(self, observed_price: float):
         return BlackScholesPricer.implied_vol(observed_price=observed_price,
@@ -0,0 +1,12 @@
+from enum import IntEnum
+# pylint: disable=no-member
+
+
+class ExerciseStyle(IntEnum):
+    """european or american"""
+    EUROPEAN = 0
+    AMERICAN = 1
+
+    def __str__(self):
+        """returns exercise style"""
+        return super().name.lower()
@@ -0,0 +1,20 @@
+"""
+price and sensitivities of an option, scalars or numpy arrays
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Greeks:
+    """theta is per year, vega, vanna and volga are per unit of volatility,
+    rho per unit of interest rate"""
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+    vanna: np.ndarray
+    volga: np.ndarray
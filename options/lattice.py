@@ -0,0 +1,227 @@
+"""
+lattice pricing of european and american options
+
+the underlying follows a binomial or trinomial tree. the option values of all
+nodes of a time step are one numpy array, backward induction is one array
+operation per step. a batch of options, calls and puts on several strikes,
+is priced together with a row of values per option.
+
+cox ross rubinstein and trinomial trees do not depend on the strike, the
+options of a batch share the prices of the nodes. leisen reimer trees are
+centred on the strike of every option, they converge with the square of the
+number of steps instead of linearly and without the odd even oscillation,
+they need an odd number of steps.
+
+with richardson extrapolation the prices on steps and on about half the steps,
+of the same parity, are combined to cancel the leading error term.
+"""
+import math
+from datetime import date
+from enum import IntEnum
+
+import numpy as np
+
+from options.exercise_style import ExerciseStyle
+from options.option_style import OptionStyle
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+from utils.date.yearfrac import day_count, DayCntCnvEnum
+# pylint: disable=no-member
+# pylint: disable=too-many-arguments
+# pylint: disable=invalid-name
+
+STEPS = 201
+
+
+class LatticeType(IntEnum):
+    """tree of the underlying"""
+    COX_ROSS_RUBINSTEIN = 0
+    LEISEN_REIMER = 1
+    TRINOMIAL = 2
+
+    def __str__(self) -> str:
+        """prints cox_ross_rubinstein, leisen_reimer or trinomial"""
+        return super().name.lower()
+
+
+def _peizer_pratt(z, steps: int):
+    """probability of the binomial distribution of steps matching the
+    normal distribution at z"""
+    x = z / (steps + 1 / 3 + 0.1 / (steps + 1))
+    return 0.5 + np.sign(z) * 0.5 * np.sqrt(
+        1 - np.exp(-x ** 2 * (steps + 1 / 6)))
+
+
+def _binomial_tree(lattice, strikes, spot, time_to_maturity, interest_rate,
+                   dividend_yield, volatility, steps):
+    """log up move, log down move and probability of the up move"""
+    dt = time_to_maturity / steps
+    growth = math.exp((interest_rate - dividend_yield) * dt)
+
+    if lattice == LatticeType.COX_ROSS_RUBINSTEIN:
+        log_up = volatility * math.sqrt(dt)
+        up = math.exp(log_up)
+        return log_up, -log_up, (growth - 1 / up) / (up - 1 / up)
+
+    vol_sqrt_t = volatility * math.sqrt(time_to_maturity)
+    d1 = (np.log(spot / strikes) + (interest_rate - dividend_yield +
+                                    0.5 * volatility ** 2) *
+          time_to_maturity) / vol_sqrt_t
+    p = _peizer_pratt(d1 - vol_sqrt_t, steps)
+    up = growth * _peizer_pratt(d1, steps) / p
+    down = (growth - p * up) / (1 - p)
+
+    return np.log(up), np.log(down), p
+
+
+def _steps(lattice: LatticeType, steps: int, parity: int = None) -> int:
+    """leisen reimer trees take an odd number of steps, the error of the
+    other trees oscillates with the parity of the number of steps"""
+    if lattice == LatticeType.LEISEN_REIMER:
+        parity = 1
+    if parity is not None and steps % 2 != parity:
+        return steps + 1
+    return steps
+
+
+def _backward_induction(flags, strikes, spot, time_to_maturity,
+                        interest_rate, dividend_yield, volatility, steps,
+                        lattice, exercise) -> np.ndarray:
+    """prices of the options, flags and strikes are columns of a row per
+    option"""
+    discount = math.exp(-interest_rate * time_to_maturity / steps)
+    american = exercise == ExerciseStyle.AMERICAN
+
+    if lattice == LatticeType.TRINOMIAL:
+        dt = time_to_maturity / steps
+        log_up = volatility * math.sqrt(2 * dt)
+        a = math.exp(0.5 * (interest_rate - dividend_yield) * dt)
+        b = math.exp(volatility * math.sqrt(0.5 * dt))
+        p_up = ((a - 1 / b) / (b - 1 / b)) ** 2
+        p_down = ((b - a) / (b - 1 / b)) ** 2
+        p_middle = 1 - p_up - p_down
+
+        def node_prices(step):
+            return spot * np.exp(log_up * np.arange(-step, step + 1))
+
+        def expectation(values):
+            return discount * (p_down * values[:, :-2] +
+                               p_middle * values[:, 1:-1] +
+                               p_up * values[:, 2:])
+    else:
+        log_up, log_down, p = _binomial_tree(lattice, strikes, spot,
+                                             time_to_maturity, interest_rate,
+                                             dividend_yield, volatility,
+                                             steps)
+
+        def node_prices(step):
+            ups = np.arange(step + 1)
+            return spot * np.exp(log_up * ups + log_down * (step - ups))
+
+        def expectation(values):
+            return discount * (p * values[:, 1:] + (1 - p) * values[:, :-1])
+
+    values = np.maximum(flags * (node_prices(steps) - strikes), 0.0)
+    for step in range(steps - 1, -1, -1):
+        values = expectation(values)
+        if american:
+            np.maximum(values, flags * (node_prices(step) - strikes),
+                       out=values)
+
+    return values[:, 0]
+
+
+def lattice_prices(call_put_flag,
+                   spot: float,
+                   strike,
+                   time_to_maturity: float,
+                   interest_rate: float,
+                   volatility: float,
+                   steps: int = STEPS,
+                   lattice: LatticeType = LatticeType.LEISEN_REIMER,
+                   exercise: ExerciseStyle = ExerciseStyle.AMERICAN,
+                   dividend_yield: float = 0.0,
+                   richardson: bool = False) -> np.ndarray:
+    """prices of the options on one tree, call_put_flag and strike broadcast
+    to the shape of the result"""
+    assert steps > 1 and time_to_maturity > 0 and volatility > 0
+    flags, strikes = np.broadcast_arrays(np.asarray(call_put_flag, float),
+                                         np.asarray(strike, float))
+    shape = flags.shape
+    flags = flags.reshape(-1, 1)
+    strikes = strikes.reshape(-1, 1)
+    arguments = (spot, time_to_maturity, interest_rate, dividend_yield,
+                 volatility)
+
+    fine = _steps(lattice, steps)
+    prices = _backward_induction(flags, strikes, *arguments, fine, lattice,
+                                 exercise)
+    if richardson:
+        coarse = _steps(lattice, steps // 2, fine % 2)
+        coarse_prices = _backward_induction(flags, strikes, *arguments,
+                                            coarse, lattice, exercise)
+        # early exercise makes american prices converge linearly
+        order = 2 if lattice == LatticeType.LEISEN_REIMER and \
+            exercise == ExerciseStyle.EUROPEAN else 1
+        prices = (fine ** order * prices - coarse ** order * coarse_prices) \
+            / (fine ** order - coarse ** order)
+
+    return prices.reshape(shape)
+
+
+class LatticePricer:
+    def __init__(self,
+                 spot: float,
+                 strike: float,
+                 discount_curve: Curve,
+                 volatility_surface: Surface,
+                 valuation_date: date,
+                 maturity_date: date,
+                 convention: DayCntCnvEnum = DayCntCnvEnum.basis_30_360_isda,
+                 style: OptionStyle = OptionStyle.CALL,
+                 exercise: ExerciseStyle = ExerciseStyle.AMERICAN,
+                 lattice: LatticeType = LatticeType.LEISEN_REIMER,
+                 steps: int = STEPS,
+                 dividend_yield: float = 0.0,
+                 richardson: bool = False):
+
+        self.spot = spot
+        self.strike = strike
+        self.discount_curve = discount_curve
+        self.volatility_surface = volatility_surface
+        self.valuation_date = valuation_date
+        self.maturity_date = maturity_date
+        self.day_count_convention = day_count(convention)
+        self.style = style
+        self.exercise = exercise
+        self.lattice = lattice
+        self.steps = steps
+        self.dividend_yield = dividend_yield
+        self.richardson = richardson
+
+    @property
+    def time_to_maturity(self) -> float:
+        return self.day_count_convention.year_fraction(self.valuation_date,
+                                                       self.maturity_date)
+
+    @property
+    def interest_rate(self) -> float:
+        return self.discount_curve(self.time_to_maturity)
+
+    @property
+    def volatility(self) -> float:
+        return self.volatility_surface(self.time_to_maturity, self.strike)
+
+    @property
+    def price(self) -> float:
+        return float(lattice_prices(int(self.style),
+                                    self.spot,
+                                    self.strike,
+                                    self.time_to_maturity,
+                                    self.interest_rate,
+                                    self.volatility,
+                                    steps=self.steps,
+                                    lattice=self.lattice,
+                                    exercise=self.exercise,
+                                    dividend_yield=self.dividend_yield,
+                                    richardson=self.richardson))
@@ -0,0 +1,313 @@
+"""
+Monte Carlo pricing of path dependent options
+
+the underlying follows a geometric brownian motion with the interest rate of
+the discount curve and the volatility of the surface at maturity. paths are
+generated in blocks of block_size paths, a block is priced and only the sums
+needed for the estimate are kept, so memory use does not grow with the
+number of paths.
+
+every block has its own random generator spawned from the seed, the result
+only depends on the seed and not on the number of processes the blocks are
+spread over. with antithetic variates every normal draw is also used
+negated and the two payoffs are averaged. with a control variate the payoff
+of the european option with the same strike, or the terminal price for
+payoffs without strike, is used as control with its known expectation.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from enum import IntEnum
+
+import numpy as np
+
+from options.black_scholes import BlackScholesPricer
+from options.option_style import OptionStyle
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+from utils.date.yearfrac import day_count, DayCntCnvEnum
+# pylint: disable=no-member
+# pylint: disable=too-many-arguments
+# pylint: disable=invalid-name
+
+
+class BarrierType(IntEnum):
+    """direction of the barrier and knock in or out"""
+    UP_AND_OUT = 0
+    UP_AND_IN = 1
+    DOWN_AND_OUT = 2
+    DOWN_AND_IN = 3
+
+    def __str__(self) -> str:
+        """prints up_and_out, up_and_in, down_and_out or down_and_in"""
+        return super().name.lower()
+
+
+class EuropeanPayoff:
+    """payoff on the price at maturity"""
+    def __init__(self, strike: float, style: OptionStyle = OptionStyle.CALL):
+        self.strike = strike
+        self.style = style
+
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        """payoff per path, paths has a row per path starting at spot"""
+        return np.maximum(self.style * (paths[:, -1] - self.strike), 0.0)
+
+
+class AsianPayoff(EuropeanPayoff):
+    """payoff on the arithmetic average of the prices after spot"""
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        average = paths[:, 1:].mean(axis=1)
+        return np.maximum(self.style * (average - self.strike), 0.0)
+
+
+class BarrierPayoff(EuropeanPayoff):
+    """european payoff that is knocked in or out when the barrier is hit on
+    one of the steps"""
+    def __init__(self,
+                 strike: float,
+                 barrier: float,
+                 barrier_type: BarrierType,
+                 style: OptionStyle = OptionStyle.CALL):
+        super().__init__(strike, style)
+        self.barrier = barrier
+        self.barrier_type = barrier_type
+
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        if self.barrier_type in (BarrierType.UP_AND_OUT,
+                                 BarrierType.UP_AND_IN):
+            hit = paths.max(axis=1) >= self.barrier
+        else:
+            hit = paths.min(axis=1) <= self.barrier
+
+        if self.barrier_type in (BarrierType.UP_AND_OUT,
+                                 BarrierType.DOWN_AND_OUT):
+            hit = ~hit
+
+        return np.where(hit, super().__call__(paths), 0.0)
+
+
+class LookbackPayoff:
+    """payoff on the maximum or minimum of the path, with floating strike
+    when no strike is given"""
+    def __init__(self, style: OptionStyle = OptionStyle.CALL,
+                 strike: float = None):
+        self.strike = strike
+        self.style = style
+
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        if self.strike is None:
+            if self.style == OptionStyle.CALL:
+                return paths[:, -1] - paths.min(axis=1)
+            return paths.max(axis=1) - paths[:, -1]
+
+        if self.style == OptionStyle.CALL:
+            return np.maximum(paths.max(axis=1) - self.strike, 0.0)
+        return np.maximum(self.strike - paths.min(axis=1), 0.0)
+
+
+@dataclass
+class MonteCarloResult:
+    price: float
+    standard_error: float
+    paths: int
+
+
+def simulate_paths(generator: np.random.Generator,
+                   spot: float,
+                   interest_rate: float,
+                   volatility: float,
+                   time_to_maturity: float,
+                   steps: int,
+                   paths: int,
+                   antithetic: bool = False) -> np.ndarray:
+    """geometric brownian motion paths, a row per path of steps + 1 prices
+    starting at spot. with antithetic the second half of the rows uses the
+    negated draws of the first half"""
+    dt = time_to_maturity / steps
+    normals = generator.standard_normal((paths // 2 if antithetic else paths,
+                                         steps))
+    if antithetic:
+        normals = np.concatenate((normals, -normals))
+
+    increments = (interest_rate - 0.5 * volatility ** 2) * dt + \
+        volatility * math.sqrt(dt) * normals
+    log_paths = np.zeros((normals.shape[0], steps + 1))
+    np.cumsum(increments, axis=1, out=log_paths[:, 1:])
+
+    return spot * np.exp(log_paths)
+
+
+def _control(payoff, paths: np.ndarray) -> np.ndarray:
+    """control variate of payoff, the european option on the strike or the
+    terminal price"""
+    if payoff.strike is None:
+        return paths[:, -1]
+
+    return EuropeanPayoff(payoff.strike, payoff.style)(paths)
+
+
+def _simulate_blocks(seeds, payoff, spot, interest_rate, volatility,
+                     time_to_maturity, steps, antithetic,
+                     control_variate) -> np.ndarray:
+    """sums of the samples of blocks of paths: count, y, y * y, x, x * x and
+    x * y, with y the discounted payoff and x the discounted control"""
+    discount = math.exp(-interest_rate * time_to_maturity)
+    sums = np.zeros(6)
+    for seed, size in seeds:
+        generator = np.random.default_rng(seed)
+        paths = simulate_paths(generator, spot, interest_rate, volatility,
+                               time_to_maturity, steps, size, antithetic)
+        y = discount * payoff(paths)
+        x = discount * _control(payoff, paths) if control_variate \
+            else np.zeros_like(y)
+        if antithetic:
+            # a pair of antithetic paths is one sample
+            half = y.shape[0] // 2
+            y = 0.5 * (y[:half] + y[half:])
+            x = 0.5 * (x[:half] + x[half:])
+
+        sums += (y.shape[0], y.sum(), y @ y, x.sum(), x @ x, x @ y)
+
+    return sums
+
+
+def monte_carlo_price(payoff,
+                      spot: float,
+                      interest_rate: float,
+                      volatility: float,
+                      time_to_maturity: float,
+                      steps: int = 252,
+                      paths: int = 100000,
+                      block_size: int = 10000,
+                      antithetic: bool = True,
+                      control_variate: bool = True,
+                      seed: int = None,
+                      processes: int = 0) -> MonteCarloResult:
+    """price of payoff on paths in blocks of block_size, with processes set
+    the blocks are spread over a pool of that many worker processes"""
+    assert paths > 0 and block_size > 0
+    if antithetic:
+        assert block_size % 2 == 0, 'antithetic paths come in pairs'
+
+    sizes = [block_size] * (paths // block_size)
+    rest = paths % block_size
+    if rest:
+        # antithetic paths come in pairs, an odd rest gets one more path
+        sizes.append(rest + rest % 2 if antithetic else rest)
+    seeds = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    arguments = (payoff, spot, interest_rate, volatility, time_to_maturity,
+                 steps, antithetic, control_variate)
+
+    if processes:
+        chunks = [seeds[i::processes] for i in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_simulate_blocks, chunk, *arguments)
+                       for chunk in chunks if chunk]
+            sums = sum(future.result() for future in futures)
+    else:
+        sums = _simulate_blocks(seeds, *arguments)
+
+    n, sum_y, sum_yy, sum_x, sum_xx, sum_xy = sums
+    mean_y = sum_y / n
+    variance_y = (sum_yy - n * mean_y ** 2) / (n - 1)
+
+    if control_variate:
+        mean_x = sum_x / n
+        variance_x = (sum_xx - n * mean_x ** 2) / (n - 1)
+        covariance = (sum_xy - n * mean_x * mean_y) / (n - 1)
+        beta = covariance / variance_x if variance_x > 0 else 0.0
+        expected_x = _expected_control(payoff, spot, interest_rate,
+                                       volatility, time_to_maturity)
+        price = mean_y - beta * (mean_x - expected_x)
+        variance = variance_y - 2 * beta * covariance + \
+            beta ** 2 * variance_x
+    else:
+        price = mean_y
+        variance = variance_y
+
+    return MonteCarloResult(price=float(price),
+                            standard_error=math.sqrt(max(variance, 0.0) / n),
+                            paths=sum(sizes))
+
+
+def _expected_control(payoff, spot, interest_rate, volatility,
+                      time_to_maturity) -> float:
+    """discounted expectation of the control variate"""
+    if payoff.strike is None:
+        return spot
+
+    return BlackScholesPricer.calculate_price(int(payoff.style), spot,
+                                              payoff.strike,
+                                              time_to_maturity,
+                                              interest_rate, volatility)
+
+
+class MonteCarloPricer:
+    def __init__(self,
+                 spot: float,
+                 payoff,
+                 discount_curve: Curve,
+                 volatility_surface: Surface,
+                 valuation_date: date,
+                 maturity_date: date,
+                 convention: DayCntCnvEnum = DayCntCnvEnum.basis_30_360_isda,
+                 steps: int = 252,
+                 paths: int = 100000,
+                 block_size: int = 10000,
+                 antithetic: bool = True,
+                 control_variate: bool = True,
+                 seed: int = None,
+                 processes: int = 0):
+
+        self.spot = spot
+        self.payoff = payoff
+        self.discount_curve = discount_curve
+        self.volatility_surface = volatility_surface
+        self.valuation_date = valuation_date
+        self.maturity_date = maturity_date
+        self.day_count_convention = day_count(convention)
+        self.steps = steps
+        self.paths = paths
+        self.block_size = block_size
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.seed = seed
+        self.processes = processes
+
+    @property
+    def time_to_maturity(self) -> float:
+        return self.day_count_convention.year_fraction(self.valuation_date,
+                                                       self.maturity_date)
+
+    @property
+    def interest_rate(self) -> float:
+        return self.discount_curve(self.time_to_maturity)
+
+    @property
+    def volatility(self) -> float:
+        """volatility at the strike, at the money without strike"""
+        strike = self.payoff.strike
+        return self.volatility_surface(self.time_to_maturity,
+                                       self.spot if strike is None
+                                       else strike)
+
+    def simulate(self) -> MonteCarloResult:
+        """price with its standard error"""
+        return monte_carlo_price(self.payoff,
+                                 spot=self.spot,
+                                 interest_rate=self.interest_rate,
+                                 volatility=self.volatility,
+                                 time_to_maturity=self.time_to_maturity,
+                                 steps=self.steps,
+                                 paths=self.paths,
+                                 block_size=self.block_size,
+                                 antithetic=self.antithetic,
+                                 control_variate=self.control_variate,
+                                 seed=self.seed,
+                                 processes=self.processes)
+
+    @property
+    def price(self) -> float:
+        return self.simulate().price
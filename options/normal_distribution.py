@@ -0,0 +1,36 @@
+"""
+standard normal distribution for the pricers
+
+scipy.stats.norm goes through the generic distribution machinery on every
+call, for a single option that costs more than the pricing itself. the
+scalar functions work on floats, the array functions are numpy ufuncs that
+work on arrays and broadcast. the scalar cdf calls the ndtr ufunc directly
+instead of math.erfc, erfc differs from norm.cdf in the last bits and prices
+would no longer be reproduced exactly
+"""
+from math import exp, pi, sqrt
+
+import numpy as np
+from scipy.special import ndtr
+
+SQRT_2PI = sqrt(2.0 * pi)
+
+
+def cdf(x: float) -> float:
+    """cumulative distribution function of a float"""
+    return float(ndtr(x))
+
+
+def pdf(x: float) -> float:
+    """probability density function of a float"""
+    return exp(-0.5 * x * x) / SQRT_2PI
+
+
+def cdf_array(x) -> np.ndarray:
+    """cumulative distribution function of an array"""
+    return ndtr(x)
+
+
+def pdf_array(x) -> np.ndarray:
+    """probability density function of an array"""
+    return np.exp(-0.5 * np.square(x)) / SQRT_2PI
@@ -0,0 +1,98 @@
+"""
+market data lookups of the options priced against one market snapshot
+
+year fractions, interest rates and volatilities are memoized, keyed on
+valuation date, maturity date and strike. options on the same maturity and
+strike share the day count, curve and surface lookups. the cache does not
+see changes of the curve or surface, call invalidate_curve or
+invalidate_surface after updating them
+"""
+from datetime import date
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+from utils.date.yearfrac import day_count, DayCntCnvEnum
+
+
+class PricingContext:
+    """memoized market data of one snapshot"""
+    def __init__(self,
+                 discount_curve: Curve,
+                 volatility_surface: Surface,
+                 valuation_date: date,
+                 convention: DayCntCnvEnum = DayCntCnvEnum.basis_30_360_isda):
+        self.discount_curve = discount_curve
+        self.volatility_surface = volatility_surface
+        self.valuation_date = valuation_date
+        self.day_count_convention = day_count(convention)
+        self._year_fractions = {}   # valuation date, maturity -> years
+        self._interest_rates = {}   # valuation date, maturity -> rate
+        self._volatilities = {}     # valuation date, maturity, strike -> vol
+
+    def time_to_maturity(self, maturity_date: date) -> float:
+        key = (self.valuation_date, maturity_date)
+        if key not in self._year_fractions:
+            self._year_fractions[key] = \
+                self.day_count_convention.year_fraction(self.valuation_date,
+                                                        maturity_date)
+        return self._year_fractions[key]
+
+    def interest_rate(self, maturity_date: date) -> float:
+        key = (self.valuation_date, maturity_date)
+        if key not in self._interest_rates:
+            self._interest_rates[key] = \
+                self.discount_curve(self.time_to_maturity(maturity_date))
+        return self._interest_rates[key]
+
+    def volatility(self, maturity_date: date, strike: float) -> float:
+        key = (self.valuation_date, maturity_date, strike)
+        if key not in self._volatilities:
+            self._volatilities[key] = self.volatility_surface(
+                self.time_to_maturity(maturity_date), strike)
+        return self._volatilities[key]
+
+    def market_data(self,
+                    maturity_dates: Iterable[date],
+                    strikes: Iterable[float]) -> Tuple[np.ndarray,
+                                                       np.ndarray,
+                                                       np.ndarray]:
+        """year fractions, interest rates and volatilities of a book of
+        options as arrays for the vectorized pricers"""
+        maturity_dates = list(maturity_dates)
+        strikes = list(strikes)
+        assert len(maturity_dates) == len(strikes)
+
+        times = np.fromiter((self.time_to_maturity(maturity)
+                             for maturity in maturity_dates),
+                            dtype=float, count=len(maturity_dates))
+        rates = np.fromiter((self.interest_rate(maturity)
+                             for maturity in maturity_dates),
+                            dtype=float, count=len(maturity_dates))
+        volatilities = np.fromiter((self.volatility(maturity, strike)
+                                    for maturity, strike
+                                    in zip(maturity_dates, strikes)),
+                                   dtype=float, count=len(strikes))
+
+        return times, rates, volatilities
+
+    def invalidate_curve(self, discount_curve: Curve = None):
+        """forget the interest rates, optionally replacing the curve"""
+        if discount_curve is not None:
+            self.discount_curve = discount_curve
+        self.discount_curve.invalidate()
+        self._interest_rates.clear()
+
+    def invalidate_surface(self, volatility_surface: Surface = None):
+        """forget the volatilities, optionally replacing the surface"""
+        if volatility_surface is not None:
+            self.volatility_surface = volatility_surface
+        self._volatilities.clear()
+
+    def invalidate(self):
+        """forget all cached lookups"""
+        self._year_fractions.clear()
+        self.invalidate_curve()
+        self.invalidate_surface()
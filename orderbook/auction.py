@@ -0,0 +1,76 @@
+""" equilibrium price of a call auction
+
+during the call phase orders are collected in the book without matching, so
+bids and asks may cross. the auction uncrosses the book at a single price.
+for every limit price in the book the demand, the bid volume at or above the
+price, and the supply, the ask volume at or below the price, follow from the
+cumulative volumes of the levels. the price is chosen by the usual rules:
+
+1. maximum executable volume, the minimum of demand and supply
+2. minimum imbalance, the absolute surplus of demand over supply
+3. market pressure, the highest price when all remaining candidates have
+   more demand than supply, the lowest price when all have more supply
+4. the price closest to the reference price, without reference price the
+   middle of the remaining candidates
+
+market orders take part with all their volume but do not set a price.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from orderbook.book_side import BookSide
+
+
+@dataclass(frozen=True)
+class AuctionPrice:
+    price: float = None
+    volume: int = 0
+    imbalance: int = 0
+
+
+def equilibrium_price(bids: BookSide,
+                      asks: BookSide,
+                      reference_price: float = None) -> AuctionPrice:
+    """ price that uncrosses bids and asks with its executable volume and
+    imbalance, the price is None when the book does not cross
+    """
+    bid_prices, bid_volumes = bids.depth_arrays()
+    ask_prices, ask_volumes = asks.depth_arrays()
+
+    # both sides in ascending price, market bids are at inf, market asks at 0
+    bid_prices = bid_prices[::-1]
+    bid_cumulative = np.concatenate(([0], np.cumsum(bid_volumes[::-1])))
+    ask_cumulative = np.concatenate(([0], np.cumsum(ask_volumes)))
+
+    candidates = np.concatenate((bid_prices, ask_prices))
+    candidates = np.unique(candidates[np.isfinite(candidates) &
+                                      (candidates > 0)])
+    if not len(candidates):
+        return AuctionPrice()
+
+    demand = bid_cumulative[-1] - \
+        bid_cumulative[np.searchsorted(bid_prices, candidates, 'left')]
+    supply = ask_cumulative[np.searchsorted(ask_prices, candidates, 'right')]
+    volume = np.minimum(demand, supply)
+    imbalance = demand - supply
+
+    if not volume.max():
+        return AuctionPrice()
+
+    best = volume == volume.max()
+    best &= np.abs(imbalance) == np.abs(imbalance[best]).min()
+    index = np.flatnonzero(best)
+
+    if (imbalance[index] > 0).all():
+        chosen = index[-1]
+    elif (imbalance[index] < 0).all():
+        chosen = index[0]
+    elif reference_price is not None:
+        chosen = index[np.argmin(np.abs(candidates[index] - reference_price))]
+    else:
+        chosen = index[(len(index) - 1) // 2]
+
+    return AuctionPrice(price=float(candidates[chosen]),
+                        volume=int(volume[chosen]),
+                        imbalance=int(imbalance[chosen]))
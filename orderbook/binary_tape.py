@@ -0,0 +1,156 @@
+""" append-only binary trade tape
+
+every trade is written as a fixed width little endian record of
+    timestamp       int64, nanoseconds since epoch of the aggressing order
+    price           float64
+    quantity        int64
+    aggressor id    int64, order id of the incoming order
+    resting id      int64, order id of the order in the book
+    side            int8, side of the aggressor, 1 ask, -1 bid
+
+records are collected in a buffer and written in blocks. the tape can be
+rotated on size, segments after the first get a sequence number appended to
+the file name. a tape file is read without parsing by memory mapping it as a
+numpy structured array.
+"""
+import calendar
+import os
+import struct
+import time
+from datetime import datetime
+from typing import List
+
+import numpy as np
+
+from position_keeping.trade import Trade
+
+RECORD = struct.Struct('<qdqqqb')
+TAPE_DTYPE = np.dtype([('timestamp', '<i8'),
+                       ('price', '<f8'),
+                       ('quantity', '<i8'),
+                       ('aggressor_id', '<i8'),
+                       ('resting_id', '<i8'),
+                       ('side', 'i1')])
+
+assert TAPE_DTYPE.itemsize == RECORD.size
+
+
+def to_nanoseconds(timestamp) -> int:
+    """ nanoseconds since epoch, naive datetimes are taken as utc
+    """
+    if timestamp is None:
+        return time.time_ns()
+
+    if isinstance(timestamp, datetime):
+        seconds = calendar.timegm(timestamp.utctimetuple())
+        return seconds * 1000000000 + timestamp.microsecond * 1000
+
+    return int(timestamp)
+
+
+class BinaryTapeWriter:
+    """ buffered writer of trades to a binary tape
+    """
+    def __init__(self,
+                 filename: str,
+                 buffer_size: int = 65536,
+                 max_file_size: int = None):
+        """ open tape filename for appending, with max_file_size set a new
+        segment is started before a segment would exceed that size
+        """
+        assert max_file_size is None or max_file_size >= RECORD.size
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.max_file_size = max_file_size
+        self.filenames = []
+        self._buffer = bytearray()
+        self._file = None
+        self._file_size = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        """ close the current segment and open the next one
+        """
+        if self._file is not None:
+            self._file.close()
+
+        if self.filenames:
+            filename = '%s.%s' % (self.filename, len(self.filenames))
+        else:
+            filename = self.filename
+
+        self._file = open(filename, 'ab')
+        self._file_size = os.path.getsize(filename)
+        self.filenames.append(filename)
+
+    def write(self,
+              timestamp: int,
+              price: float,
+              quantity: int,
+              aggressor_id: int,
+              resting_id: int,
+              side: int):
+        """ append one record
+        """
+        if self.max_file_size is not None and \
+                self._file_size + len(self._buffer) + RECORD.size > \
+                self.max_file_size:
+            self.flush()
+            self._open_segment()
+
+        self._buffer += RECORD.pack(timestamp, price, quantity,
+                                    aggressor_id, resting_id, side)
+
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def append(self, trade: Trade, timestamp=None):
+        """ append trade, timestamp defaults to the time of the aggressing
+        order and to now for a trade built from a fill
+        """
+        if timestamp is None and trade.order is not None:
+            timestamp = trade.order.timestamp
+
+        self.write(to_nanoseconds(timestamp),
+                   trade.price,
+                   trade.quantity,
+                   trade.aggressor_id,
+                   trade.resting_id,
+                   trade.side)
+
+    def flush(self):
+        """ write the buffered records to the tape file
+        """
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._file_size += len(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self):
+        """ flush and close the tape file
+        """
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_tape(filename: str) -> np.ndarray:
+    """ memory map a tape file as a structured array with fields as in
+    TAPE_DTYPE
+    """
+    if not os.path.getsize(filename):
+        return np.empty(0, dtype=TAPE_DTYPE)
+
+    return np.memmap(filename, dtype=TAPE_DTYPE, mode='r')
+
+
+def read_tapes(filenames: List[str]) -> np.ndarray:
+    """ all records of the segments in filenames in one array
+    """
+    return np.concatenate([read_tape(filename) for filename in filenames])
@@ -0,0 +1,163 @@
+""" one side of the order book
+
+orders are grouped in price levels, the levels are kept in a sorted map from
+price to level with the best price first. bids are keyed on the negated price
+so for both sides the best level is the first one in the map. the map is keyed
+on the ticks of the orders, the limit or the limit in integer ticks when the
+order book has a tick size. depth can also be read as two numpy arrays
+filled straight from the levels.
+"""
+from itertools import islice
+from operator import neg
+from typing import List, Tuple
+
+import numpy as np
+from sortedcontainers import SortedDict
+
+from market.order import Order
+from market.side import Side
+from orderbook.price_level import PriceLevel
+
+
+class BookSide:
+    """ bids or asks of an order book as sorted price levels
+    """
+    def __init__(self, side: Side):
+        """ initialize an empty side
+        """
+        self.side = side
+        if side == Side.BID:
+            self.levels = SortedDict(neg)
+        else:
+            self.levels = SortedDict()
+        self._count = 0
+
+    def add(self, order: Order) -> PriceLevel:
+        """ add order at the back of the queue on its price level, returns
+        the level
+        """
+        level = self.levels.get(order.ticks)
+        if level is None:
+            level = PriceLevel(order.ticks, order.limit)
+            self.levels[order.ticks] = level
+
+        level.append(order)
+        self._count += 1
+
+        return level
+
+    def best(self) -> PriceLevel:
+        """ level with the best price, None if the side is empty
+        """
+        if not self.levels:
+            return None
+
+        return self.levels.peekitem(0)[1]
+
+    def worst(self) -> PriceLevel:
+        """ level with the worst price, None if the side is empty
+        """
+        if not self.levels:
+            return None
+
+        return self.levels.peekitem(-1)[1]
+
+    def fill(self, quantity: int) -> PriceLevel:
+        """ take quantity from the order with priority on the best level,
+        returns the level
+        """
+        level = self.levels.peekitem(0)[1]
+
+        if level.fill(quantity):
+            self._count -= 1
+            if not level.orders:
+                del self.levels[level.ticks]
+
+        return level
+
+    def remove(self, order: Order) -> PriceLevel:
+        """ take order out of the book, returns the level it was on
+        """
+        level = self.levels[order.ticks]
+        level.remove(order)
+        self._count -= 1
+
+        if not level.orders:
+            del self.levels[level.ticks]
+
+        return level
+
+    def reduce(self, order: Order, quantity: int) -> PriceLevel:
+        """ lower the quantity of a resting order keeping its priority,
+        returns the level of the order
+        """
+        level = self.levels[order.ticks]
+        level.reduce(order, quantity)
+
+        return level
+
+    def volume_at(self, ticks) -> int:
+        """ total volume resting at the level with key ticks
+        """
+        level = self.levels.get(ticks)
+        if level is None:
+            return 0
+
+        return level.volume
+
+    def depth(self, levels: int = None) -> List[Tuple[float, int]]:
+        """ price and volume per level, best level first
+        """
+        return [(level.price, level.volume)
+                for level in islice(self.levels.values(), levels)]
+
+    def depth_arrays(self, levels: int = None) -> Tuple[np.ndarray,
+                                                        np.ndarray]:
+        """ prices and volumes of the levels as numpy arrays, best level
+        first
+        """
+        count = len(self.levels)
+        if levels is not None:
+            count = min(levels, count)
+
+        prices = np.empty(count, dtype=np.float64)
+        volumes = np.empty(count, dtype=np.int64)
+        for i, level in enumerate(islice(self.levels.values(), count)):
+            prices[i] = level.price
+            volumes[i] = level.volume
+
+        return prices, volumes
+
+    def __len__(self):
+        """ number of orders on this side
+        """
+        return self._count
+
+    def __iter__(self):
+        """ orders in priority, best price first and in time priority
+        within a level
+        """
+        for level in self.levels.values():
+            yield from level
+
+    def __getitem__(self, index: int) -> Order:
+        """ order at position index in priority order
+        """
+        if index == 0 and self.levels:
+            return self.levels.peekitem(0)[1].first()
+
+        if index == -1 and self.levels:
+            return self.levels.peekitem(-1)[1].last()
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('book side index out of range')
+
+        return next(islice(self, index, None))
+
+    def __repr__(self):
+        """ for debugging and printing
+        """
+        return repr(list(self))
@@ -0,0 +1,223 @@
+""" exchange on many securities
+
+every symbol has its own matching engine. symbols are sharded over a number
+of worker processes on a stable hash of the symbol, so all orders for a symbol
+are matched by the same process in the order they were submitted. a worker
+owns the engines of its symbols for the lifetime of the exchange.
+
+with zero processes the engines live in the calling process, this is useful
+for testing and small simulations. tick sizes can be given per symbol.
+"""
+import zlib
+from multiprocessing import Pipe, Process
+from typing import Dict, Iterable, List
+
+from orderbook.matching_engine import MatchingEngine
+from position_keeping.trade import Trade
+
+
+class EngineShard:
+    """ the matching engines for a subset of the symbols
+    """
+    def __init__(self, tick_sizes: Dict[str, float] = None):
+        """ initialize
+        """
+        self.engines = {}
+        self.tick_sizes = tick_sizes or {}
+
+    def engine(self, symbol: str) -> MatchingEngine:
+        """ matching engine for symbol, created on first use
+        """
+        if symbol not in self.engines:
+            tick_size = self.tick_sizes.get(symbol)
+            self.engines[symbol] = MatchingEngine(tick_size=tick_size)
+
+        return self.engines[symbol]
+
+    def match_orders(self, quotes: List[Dict]) -> Dict[str, List[Trade]]:
+        """ match quotes in submission order, returns trades per symbol
+        """
+        trades = {}
+        for quote in quotes:
+            symbol = quote['symbol']
+            trades_on_symbol, _ = self.engine(symbol).match_order(quote)
+            trades.setdefault(symbol, []).extend(trades_on_symbol)
+
+        return trades
+
+    def cancel_participant(self,
+                           dealer_or_broker_id: str) -> Dict[str, List]:
+        """ cancel all orders of a dealer or broker, returns the cancelled
+        orders per symbol
+        """
+        cancelled = {}
+        for symbol, engine in self.engines.items():
+            orders = engine.cancel_participant(dealer_or_broker_id)
+            if orders:
+                cancelled[symbol] = orders
+
+        return cancelled
+
+    def call(self, symbol: str, method: str, args: tuple, kwargs: dict):
+        """ call method on the engine of symbol
+        """
+        return getattr(self.engine(symbol), method)(*args, **kwargs)
+
+
+def _serve(connection, tick_sizes: Dict[str, float]):
+    """ worker process loop, executes requests on its shard until it gets
+    None
+    """
+    shard = EngineShard(tick_sizes)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+
+        method, args = request
+        try:
+            connection.send((True, getattr(shard, method)(*args)))
+        except Exception as exc:    # pylint: disable=broad-except
+            connection.send((False, exc))
+
+    connection.close()
+
+
+class Exchange:
+    """ routes quotes to a matching engine per symbol
+    """
+    def __init__(self,
+                 processes: int = 0,
+                 tick_sizes: Dict[str, float] = None):
+        """ start processes workers, with zero processes all engines run in
+        this process. tick_sizes maps symbol to the tick size of its book
+        """
+        self.processes = processes
+        self._shards = []
+        self._workers = []
+        self._connections = []
+
+        if processes == 0:
+            self._shards.append(EngineShard(tick_sizes))
+
+        for _ in range(processes):
+            connection, worker_connection = Pipe()
+            worker = Process(target=_serve,
+                             args=(worker_connection, tick_sizes),
+                             daemon=True)
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def shard(self, symbol: str) -> int:
+        """ index of the shard that owns symbol
+        """
+        return zlib.crc32(str(symbol).encode()) % max(self.processes, 1)
+
+    def match_orders(self, quotes: Iterable[Dict]) -> Dict[str, List[Trade]]:
+        """ match a batch of quotes, returns the trades per symbol in the
+        order the quotes were submitted
+        """
+        batches = {}
+        for quote in quotes:
+            batches.setdefault(self.shard(quote['symbol']), []).append(quote)
+
+        if not self.processes:
+            return self._shards[0].match_orders(batches.get(0, []))
+
+        # all workers start matching before collecting any result
+        for shard, batch in batches.items():
+            self._connections[shard].send(('match_orders', (batch,)))
+
+        trades = {}
+        for result in self._receive_all(batches):
+            trades.update(result)
+
+        return trades
+
+    def match_order(self, quote: Dict):
+        """ match a single quote, returns trades and the order in the book
+        """
+        return self._call(quote['symbol'], 'match_order', quote)
+
+    def cancel_order(self, symbol: str, order_id: int):
+        """ cancel a resting order on symbol
+        """
+        return self._call(symbol, 'cancel_order', order_id)
+
+    def cancel_participant(self, dealer_or_broker_id: str) -> Dict[str, List]:
+        """ cancel the orders of a dealer or broker on all symbols, returns
+        the cancelled orders per symbol
+        """
+        if not self.processes:
+            return self._shards[0].cancel_participant(dealer_or_broker_id)
+
+        for connection in self._connections:
+            connection.send(('cancel_participant', (dealer_or_broker_id,)))
+
+        cancelled = {}
+        for result in self._receive_all(range(self.processes)):
+            cancelled.update(result)
+
+        return cancelled
+
+    def amend_order(self, symbol: str, order_id: int, **kwargs):
+        """ amend a resting order on symbol
+        """
+        return self._call(symbol, 'amend_order', order_id, **kwargs)
+
+    def get_volume_at_price(self, symbol: str, side: str, price: float):
+        """ volume available in the book of symbol
+        """
+        return self._call(symbol, 'get_volume_at_price', side, price)
+
+    def _call(self, symbol: str, method: str, *args, **kwargs):
+        """ call method on the engine of symbol
+        """
+        if not self.processes:
+            return self._shards[0].call(symbol, method, args, kwargs)
+
+        shard = self.shard(symbol)
+        self._connections[shard].send(('call',
+                                       (symbol, method, args, kwargs)))
+        return self._receive(shard)
+
+    def _receive(self, shard: int):
+        """ result from shard, exceptions in the worker are raised here
+        """
+        success, result = self._connections[shard].recv()
+        if not success:
+            raise result
+
+        return result
+
+    def _receive_all(self, shards: Iterable[int]) -> List:
+        """ results from all shards, every reply is read before the first
+        exception is raised so requests and replies stay in step
+        """
+        replies = [self._connections[shard].recv() for shard in shards]
+        for success, result in replies:
+            if not success:
+                raise result
+
+        return [result for _, result in replies]
+
+    def close(self):
+        """ stop the worker processes
+        """
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+
+        for worker in self._workers:
+            worker.join()
+
+        self._connections = []
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
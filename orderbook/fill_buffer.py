@@ -0,0 +1,189 @@
+""" columnar record of fills
+
+instead of a Trade object per fill the matching engine can write fills into
+preallocated numpy columns. counterparties are stored as integer codes, the
+code of a participant is its position in participants. the buffer grows by
+doubling its capacity.
+
+the buffer and views on a range of it behave as sequences of trades, a Trade
+is only built when an item is accessed. consumers that work on many fills
+read the columns directly.
+"""
+from typing import Dict
+
+import numpy as np
+
+from market.side import Side
+from position_keeping.trade import Trade
+
+COLUMNS = (('price', np.float64),
+           ('quantity', np.int64),
+           ('buyer', np.int32),
+           ('seller', np.int32),
+           ('aggressor_id', np.int64),
+           ('resting_id', np.int64),
+           ('side', np.int8))
+
+
+class FillBuffer:
+    """ preallocated columns of fills
+    """
+    def __init__(self, capacity: int = 4096):
+        """ initialize empty columns for capacity fills
+        """
+        self.capacity = capacity
+        self.size = 0
+        self.participants = []
+        self.codes = {}     # participant -> code
+        self._columns = {name: np.empty(capacity, dtype=dtype)
+                         for name, dtype in COLUMNS}
+        self._set_columns()
+
+    def _set_columns(self):
+        """ keep the columns as attributes for fast access
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self.price = self._columns['price']
+        self.quantity = self._columns['quantity']
+        self.buyer = self._columns['buyer']
+        self.seller = self._columns['seller']
+        self.aggressor_id = self._columns['aggressor_id']
+        self.resting_id = self._columns['resting_id']
+        self.side = self._columns['side']
+
+    def code(self, participant) -> int:
+        """ integer code of participant, assigned on first use
+        """
+        code = self.codes.get(participant)
+        if code is None:
+            code = len(self.participants)
+            self.codes[participant] = code
+            self.participants.append(participant)
+
+        return code
+
+    def append(self,
+               price: float,
+               quantity: int,
+               buyer,
+               seller,
+               aggressor_id: int,
+               resting_id: int,
+               side: int):
+        """ record a fill
+        """
+        if self.size == self.capacity:
+            self._grow()
+
+        i = self.size
+        self.price[i] = price
+        self.quantity[i] = quantity
+        self.buyer[i] = self.code(buyer)
+        self.seller[i] = self.code(seller)
+        self.aggressor_id[i] = aggressor_id
+        self.resting_id[i] = resting_id
+        self.side[i] = side
+        self.size = i + 1
+
+    def _grow(self):
+        """ double the capacity
+        """
+        self.capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+        self._set_columns()
+
+    def trade(self, index: int) -> Trade:
+        """ build the trade of fill index
+        """
+        return Trade.from_fill(float(self.price[index]),
+                               int(self.quantity[index]),
+                               self.participants[self.buyer[index]],
+                               self.participants[self.seller[index]],
+                               int(self.aggressor_id[index]),
+                               int(self.resting_id[index]),
+                               Side(int(self.side[index])))
+
+    def columns(self,
+                start: int = 0,
+                stop: int = None) -> Dict[str, np.ndarray]:
+        """ views on the columns of fills start up to stop
+        """
+        if stop is None:
+            stop = self.size
+
+        return {name: column[start:stop]
+                for name, column in self._columns.items()}
+
+    def view(self, start: int = 0, stop: int = None) -> 'FillView':
+        """ sequence of the trades of fills start up to stop
+        """
+        return FillView(self, start, self.size if stop is None else stop)
+
+    def clear(self):
+        """ forget all fills, the capacity is kept. views on the buffer are
+        invalidated, they read the fills recorded after the clear
+        """
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index: int) -> Trade:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('fill index out of range')
+
+        return self.trade(index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self.trade(index)
+
+
+class FillView:
+    """ the fills of a range in a fill buffer as a sequence of trades
+    """
+    def __init__(self, fills: FillBuffer, start: int, stop: int):
+        """ initialize
+        """
+        self.fills = fills
+        self.start = start
+        self.stop = stop
+
+    def code(self, participant) -> int:
+        """ integer code of participant in the buffer
+        """
+        return self.fills.code(participant)
+
+    @property
+    def codes(self) -> Dict:
+        """ participant -> code of the buffer
+        """
+        return self.fills.codes
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """ views on the columns of the fills in this range
+        """
+        return self.fills.columns(self.start, self.stop)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index: int) -> Trade:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('fill index out of range')
+
+        return self.fills.trade(self.start + index)
+
+    def __iter__(self):
+        for index in range(self.start, self.stop):
+            yield self.fills.trade(index)
+
+    def __repr__(self):
+        return repr(list(self))
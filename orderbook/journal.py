@@ -0,0 +1,128 @@
+""" sequenced journal of the events of a matching engine
+
+every accepted order, cancel and amend is recorded with a sequence number,
+trades are recorded for audit. the matching engine is deterministic, so
+replaying the orders, cancels and amends rebuilds the exact book. records
+are pickled tuples appended to the journal file
+    (sequence, 'order', quote)              quote includes the order id
+    (sequence, 'cancel', order_id)
+    (sequence, 'amend', order_id, quantity, price)
+    (sequence, 'trade', price, quantity, aggressor_id, resting_id)
+
+a crash can leave a partly written last record, it is ignored when reading
+and cut off when the journal is reopened.
+
+a snapshot holds the state of the book at a sequence number, recovery loads
+the latest snapshot and replays only the records after it. snapshots can be
+written every snapshot_interval records.
+"""
+import os
+import pickle
+from typing import Dict, Iterator, Tuple
+
+
+def _read_records(journal_file) -> Iterator[Tuple]:
+    """ records of an open journal file up to the end or a truncated record
+    """
+    while True:
+        try:
+            yield pickle.load(journal_file)
+        except (EOFError, pickle.UnpicklingError):
+            break
+
+
+def read_journal(filename: str) -> Iterator[Tuple]:
+    """ records of a journal file in sequence
+    """
+    with open(filename, 'rb') as journal_file:
+        yield from _read_records(journal_file)
+
+
+def load_snapshot(filename: str) -> Dict:
+    """ state of a book as written by Journal.write_snapshot
+    """
+    with open(filename, 'rb') as snapshot_file:
+        return pickle.load(snapshot_file)
+
+
+class Journal:
+    """ appends engine events to a journal file
+    """
+    def __init__(self,
+                 filename: str,
+                 snapshot_filename: str = None,
+                 snapshot_interval: int = None):
+        """ open journal filename for appending, the sequence continues from
+        the records already in the file
+        """
+        assert snapshot_interval is None or snapshot_filename is not None
+        self.filename = filename
+        self.snapshot_filename = snapshot_filename
+        self.snapshot_interval = snapshot_interval
+        self.sequence = 0
+        self.last_order_id = 0
+
+        if os.path.exists(filename):
+            with open(filename, 'rb+') as journal_file:
+                end = 0
+                for record in _read_records(journal_file):
+                    end = journal_file.tell()
+                    self.sequence = record[0]
+                    if record[1] == 'order':
+                        self.last_order_id = max(self.last_order_id,
+                                                 record[2]['order_id'])
+                # drop a partly written last record
+                journal_file.truncate(end)
+
+        self.snapshot_sequence = self.sequence
+        self._file = open(filename, 'ab')
+
+    def record(self, kind: str, *payload):
+        """ append a record
+        """
+        self.sequence += 1
+        self._file.write(pickle.dumps((self.sequence, kind) + payload,
+                                      pickle.HIGHEST_PROTOCOL))
+
+    def record_order(self, quote: Dict):
+        """ append an accepted order, quote must hold the order id
+        """
+        self.last_order_id = max(self.last_order_id, quote['order_id'])
+        self.record('order', quote)
+
+    def snapshot_due(self) -> bool:
+        """ have snapshot_interval records been written since the last
+        snapshot
+        """
+        return self.snapshot_interval is not None and \
+            self.sequence - self.snapshot_sequence >= self.snapshot_interval
+
+    def write_snapshot(self, state: Dict):
+        """ write the state of the book at the current sequence number, the
+        previous snapshot is replaced atomically
+        """
+        self.flush()
+        state = dict(state,
+                     sequence=self.sequence,
+                     last_order_id=self.last_order_id)
+        temporary = self.snapshot_filename + '.tmp'
+        with open(temporary, 'wb') as snapshot_file:
+            pickle.dump(state, snapshot_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.snapshot_filename)
+        self.snapshot_sequence = self.sequence
+
+    def flush(self):
+        """ write buffered records to the journal file
+        """
+        self._file.flush()
+
+    def close(self):
+        """ flush and close the journal file
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
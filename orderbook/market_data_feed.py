@@ -0,0 +1,155 @@
+""" incremental level 2 market data from a matching engine
+
+every change of the aggregate volume on a price level is published as a
+LevelUpdate with a sequence number. a volume of zero means the level is gone.
+subscribers get updates through a callback or by draining a subscription.
+late joiners start from a snapshot of the book, all updates with a higher
+sequence number than the snapshot apply on top of it.
+
+changes of the best bid and offer are published separately, so subscribers
+only interested in the top of the book are not woken up by other levels.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from market.side import Side
+
+
+@dataclass(frozen=True)
+class LevelUpdate:
+    sequence: int
+    side: Side
+    price: float
+    volume: int
+
+
+@dataclass(frozen=True)
+class BestBidOffer:
+    bid: float = None
+    bid_volume: int = 0
+    ask: float = None
+    ask_volume: int = 0
+
+    @property
+    def spread(self) -> float:
+        """ ask minus bid, None when a side is empty """
+        if self.bid is None or self.ask is None:
+            return None
+
+        return self.ask - self.bid
+
+
+@dataclass(frozen=True)
+class BookSnapshot:
+    sequence: int
+    bids: List[Tuple[float, int]]
+    asks: List[Tuple[float, int]]
+
+
+class Subscription:
+    """ queue of updates for a subscriber that polls
+    """
+    def __init__(self, feed: 'MarketDataFeed'):
+        """ initialize
+        """
+        self.feed = feed
+        self.queue = deque()
+
+    def updates(self):
+        """ generator over the updates received since the last call
+        """
+        while self.queue:
+            yield self.queue.popleft()
+
+    def close(self):
+        """ stop receiving updates
+        """
+        self.feed.unsubscribe(self)
+
+
+class MarketDataFeed:
+    """ publishes level updates of one order book
+    """
+    def __init__(self, engine):
+        """ initialize, engine is the matching engine of the book
+        """
+        self.engine = engine
+        self.sequence = 0
+        self.active = False
+        self._callbacks = []
+        self._subscriptions = []
+        self._best_bid_offer_callbacks = []
+
+    def subscribe(self, callback: Callable[[LevelUpdate], None] = None) \
+            -> Subscription:
+        """ register callback for every update, without callback a
+        subscription is returned to drain updates from
+        """
+        if callback is None:
+            subscription = Subscription(self)
+            self._subscriptions.append(subscription)
+            self.active = True
+            return subscription
+
+        self._callbacks.append(callback)
+        self.active = True
+        return None
+
+    def subscribe_with_snapshot(self,
+                                callback: Callable[[LevelUpdate], None] =
+                                None):
+        """ snapshot of the book and the subscription for the updates after
+        it
+        """
+        return self.snapshot(), self.subscribe(callback)
+
+    def unsubscribe(self, subscriber):
+        """ remove a callback or a subscription
+        """
+        if isinstance(subscriber, Subscription):
+            self._subscriptions.remove(subscriber)
+        else:
+            self._callbacks.remove(subscriber)
+
+        self.active = bool(self._callbacks or self._subscriptions)
+
+    def subscribe_best_bid_offer(self,
+                                 callback: Callable[[BestBidOffer], None]):
+        """ register callback for changes of the best bid and offer
+        """
+        self._best_bid_offer_callbacks.append(callback)
+
+    def unsubscribe_best_bid_offer(self,
+                                   callback: Callable[[BestBidOffer], None]):
+        """ remove a best bid and offer callback
+        """
+        self._best_bid_offer_callbacks.remove(callback)
+
+    def snapshot(self) -> BookSnapshot:
+        """ all levels of the book at the current sequence number
+        """
+        return BookSnapshot(sequence=self.sequence,
+                            bids=self.engine.bids.depth(),
+                            asks=self.engine.asks.depth())
+
+    def publish(self, side: Side, price: float, volume: int):
+        """ send a level update to all subscribers
+        """
+        self.sequence += 1
+        update = LevelUpdate(sequence=self.sequence,
+                             side=side,
+                             price=price,
+                             volume=volume)
+
+        for subscription in self._subscriptions:
+            subscription.queue.append(update)
+
+        for callback in self._callbacks:
+            callback(update)
+
+    def publish_best_bid_offer(self, best_bid_offer: BestBidOffer):
+        """ send a new best bid and offer to its subscribers
+        """
+        for callback in self._best_bid_offer_callbacks:
+            callback(best_bid_offer)
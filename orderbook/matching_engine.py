@@ -1,91 +1,828 @@
 """ order book on a security
 
-internal the order book is set up as two sorted lists of orders, one for bids
-and one for asks.
+internal the order book is set up as two book sides, one for bids and one for
+asks. a book side is a sorted map from price to a price level, a fifo queue of
+orders with a running total volume.
 
 key logic is in method match_order, an incoming order is matched against the
-orders in the relevant list. if there is a remaining quantity after a partial
-fill a replacement order is added to the book. trades are returned
+levels on the opposite side. if there is a remaining quantity after a partial
+fill the order is added to the book. trades are returned
+
+resting orders are also indexed on order id, so they can be cancelled or
+amended without searching the book
+
+trades are kept on the tape, optionally they are also written to a binary
+tape file. with a tape capacity the tape is a ring buffer of the last trades.
+session statistics of all trades, and optionally statistics over a rolling
+time window, are updated on every trade
+
+with a tick size the limits of incoming orders are converted to integer ticks,
+orders are compared and grouped in levels on ticks so prices that differ only
+in float representation end up on the same level
+
+changes of the volume on a price level are published as level 2 updates on
+the market data feed of the engine. the best bid and offer are cached, they
+are only recalculated when a change touches the top of a side. depth is
+available as numpy arrays of prices and volumes read from the levels
+
+orders are good till cancel unless their time in force is immediate or cancel,
+the remaining quantity is not added to the book, or fill or kill, the order
+only trades if it can be filled completely. stop orders wait in the stop book
+until a trade triggers them. iceberg orders show their display quantity in the
+book, when that is filled the next part joins the back of the queue
+
+with lazy trades the engine records fills in the columns of a fill buffer
+instead of creating a Trade per fill, trades returned and the tape are
+sequences over that buffer that build a Trade only when an item is read
+
+with self-trade prevention an order does not trade with resting orders of
+the same dealer or broker, the incoming order is cancelled, the resting order
+is cancelled or both are decremented without a trade. resting and stop orders
+are also indexed per dealer or broker, cancel_participant cancels all orders
+of one participant without a scan of the book
+
+in an auction the call phase collects orders in the book without matching,
+the book may cross. uncross executes all crossing orders at the single
+equilibrium price and returns to continuous matching
+
+with a journal every accepted order, cancel, amend and trade is recorded.
+replay rebuilds the book from the journal without logging and order factory
+checks, recover starts from the latest snapshot and replays the tail
 """
 import logging
-from typing import Dict
-from sortedcontainers import SortedList
-from market.order_factory import create_order
+import math
+import os
+from collections import deque
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+
+import numpy as np
+
+from market.iceberg_order import IcebergOrder
+from market.market_order import MarketOrder
+from market.order import Order
+from market.order_factory import create_order, ORDER_TYPES
 from market.side import Side
+from market.time_in_force import TimeInForce
+from orderbook.auction import AuctionPrice, equilibrium_price
+from orderbook.binary_tape import BinaryTapeWriter, to_nanoseconds
+from orderbook.book_side import BookSide
+from orderbook.fill_buffer import FillBuffer
+from orderbook.journal import Journal, load_snapshot, read_journal
+from orderbook.market_data_feed import BestBidOffer, MarketDataFeed
+from orderbook.price_level import PriceLevel
+from orderbook.self_trade_prevention import SelfTradePrevention
+from orderbook.stop_book import StopBook
+from orderbook.trade_statistics import RollingStatistics, TradeStatistics
 from position_keeping.trade import Trade
 
 
 class MatchingEngine:
     """ implements an order book on one security
     """
-    def __init__(self):
-        """ initialize
+    def __init__(self,
+                 tape_writer: BinaryTapeWriter = None,
+                 tick_size: float = None,
+                 journal: Journal = None,
+                 lazy_trades: bool = False,
+                 self_trade_prevention: SelfTradePrevention =
+                 SelfTradePrevention.NONE,
+                 tape_capacity: int = None,
+                 statistics_window: float = None):
+        """ initialize, with tape_writer set all trades are also written to
+        that binary tape, with tick_size set prices are kept in integer ticks
+        and limits must be a multiple of the tick size, with journal set all
+        events are journaled, with lazy_trades set fills are recorded in a
+        fill buffer, self_trade_prevention sets how orders of the same
+        dealer or broker that would trade are handled, with tape_capacity set
+        only the last trades are kept on the tape, with statistics_window set
+        trade statistics are also kept over that number of seconds
         """
-        self.tape = []
-        self.bids = SortedList()
-        self.asks = SortedList()
+        if lazy_trades:
+            assert tape_capacity is None, 'fill buffer has no capacity'
+            self.fills = FillBuffer()
+            self.tape = self.fills
+        else:
+            self.fills = None
+            self.tape = [] if tape_capacity is None else \
+                deque(maxlen=tape_capacity)
+        self.statistics = TradeStatistics()
+        if statistics_window is None:
+            self.rolling_statistics = None
+        else:
+            self.rolling_statistics = RollingStatistics(statistics_window)
+        self.tape_writer = tape_writer
+        self.journal = journal
+        self.tick_size = tick_size
+        if tick_size is not None:
+            assert tick_size > 0
+            exponent = Decimal(str(tick_size)).normalize().as_tuple().exponent
+            self._tick_digits = max(0, -exponent)
+        self.bids = BookSide(Side.BID)
+        self.asks = BookSide(Side.ASK)
+        self.orders = {}    # order id -> resting order
+        self.participants = {}  # dealer or broker -> order id -> order
+        self.self_trade_prevention = SelfTradePrevention(self_trade_prevention)
+        self.stops = StopBook()
+        self.last_price = None
+        self.in_auction = False
+        self.market_data_feed = MarketDataFeed(self)
+        self.best_bid_offer = BestBidOffer()
+        self._top_changed = False
 
     def match_order(self, quote: Dict):
         """ process order given in argument quote
         """
-        order = create_order(quote)
+        return self.submit_order(create_order(quote), quote)
+
+    def submit_order(self, order: Order, quote: Dict):
+        """ process an order created from quote with create_order, for
+        callers that need the order id before the order is matched
+        """
+        self._validate(order)
+        if self.journal is not None:
+            self._journal_order(order, quote)
+
+        retval = self._process_order(order)
+        self._checkpoint()
+
+        return retval
+
+    def match_orders(self,
+                     quotes: Union[Iterable[Dict], Mapping[str, Iterable]],
+                     fast: bool = False) -> List[Trade]:
+        """ process a batch of orders, returns the trades of all orders
+
+        quotes is either an iterable of quote dicts or a columnar batch, a
+        mapping from quote field to a sequence of values. with fast set the
+        per order debug logging of the book and the order factory checks are
+        skipped
+        """
+        if isinstance(quotes, Mapping):
+            quotes = _quotes_from_columns(quotes)
+
+        if self.fills is not None:
+            start = len(self.fills)
+            trades = None
+        else:
+            trades = []
+
+        if fast:
+            for quote in quotes:
+                order = ORDER_TYPES[quote['type']](quote)
+                self._validate(order)
+                if self.journal is not None:
+                    self._journal_order(order, quote)
+                self._match(order, trades)
+            self._checkpoint()
+        else:
+            for quote in quotes:
+                trades_of_order, _ = self.match_order(quote)
+                if trades is not None:
+                    trades.extend(trades_of_order)
+
+        if self.fills is not None:
+            return self.fills.view(start)
+
+        return trades
+
+    def cancel_order(self, order_id: int) -> Order:
+        """ take a resting order out of the book, returns the cancelled order
+        """
+        order = self._cancel(order_id)
+        self._update_best_bid_offer()
+
+        if self.journal is not None:
+            self.journal.record('cancel', order_id)
+            self._checkpoint()
+
+        return order
+
+    def _cancel(self, order_id: int) -> Order:
+        """ take a resting order out of the book
+        """
+        if order_id in self.stops:
+            order = self.stops.remove(order_id)
+            self._unindex(order)
+            return order
+
+        order = self.orders.pop(order_id)
+        self._unindex(order)
+        orders = self.bids if order.side == Side.BID else self.asks
+        self._level_changed(orders.side, orders.remove(order))
+
+        logging.debug('cancelled %s', order)
+
+        return order
+
+    def cancel_participant(self, dealer_or_broker_id: str) -> List[Order]:
+        """ cancel all resting and stop orders of a dealer or broker,
+        returns the cancelled orders
+        """
+        cancelled = self._cancel_participant(dealer_or_broker_id)
+        self._update_best_bid_offer()
+
+        if self.journal is not None:
+            self.journal.record('cancel_participant', dealer_or_broker_id)
+            self._checkpoint()
+
+        return cancelled
+
+    def _cancel_participant(self, dealer_or_broker_id: str) -> List[Order]:
+        """ cancel all resting and stop orders of a dealer or broker
+        """
+        orders = self.participants.get(dealer_or_broker_id, {})
+
+        return [self._cancel(order_id) for order_id in list(orders)]
+
+    def amend_order(self,
+                    order_id: int,
+                    quantity: int = None,
+                    price: float = None):
+        """ modify quantity and/or price of a resting order
+
+        a quantity decrease keeps the time priority of the order, a price
+        change or a quantity increase is processed as a new order with the
+        same order id, it may trade and otherwise goes to the back of the
+        queue on its new level. the quantity of an iceberg is its visible
+        part plus its reserve, a decrease is taken from the reserve first
+        """
+        order = self.orders[order_id]
+        if quantity is not None:
+            assert quantity >= 0
+
+        retval = self._amend(order, quantity, price)
+        self._checkpoint()
+
+        return retval
+
+    def _amend(self, order: Order, quantity: int, price: float):
+        """ modify quantity and/or price of a resting order, the amend is
+        journaled once the price is checked
+        """
+        orders = self.bids if order.side == Side.BID else self.asks
+        if price is not None:
+            # checked before the order leaves the book or is journaled
+            price = self._limit(price)
+
+        if self.journal is not None:
+            self.journal.record('amend', order.order_id, quantity, price)
+
+        iceberg = isinstance(order, IcebergOrder)
+        total = order.quantity + order.hidden_quantity if iceberg \
+            else order.quantity
+        if quantity is None:
+            quantity = total
+
+        if quantity == 0:
+            self._cancel(order.order_id)
+            self._update_best_bid_offer()
+            return [], None
+
+        if (price is None or price == order.limit) and quantity <= total:
+            visible = min(quantity, order.quantity)
+            if iceberg:
+                order.hidden_quantity = quantity - visible
+            self._level_changed(orders.side, orders.reduce(order, visible))
+            self._update_best_bid_offer()
+            logging.debug('amended %s', order)
+            return [], order
+
+        self._cancel(order.order_id)
+        order.quantity = quantity
+        if iceberg:
+            order.hidden_quantity = 0
+        if price is not None:
+            order.limit = price
+            order.ticks = order.limit
+
+        return self._process_order(order)
+
+    def start_auction(self):
+        """ start the call phase, orders are collected in the book without
+        matching until uncross
+        """
+        self.in_auction = True
+
+        if self.journal is not None:
+            self.journal.record('auction')
+            self._checkpoint()
+
+    def indicative_price(self) -> AuctionPrice:
+        """ price, volume and imbalance if the book were uncrossed now
+        """
+        return equilibrium_price(self.bids, self.asks, self.last_price)
+
+    def uncross(self) -> List[Trade]:
+        """ end the call phase, all crossing orders trade at the equilibrium
+        price and unfilled market orders are cancelled, returns the trades
+        """
+        if self.journal is not None:
+            self.journal.record('uncross')
+
+        if self.fills is not None:
+            start = len(self.fills)
+            self._uncross(None)
+            trades = self.fills.view(start)
+        else:
+            trades = []
+            self._uncross(trades)
+
+        self._checkpoint()
+
+        return trades
+
+    def _uncross(self, trades: List[Trade]):
+        """ execute the auction, bids trade in priority against asks in
+        priority, the bid is recorded as the aggressor
+        """
+        self.in_auction = False
+        auction_price = self.indicative_price()
+        logging.debug('uncross at %s', auction_price)
+
+        remaining = auction_price.volume
+        while remaining:
+            bid = self.bids.best().first()
+            ask = self.asks.best().first()
+            quantity = min(bid.quantity, ask.quantity, remaining)
+            self._trade(bid, ask, auction_price.price, quantity, trades)
+            remaining -= quantity
+
+            for orders, order in ((self.bids, bid), (self.asks, ask)):
+                self._level_changed(orders.side, orders.fill(quantity))
+                if not order.quantity:
+                    self._filled(orders, order)
+
+        # market orders do not rest after the auction
+        for orders, ticks in ((self.bids, math.inf), (self.asks, 0)):
+            level = orders.levels.get(ticks)
+            if level is not None:
+                for order in [order for order in level
+                              if isinstance(order, MarketOrder)]:
+                    self._cancel(order.order_id)
+
+        if self.stops and auction_price.volume:
+            self._trigger_stops(trades)
+
+        self._update_best_bid_offer()
+
+    def _validate(self, order: Order):
+        """ the checks of _match that reject an order, done on arrival so a
+        rejected order is never journaled and the limit of a stop is checked
+        before the stop waits in the stop book
+        """
+        self._limit(order.limit)
+        if self.in_auction:
+            resting_stop = order.stop_price is not None and \
+                (self.last_price is None or
+                 not self.stops.is_triggered(order, self.last_price))
+            assert resting_stop or order.time_in_force == TimeInForce.GTC, \
+                'only good till cancel orders in the call phase'
+
+    def _journal_order(self, order: Order, quote: Dict):
+        """ record an accepted order with its id and time
+        """
+        self.journal.record_order(dict(quote,
+                                       order_id=order.order_id,
+                                       timestamp=order.timestamp))
+
+    def _checkpoint(self):
+        """ write a snapshot when the journal asks for one
+        """
+        if self.journal is not None and self.journal.snapshot_due():
+            self.journal.write_snapshot(self.snapshot_state())
+
+    def snapshot_state(self) -> Dict:
+        """ state of the book, the journal pickles it as snapshot
+        """
+        return {'bids': self.bids,
+                'asks': self.asks,
+                'orders': self.orders,
+                'stops': self.stops,
+                'last_price': self.last_price,
+                'in_auction': self.in_auction,
+                'statistics': self.statistics,
+                'rolling_statistics': self.rolling_statistics,
+                'best_bid_offer': self.best_bid_offer}
+
+    def restore_state(self, state: Dict):
+        """ continue from a state returned by snapshot_state
+        """
+        self.bids = state['bids']
+        self.asks = state['asks']
+        self.orders = state['orders']
+        self.stops = state['stops']
+        self.participants = {}
+        for order in self.orders.values():
+            self._index(order)
+        for order in self.stops.orders.values():
+            self._index(order)
+        self.last_price = state['last_price']
+        self.in_auction = state.get('in_auction', False)
+        self.statistics = state.get('statistics', self.statistics)
+        self.rolling_statistics = state.get('rolling_statistics',
+                                            self.rolling_statistics)
+        self.best_bid_offer = state['best_bid_offer']
+        if 'last_order_id' in state:
+            Order.skip_ids(state['last_order_id'])
+
+    def replay(self, records: Iterable[Tuple]):
+        """ rebuild the book from journal records, trades are skipped as the
+        orders reproduce them. nothing is journaled, written to the tape or
+        logged during replay
+        """
+        journal, self.journal = self.journal, None
+        tape_writer, self.tape_writer = self.tape_writer, None
+        last_order_id = 0
+        try:
+            for record in records:
+                kind = record[1]
+                if kind == 'order':
+                    quote = record[2]
+                    order = ORDER_TYPES[quote['type']](quote)
+                    # replayed orders keep their journaled id
+                    order.order_id = quote['order_id']
+                    self._match(order, [])
+                    last_order_id = max(last_order_id, quote['order_id'])
+                elif kind == 'cancel':
+                    self._cancel(record[2])
+                    self._update_best_bid_offer()
+                elif kind == 'cancel_participant':
+                    self._cancel_participant(record[2])
+                    self._update_best_bid_offer()
+                elif kind == 'auction':
+                    self.in_auction = True
+                elif kind == 'uncross':
+                    self._uncross([])
+                elif kind == 'amend':
+                    self._amend(self.orders[record[2]], record[3], record[4])
+        finally:
+            self.journal = journal
+            self.tape_writer = tape_writer
+
+        Order.skip_ids(last_order_id)
+
+    @classmethod
+    def recover(cls,
+                journal_filename: str,
+                snapshot_filename: str = None,
+                **kwargs):
+        """ engine with the book of a journal, starting from the snapshot if
+        there is one, kwargs are passed to the constructor
+        """
+        engine = cls(**kwargs)
+        sequence = 0
+        if snapshot_filename is not None and \
+                os.path.exists(snapshot_filename):
+            state = load_snapshot(snapshot_filename)
+            engine.restore_state(state)
+            sequence = state['sequence']
+
+        engine.replay(record for record in read_journal(journal_filename)
+                      if record[0] > sequence)
 
+        return engine
+
+    def _process_order(self, order: Order):
+        """ match order against the book and rest the remaining quantity
+        """
         logging.debug('before processing asks are %s', self.asks)
         logging.debug('before processing bids are %s', self.bids)
 
-        trades = []
+        if self.fills is not None:
+            start = len(self.fills)
+            order_in_book = self._match(order, None)
+            trades = self.fills.view(start)
+        else:
+            trades = []
+            order_in_book = self._match(order, trades)
+
+        logging.debug('after processing asks are %s', self.asks)
+        logging.debug('after processing bids are %s', self.bids)
+        logging.debug('after processing trades are %s', trades)
+
+        return trades, order_in_book
+
+    def _match(self, order: Order, trades: List[Trade]) -> Order:
+        """ match order against the book, trades are appended to trades or
+        recorded in the fill buffer, the remaining quantity is added to the
+        book and the order in the book is returned
+        """
+        if order.stop_price is not None:
+            if self.last_price is None or \
+                    not self.stops.is_triggered(order, self.last_price):
+                self.stops.add(order)
+                self._index(order)
+                return order
+
+            order.stop_price = None
+
+        if self.tick_size is not None and not math.isinf(order.limit):
+            order.ticks = self.to_ticks(order.limit)
+            order.limit = self.from_ticks(order.ticks)
+
+        if self.in_auction:
+            assert order.time_in_force == TimeInForce.GTC, \
+                'only good till cancel orders in the call phase'
+            self._rest(order)
+            self._update_best_bid_offer()
+            return order
+
         orders = self.asks if order.side == Side.BID else self.bids
 
+        if order.time_in_force == TimeInForce.FOK and \
+                not self._can_fill(order, orders):
+            return None
+
+        # prices of the first and last trade of the sweep
+        first_price = last_price = None
         while orders and order.quantity > 0:
-            if order.matches(orders[0]):
-                trade = Trade(order, orders[0])
-                order.quantity -= trade.quantity
-                orders[0].quantity -= trade.quantity
+            matched_order = orders.best().first()
+            if not order.matches(matched_order):
+                break
 
-                self.tape.append(trade)
-                trades.append(trade)
+            if self.self_trade_prevention and \
+                    order.dealer_or_broker_id == \
+                    matched_order.dealer_or_broker_id:
+                if not self._prevent_self_trade(order, matched_order, orders):
+                    break
+                continue
 
-                if not orders[0].quantity:
-                    orders.pop(0)
+            if order.quantity < matched_order.quantity:
+                quantity = order.quantity
             else:
-                break
+                quantity = matched_order.quantity
+            self._trade(order, matched_order, matched_order.limit, quantity,
+                        trades)
+            if first_price is None:
+                first_price = matched_order.limit
+            last_price = matched_order.limit
+
+            order.quantity -= quantity
+            self._level_changed(orders.side, orders.fill(quantity))
 
-            logging.debug('orders: %s, trades: %s, remaining quantity: %s',
-                          orders, trades, order.quantity)
+            if not matched_order.quantity:
+                self._filled(orders, matched_order)
 
         # If not fully filled update the book with a new order
         # with remaining quantity
-        if order.quantity > 0:
-            orders = self.asks if order.side == Side.ASK else self.bids
-            orders.add(order)
-            order_in_book = order
+        if order.quantity > 0 and order.time_in_force == TimeInForce.GTC:
+            self._rest(order)
         else:
-            order_in_book = None
+            order = None
 
-        logging.debug('after processing asks are %s', self.asks)
-        logging.debug('after processing bids are %s', self.bids)
-        logging.debug('after processing trades are %s', trades)
+        if self.stops and first_price is not None:
+            self._trigger_stops(trades, min(first_price, last_price),
+                                max(first_price, last_price))
 
-        return trades, order_in_book
+        self._update_best_bid_offer()
+
+        return order
+
+    def _trigger_stops(self,
+                       trades: List[Trade],
+                       low: float = None,
+                       high: float = None):
+        """ match the stop orders triggered by trades from low to high, by
+        the last price without a range. a sweep through several levels
+        triggers the stops on every level it traded
+        """
+        if low is None:
+            low = high = self.last_price
+
+        for stop_order in self.stops.triggered(low, high):
+            self._unindex(stop_order)
+            stop_order.stop_price = None
+            self._match(stop_order, trades)
+
+    def _trade(self,
+               order: Order,
+               matched_order: Order,
+               price: float,
+               quantity: int,
+               trades: List[Trade]):
+        """ record a trade of order against matched_order, on the tape and
+        in trades or in the fill buffer
+        """
+        if self.fills is not None:
+            if order.side == Side.BID:
+                self.fills.append(price, quantity,
+                                  order.dealer_or_broker_id,
+                                  matched_order.dealer_or_broker_id,
+                                  order.order_id, matched_order.order_id,
+                                  order.side)
+            else:
+                self.fills.append(price, quantity,
+                                  matched_order.dealer_or_broker_id,
+                                  order.dealer_or_broker_id,
+                                  order.order_id, matched_order.order_id,
+                                  order.side)
+        else:
+            trade = Trade(order, matched_order, price, quantity)
+            self.tape.append(trade)
+            trades.append(trade)
+
+        self.last_price = price
+        self.statistics.update(price, quantity)
+        if self.rolling_statistics is not None:
+            self.rolling_statistics.update(
+                price, quantity, to_nanoseconds(order.timestamp) * 1e-9)
+        if self.journal is not None:
+            self.journal.record('trade', price, quantity, order.order_id,
+                                matched_order.order_id)
+        if self.tape_writer is not None:
+            self.tape_writer.write(to_nanoseconds(order.timestamp),
+                                   price, quantity, order.order_id,
+                                   matched_order.order_id, order.side)
+
+    def _rest(self, order: Order):
+        """ add order to the book and the order indexes
+        """
+        if isinstance(order, IcebergOrder):
+            order.hide()
+        orders = self.asks if order.side == Side.ASK else self.bids
+        self._level_changed(orders.side, orders.add(order))
+        self.orders[order.order_id] = order
+        self._index(order)
+
+    def _prevent_self_trade(self,
+                            order: Order,
+                            matched_order: Order,
+                            orders: BookSide) -> bool:
+        """ apply self-trade prevention to order and the resting
+        matched_order of the same dealer or broker on orders, returns if the
+        order can continue matching
+        """
+        logging.debug('self trade of %s with %s', order, matched_order)
+
+        if self.self_trade_prevention == SelfTradePrevention.CANCEL_NEWEST:
+            order.quantity = 0
+            return False
+
+        if self.self_trade_prevention == SelfTradePrevention.CANCEL_OLDEST:
+            self._cancel(matched_order.order_id)
+            return True
+
+        # decrement both orders by the smaller quantity without a trade, an
+        # iceberg shows the next part of its reserve as after a fill
+        quantity = min(order.quantity, matched_order.quantity)
+        order.quantity -= quantity
+        self._level_changed(orders.side, orders.fill(quantity))
+        if not matched_order.quantity:
+            self._filled(orders, matched_order)
+
+        return order.quantity > 0
+
+    def _index(self, order: Order):
+        """ add order to the orders of its dealer or broker
+        """
+        participant = self.participants.get(order.dealer_or_broker_id)
+        if participant is None:
+            participant = {}
+            self.participants[order.dealer_or_broker_id] = participant
+
+        participant[order.order_id] = order
+
+    def _unindex(self, order: Order):
+        """ remove order from the orders of its dealer or broker
+        """
+        participant = self.participants[order.dealer_or_broker_id]
+        del participant[order.order_id]
+        if not participant:
+            del self.participants[order.dealer_or_broker_id]
+
+    def _can_fill(self, order: Order, orders: BookSide) -> bool:
+        """ is there enough visible volume in orders to fill order, with
+        self-trade prevention the orders of its own dealer or broker do not
+        count
+        """
+        quantity = order.quantity
+        for level in orders.levels.values():
+            if not order.matches(level.first()):
+                break
+
+            if not self.self_trade_prevention:
+                quantity -= level.volume
+            else:
+                for resting in level:
+                    if resting.dealer_or_broker_id == \
+                            order.dealer_or_broker_id:
+                        if self.self_trade_prevention == \
+                                SelfTradePrevention.CANCEL_NEWEST:
+                            return False
+                        continue
+
+                    quantity -= resting.quantity
+                    if quantity <= 0:
+                        return True
+
+            if quantity <= 0:
+                return True
+
+        return False
+
+    def _filled(self, orders: BookSide, order: Order):
+        """ order in the book is filled, take it out of the index unless it
+        is an iceberg with reserve left
+        """
+        if isinstance(order, IcebergOrder) and order.hidden_quantity:
+            order.replenish()
+            self._level_changed(orders.side, orders.add(order))
+        else:
+            del self.orders[order.order_id]
+            self._unindex(order)
+
+    def _level_changed(self, side: Side, level: PriceLevel):
+        """ publish the new volume of level on side
+        """
+        if side == Side.BID:
+            best = self.best_bid_offer.bid
+            if best is None or level.price >= best:
+                self._top_changed = True
+        else:
+            best = self.best_bid_offer.ask
+            if best is None or level.price <= best:
+                self._top_changed = True
+
+        if self.market_data_feed.active:
+            self.market_data_feed.publish(side, level.price, level.volume)
+
+    def _update_best_bid_offer(self):
+        """ recalculate the best bid and offer if the top of the book was
+        touched, subscribers are only notified when it changed
+        """
+        if not self._top_changed:
+            return
+
+        self._top_changed = False
+        bid = self.bids.best()
+        ask = self.asks.best()
+        best_bid_offer = BestBidOffer(
+            bid=None if bid is None else bid.price,
+            bid_volume=0 if bid is None else bid.volume,
+            ask=None if ask is None else ask.price,
+            ask_volume=0 if ask is None else ask.volume)
+
+        if best_bid_offer != self.best_bid_offer:
+            self.best_bid_offer = best_bid_offer
+            self.market_data_feed.publish_best_bid_offer(best_bid_offer)
 
     def get_volume_at_price(self, side: str, price: float) -> int:
         """ get the volume available in the orderbook
         """
         bid_or_ask = Side[side.upper()]
-        volume = 0
+        orders = self.bids if bid_or_ask == Side.BID else self.asks
 
+        if self.tick_size is not None:
+            price = self.to_ticks(price)
+
+        return orders.volume_at(price)
+
+    def get_depth(self,
+                  side: str,
+                  levels: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """ prices and aggregated volumes of the best levels of side as
+        numpy arrays, all levels if levels is None
+        """
+        bid_or_ask = Side[side.upper()]
         orders = self.bids if bid_or_ask == Side.BID else self.asks
 
-        for i in orders:
-            if i.limit == price:
-                volume += i.quantity
+        return orders.depth_arrays(levels)
 
-        return volume
+    def get_depth_all(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """ full ladder, prices and volumes of all levels per side
+        """
+        return {'bid': self.bids.depth_arrays(),
+                'ask': self.asks.depth_arrays()}
+
+    def to_ticks(self, price: float) -> int:
+        """ price in integer ticks, price must be on the tick grid
+        """
+        ticks = round(price / self.tick_size)
+        assert math.isclose(ticks * self.tick_size, price,
+                            rel_tol=1e-9, abs_tol=self.tick_size * 1e-6), \
+            'price %s is not a multiple of tick size %s' % (price,
+                                                            self.tick_size)
+        return ticks
+
+    def _limit(self, price: float) -> float:
+        """ price as float, price must be on the tick grid
+        """
+        price = float(price)
+        if self.tick_size is not None and not math.isinf(price):
+            self.to_ticks(price)
+
+        return price
+
+    def from_ticks(self, ticks: int) -> float:
+        """ price of a number of ticks
+        """
+        return round(ticks * self.tick_size, self._tick_digits)
 
     def get_best_bid(self) -> float:
-        """ get best bid from orderbook
+        """ get best bid from orderbook, None if there are no bids
         """
-        return self.bids[0].limit
+        return self.best_bid_offer.bid
 
     def get_worst_bid(self) -> float:
         """ get worst bid from orderbook
@@ -93,9 +830,14 @@ class MatchingEngine:
         return self.bids[-1].limit
 
     def get_best_ask(self) -> float:
-        """ get best ask from orderbook
+        """ get best ask from orderbook, None if there are no asks
+        """
+        return self.best_bid_offer.ask
+
+    def get_spread(self) -> float:
+        """ best ask minus best bid, None if a side is empty
         """
-        return self.asks[0].limit
+        return self.best_bid_offer.spread
 
     def get_worst_ask(self) -> float:
         """ get worst ask from orderbook
@@ -106,7 +848,9 @@ class MatchingEngine:
                   filename: str,
                   filemode: str = 'w',
                   tapemode: str = None):
-        """ write trades to file in arg filename
+        """ write trades to file in arg filename, with tapemode wipe the
+        tape is emptied. a fill buffer is replaced by a new one, views on
+        the fills returned before keep reading the old buffer
         """
         with open(filename, filemode) as dumpfile:
             template = 'Price: %s, Quantity: %s\n'
@@ -114,7 +858,11 @@ class MatchingEngine:
                 dumpfile.write(template % (i['price'], i['quantity']))
 
         if tapemode == 'wipe':
-            self.tape = []
+            if self.fills is not None:
+                self.fills = FillBuffer(self.fills.capacity)
+                self.tape = self.fills
+            else:
+                self.tape.clear()
 
     def __str__(self):
         """ orderbook representation
@@ -136,3 +884,11 @@ class MatchingEngine:
                 break
 
         return ret + '\n'
+
+
+def _quotes_from_columns(columns: Mapping[str, Iterable]):
+    """ turn a columnar batch of quotes into quote dicts
+    """
+    fields = list(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(fields, values))
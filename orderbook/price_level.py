@@ -0,0 +1,82 @@
+""" all orders resting at a single price in the order book
+
+orders are kept in a fifo queue so time priority within the level is
+preserved, the total volume of the level is maintained on every change so
+depth queries do not have to walk the orders. the queue is an ordered dict
+keyed on order id, this allows removal of any order in constant time.
+"""
+from collections import OrderedDict
+
+from market.order import Order
+
+
+class PriceLevel:
+    """ fifo queue of orders at one price with a running total volume
+    """
+    def __init__(self, ticks, price: float):
+        """ initialize an empty level, ticks is the key of the level in the
+        book, price the limit of its orders
+        """
+        self.ticks = ticks
+        self.price = price
+        self.orders = OrderedDict()
+        self.volume = 0
+
+    def append(self, order: Order):
+        """ add order at the back of the queue
+        """
+        self.orders[order.order_id] = order
+        self.volume += order.quantity
+
+    def first(self) -> Order:
+        """ order with time priority on this level
+        """
+        return next(iter(self.orders.values()))
+
+    def last(self) -> Order:
+        """ order that arrived last on this level
+        """
+        return next(reversed(self.orders.values()))
+
+    def fill(self, quantity: int) -> bool:
+        """ take quantity from the first order in the queue, returns True if
+        that order is fully filled and removed from the level
+        """
+        order = self.first()
+        order.quantity -= quantity
+        self.volume -= quantity
+
+        if order.quantity:
+            return False
+
+        self.orders.popitem(last=False)
+        return True
+
+    def remove(self, order: Order):
+        """ take order out of the queue
+        """
+        del self.orders[order.order_id]
+        self.volume -= order.quantity
+
+    def reduce(self, order: Order, quantity: int):
+        """ lower the quantity of order, it keeps its place in the queue
+        """
+        assert quantity <= order.quantity
+        self.volume -= order.quantity - quantity
+        order.quantity = quantity
+
+    def __len__(self):
+        """ number of orders on this level
+        """
+        return len(self.orders)
+
+    def __iter__(self):
+        """ orders in time priority
+        """
+        return iter(self.orders.values())
+
+    def __repr__(self):
+        """ for debugging and printing
+        """
+        return '%s: %s %s' % (self.price, self.volume,
+                              list(self.orders.values()))
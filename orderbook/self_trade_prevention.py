@@ -0,0 +1,19 @@
+"""
+self-trade prevention mode of an order book
+"""
+from enum import IntEnum
+# pylint: disable=no-member
+
+
+class SelfTradePrevention(IntEnum):
+    """what happens when an order would trade with an order of the same
+    dealer or broker: nothing, the incoming order is cancelled, the resting
+    order is cancelled, or both are decremented by the smaller quantity"""
+    NONE = 0
+    CANCEL_NEWEST = 1
+    CANCEL_OLDEST = 2
+    DECREMENT = 3
+
+    def __str__(self) -> str:
+        """prints none, cancel_newest, cancel_oldest or decrement"""
+        return super().name.lower()
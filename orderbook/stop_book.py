@@ -0,0 +1,88 @@
+""" stop orders waiting for their trigger
+
+buy stops trigger when the market trades at or above the stop price, sell
+stops when it trades at or below. both are kept in a sorted map from stop
+price to a fifo queue of orders, ordered so the stops closest to triggering
+come first. checking a trade price is a look at the first key of each map.
+"""
+from collections import OrderedDict
+from operator import neg
+from typing import List
+
+from sortedcontainers import SortedDict
+
+from market.order import Order
+from market.side import Side
+
+
+class StopBook:
+    """ untriggered stop and stop limit orders
+    """
+    def __init__(self):
+        """ initialize
+        """
+        self.buy_stops = SortedDict()
+        self.sell_stops = SortedDict(neg)
+        self.orders = {}    # order id -> stop order
+
+    @staticmethod
+    def is_triggered(order: Order, price: float) -> bool:
+        """ does a trade at price trigger the stop of order
+        """
+        if order.side == Side.BID:
+            return price >= order.stop_price
+
+        return price <= order.stop_price
+
+    def add(self, order: Order):
+        """ add a stop order
+        """
+        stops = self.buy_stops if order.side == Side.BID else self.sell_stops
+        queue = stops.get(order.stop_price)
+        if queue is None:
+            queue = OrderedDict()
+            stops[order.stop_price] = queue
+
+        queue[order.order_id] = order
+        self.orders[order.order_id] = order
+
+    def remove(self, order_id: int) -> Order:
+        """ take the stop order with order_id out, returns the order
+        """
+        order = self.orders.pop(order_id)
+        stops = self.buy_stops if order.side == Side.BID else self.sell_stops
+        queue = stops[order.stop_price]
+        del queue[order_id]
+        if not queue:
+            del stops[order.stop_price]
+
+        return order
+
+    def triggered(self, low: float, high: float = None) -> List[Order]:
+        """ take out all stops triggered by trades at prices from low to
+        high, a single price without high, in order of stop price and
+        arrival
+        """
+        if high is None:
+            high = low
+
+        orders = []
+        for stops in (self.buy_stops, self.sell_stops):
+            while stops:
+                stop_price, queue = stops.peekitem(0)
+                if stops is self.buy_stops and high < stop_price or \
+                        stops is self.sell_stops and low > stop_price:
+                    break
+
+                del stops[stop_price]
+                for order in queue.values():
+                    del self.orders[order.order_id]
+                    orders.append(order)
+
+        return orders
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self.orders
+
+    def __len__(self):
+        return len(self.orders)
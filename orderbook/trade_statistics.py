@@ -0,0 +1,135 @@
+""" running statistics of the trades of an order book
+
+statistics are updated on every trade so reading them takes constant time,
+no trades have to be kept. session statistics cover all trades since the
+last reset. rolling statistics cover the trades of a time window ending at
+the last trade or the last call of expire, they keep the price and quantity
+of the trades in the window. the clock of the window never goes back, a trade
+stamped before the last trade, such as a triggered stop or an auction bid
+that carries the time it was entered, counts at the time of the last trade. the high and low of the window are kept in
+monotonic queues, so sliding the window is amortized constant time per trade.
+"""
+from collections import deque
+
+
+class TradeStatistics:
+    """ volume weighted average price, volume, number of trades, high, low
+    and last price of the trades since the last reset
+    """
+    def __init__(self):
+        """ initialize
+        """
+        self.reset()
+
+    def reset(self):
+        """ start a new session
+        """
+        self.count = 0
+        self.volume = 0
+        self.notional = 0.0
+        self.high = None
+        self.low = None
+        self.last = None
+
+    def update(self, price: float, quantity: int):
+        """ add a trade
+        """
+        self.count += 1
+        self.volume += quantity
+        self.notional += price * quantity
+        self.last = price
+        if self.high is None or price > self.high:
+            self.high = price
+        if self.low is None or price < self.low:
+            self.low = price
+
+    @property
+    def vwap(self) -> float:
+        """ volume weighted average price, None without volume
+        """
+        if not self.volume:
+            return None
+
+        return self.notional / self.volume
+
+
+class RollingStatistics:
+    """ trade statistics over a sliding time window
+    """
+    def __init__(self, window: float):
+        """ initialize, window in seconds
+        """
+        assert window > 0
+        self.window = window
+        self.trades = deque()   # time, price, quantity
+        self._highs = deque()   # time, price with decreasing prices
+        self._lows = deque()    # time, price with increasing prices
+        self.volume = 0
+        self.notional = 0.0
+        self.last = None
+
+    def update(self, price: float, quantity: int, time: float):
+        """ add a trade at time in seconds, no earlier than the last trade
+        """
+        if self.trades and time < self.trades[-1][0]:
+            time = self.trades[-1][0]
+
+        self.trades.append((time, price, quantity))
+        self.volume += quantity
+        self.notional += price * quantity
+        self.last = price
+
+        while self._highs and self._highs[-1][1] <= price:
+            self._highs.pop()
+        self._highs.append((time, price))
+        while self._lows and self._lows[-1][1] >= price:
+            self._lows.pop()
+        self._lows.append((time, price))
+
+        self.expire(time)
+
+    def expire(self, time: float):
+        """ slide the window to end at time in seconds
+        """
+        start = time - self.window
+        trades = self.trades
+        while trades and trades[0][0] <= start:
+            _, price, quantity = trades.popleft()
+            self.volume -= quantity
+            self.notional -= price * quantity
+
+        while self._highs and self._highs[0][0] <= start:
+            self._highs.popleft()
+        while self._lows and self._lows[0][0] <= start:
+            self._lows.popleft()
+
+        if not trades:
+            self.notional = 0.0
+            self.last = None
+
+    @property
+    def count(self) -> int:
+        """ number of trades in the window
+        """
+        return len(self.trades)
+
+    @property
+    def high(self) -> float:
+        """ highest price in the window, None without trades
+        """
+        return self._highs[0][1] if self._highs else None
+
+    @property
+    def low(self) -> float:
+        """ lowest price in the window, None without trades
+        """
+        return self._lows[0][1] if self._lows else None
+
+    @property
+    def vwap(self) -> float:
+        """ volume weighted average price in the window, None without volume
+        """
+        if not self.volume:
+            return None
+
+        return self.notional / self.volume
@@ -23,14 +23,37 @@ class Position:
         self.update_unrealized_pnl(close)
 
     def append(self, trades: List[Trade]):
+        if hasattr(trades, 'columns'):
+            self.append_fills(trades)
+            return
+
         for trade in trades:
-            if trade["buyer"] == OUR_CPTY:
+            if trade.buyer == OUR_CPTY:
                 self.buys += trade.quantity
                 self.position_value -= trade.quantity * trade.price
             else:
                 self.sells += trade.quantity
                 self.position_value += trade.quantity * trade.price
 
+        self.update_net()
+
+    def append_fills(self, fills):
+        """fills is a fill buffer or a view on one, the columns are
+        aggregated without building trades"""
+        columns = fills.columns()
+        quantity = columns['quantity']
+        value = quantity * columns['price']
+        # without a code we never traded, codes are not negative
+        bought = columns['buyer'] == fills.codes.get(OUR_CPTY, -1)
+
+        self.buys += int(quantity[bought].sum())
+        self.sells += int(quantity[~bought].sum())
+        self.position_value += float(value[~bought].sum() -
+                                     value[bought].sum())
+
+        self.update_net()
+
+    def update_net(self):
         self.net = self.buys - self.sells
 
         if self.net > 0:
@@ -1,78 +1,91 @@
 """
 trade
 """
-from market.limit_order import LimitOrder
-from market.market_order import MarketOrder
 from market.order import Order
 from market.side import Side
 
+ITEMS = frozenset(('price', 'quantity', 'buyer', 'seller'))
+
 
 class Trade:
-    """trade based on order and matching order from book"""
-    def __init__(self, order: Order, matched_order: Order):
+    """trade based on order and matching order from book
+
+    the price is the limit of the order in the book unless given, as in an
+    auction. a trade can also be built from a recorded fill with from_fill,
+    it then has no orders.
+    """
+    __slots__ = ('order', 'matched_order', 'price', 'quantity', 'buyer',
+                 'seller', 'aggressor_id', 'resting_id', 'side')
+
+    def __init__(self,
+                 order: Order,
+                 matched_order: Order,
+                 price: float = None,
+                 quantity: int = None):
         """calculate traded quantity based on order and matched order size
+        when not given
         """
         self.order = order
         self.matched_order = matched_order
+        self.price = matched_order.limit if price is None else price
+        self.aggressor_id = order.order_id
+        self.resting_id = matched_order.order_id
+        self.side = order.side
 
         # set trade quantity
-        if self.order.quantity < self.matched_order.quantity:
-            self._quantity = self.order.quantity
+        if quantity is not None:
+            self.quantity = quantity
+        elif order.quantity < matched_order.quantity:
+            self.quantity = order.quantity
         else:
-            self._quantity = self.matched_order.quantity
+            self.quantity = matched_order.quantity
 
-        if isinstance(order, MarketOrder):
-            self._price = matched_order.limit
-        elif isinstance(order, LimitOrder):
-            if order.limit > matched_order.limit:
-                self._price = matched_order.limit
-            else:
-                self._price = order.limit
+        if order.side == Side.BID:
+            self.buyer = order.dealer_or_broker_id
+            self.seller = matched_order.dealer_or_broker_id
         else:
-            raise RuntimeWarning("unexpcted order type {}".
-                                 format(type(order).__name__))
+            self.buyer = matched_order.dealer_or_broker_id
+            self.seller = order.dealer_or_broker_id
 
-    @property
-    def quantity(self) -> int:
-        return self._quantity
+    @classmethod
+    def from_fill(cls,
+                  price: float,
+                  quantity: int,
+                  buyer,
+                  seller,
+                  aggressor_id: int,
+                  resting_id: int,
+                  side: Side = None):
+        """trade from the columns of a recorded fill, side is the side of
+        the aggressor"""
+        trade = cls.__new__(cls)
+        trade.order = None
+        trade.matched_order = None
+        trade.price = price
+        trade.quantity = quantity
+        trade.buyer = buyer
+        trade.seller = seller
+        trade.aggressor_id = aggressor_id
+        trade.resting_id = resting_id
+        trade.side = side
 
-    @property
-    def price(self) -> float:
-        return self._price
+        return trade
 
     def __repr__(self):
-        """for debugging and printing"""
+        """for debugging and printing,
+        quantity @ price (aggressor id/resting id) buyer/seller"""
         attributes = (self.quantity,
-                      self.matched_order.limit,
-                      self.order.order_id,
-                      self.matched_order.order_id,
-                      self.order.dealer_or_broker_id,
-                      self.matched_order.dealer_or_broker_id)
+                      self.price,
+                      self.aggressor_id,
+                      self.resting_id,
+                      self.buyer,
+                      self.seller)
 
         return '%s @ %s (%s/%s) %s/%s' % attributes
 
     def __getitem__(self, item: str):
         """for querying properties in dict style"""
-        if item == 'price':
-            return self.matched_order.limit
-
-        if item == 'quantity':
-            return self.quantity
-
-        if item == 'buyer':
-            if self.order.side == Side.BID:
-                buyer = self.order.dealer_or_broker_id
-            else:
-                buyer = self.matched_order.dealer_or_broker_id
-
-            return buyer
-
-        if item == 'seller':
-            if self.order.side == Side.BID:
-                seller = self.matched_order.dealer_or_broker_id
-            else:
-                seller = self.order.dealer_or_broker_id
-
-            return seller
+        if item in ITEMS:
+            return getattr(self, item)
 
         raise KeyError('Item %s can not be queried in Trade object' % item)
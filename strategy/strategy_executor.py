@@ -63,16 +63,11 @@ class Executor:
         return self.positions[self.symbol]
 
     def send_order_to_market(self, orders: List[Dict]) -> List[Trade]:
-        resulting_trades = []
         for order in orders:
-            msg = "{} Received order: {} {}".format(self.get_trade_date(),
-                                                    order["quantity"],
-                                                    order["symbol"])
-            logging.debug(msg)
-            trades, _ = self.matching_engine.match_order(order)
-            resulting_trades.extend(trades)
-
-        return resulting_trades
+            logging.debug("%s Received order: %s %s", self.get_trade_date(),
+                          order["quantity"], order["symbol"])
+
+        return self.matching_engine.match_orders(orders)
 
     def market_data_tick(self, prices: MarketData):
         self.current_prices = prices
@@ -18,6 +18,7 @@ class BootstrappedCurve(Curve):
         """ Save instrument info by maturity """
         self._curve[bond.maturity_term] = None
         self._instruments[bond.maturity_term] = bond
+        self.invalidate()
 
     @property
     def rates(self) -> List:
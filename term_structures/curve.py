@@ -1,5 +1,8 @@
 """
 Model for a curve made of time/value points with an interpolator
+
+the logarithms of the times and rates used by the interpolator are computed
+once and cached, call invalidate after changing the points of the curve
 """
 from math import exp
 from typing import List
@@ -13,6 +16,13 @@ class Curve:
     """
     def __init__(self, curve):
         self._curve = dict(curve)  # maturity -> rate map
+        self._log_times = None
+        self._log_rates = None
+
+    def invalidate(self):
+        """forget the cached interpolation points"""
+        self._log_times = None
+        self._log_rates = None
 
     @property
     def times(self) -> List[float]:
@@ -41,11 +51,12 @@ class Curve:
         """interpolator, loglinear"""
         if time_arg == 0.0:
             time_arg = 1e-12
-        log_time_arg = log10(time_arg)
-        log_times = log10(self.times)
-        log_factors = log10(self.rates)
+        if self._log_times is None:
+            self._log_times = log10(self.times)
+            self._log_rates = log10(self.rates)
 
-        return 10.0 ** interp(log_time_arg, log_times, log_factors)
+        return 10.0 ** interp(log10(time_arg), self._log_times,
+                              self._log_rates)
 
     def __call__(self, time_arg: float) -> float:
         """call the interpolator"""
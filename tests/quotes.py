@@ -0,0 +1,14 @@
+""" quote dicts for the order book tests
+"""
+from dataclasses import asdict
+from market.quote import Quote
+
+
+def quote(side, price=0.0, quantity=5, broker='AA', order_type='limit',
+          **kwargs):
+    """ quote dict of an order, kwargs add fields such as time_in_force,
+    stop_price or display_quantity
+    """
+    return dict(asdict(Quote(type=order_type, side=side, quantity=quantity,
+                             price=price, dealer_or_broker_id=broker)),
+                **kwargs)
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from orderbook.auction import AuctionPrice, equilibrium_price
+from orderbook.journal import Journal
+from orderbook.matching_engine import MatchingEngine
+from tests.quotes import quote
+
+
+def opening_orders():
+    return [quote('bid', 102, 10, 'AA'),
+            quote('bid', 101, 5, 'BB'),
+            quote('bid', 100, 10, 'CC'),
+            quote('ask', 99, 5, 'DD'),
+            quote('ask', 100, 10, 'EE'),
+            quote('ask', 101, 10, 'FF')]
+
+
+class TestEquilibriumPrice(unittest.TestCase):
+    def setUp(self):
+        self.order_book = MatchingEngine()
+        self.order_book.start_auction()
+        self.order_book.match_orders(opening_orders())
+
+    def test_minimum_imbalance_and_reference(self):
+        # 15 executable at 100 and 101, same imbalance in both directions
+        auction_price = equilibrium_price(self.order_book.bids,
+                                          self.order_book.asks)
+        self.assertEqual(auction_price, AuctionPrice(100, 15, 10))
+        auction_price = equilibrium_price(self.order_book.bids,
+                                          self.order_book.asks,
+                                          reference_price=101.2)
+        self.assertEqual(auction_price, AuctionPrice(101, 15, -10))
+
+    def test_market_orders(self):
+        self.order_book.match_order(quote('bid', 0, 3, 'GG',
+                                          order_type='market'))
+        self.assertEqual(self.order_book.indicative_price(),
+                         AuctionPrice(101, 18, -7))
+
+    def test_no_cross(self):
+        self.assertEqual(equilibrium_price(self.order_book.asks,
+                                           self.order_book.bids),
+                         AuctionPrice())
+        empty = MatchingEngine()
+        self.assertEqual(empty.indicative_price(), AuctionPrice())
+
+
+class TestAuction(unittest.TestCase):
+    def check_uncross(self, order_book):
+        order_book.start_auction()
+        trades = order_book.match_orders(
+            opening_orders() + [quote('bid', 0, 3, 'GG', order_type='market')])
+        self.assertEqual(len(trades), 0)
+        self.assertEqual(order_book.get_best_bid(), float('inf'))
+        self.assertEqual(order_book.get_best_ask(), 99)
+
+        trades = order_book.uncross()
+        self.assertEqual({t['price'] for t in trades}, {101})
+        self.assertEqual(sum(t['quantity'] for t in trades), 18)
+        self.assertEqual([(t['buyer'], t['seller'], t['quantity'])
+                          for t in trades],
+                         [('GG', 'DD', 3), ('AA', 'DD', 2), ('AA', 'EE', 8),
+                          ('BB', 'EE', 2), ('BB', 'FF', 3)])
+        self.assertEqual(order_book.get_best_bid(), 100)
+        self.assertEqual(order_book.get_best_ask(), 101)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 7)
+        self.assertEqual(order_book.last_price, 101)
+        self.assertFalse(order_book.in_auction)
+
+        # back to continuous matching
+        trades, _ = order_book.match_order(quote('bid', 102, 2, 'HH'))
+        self.assertEqual([t['price'] for t in trades], [101])
+
+    def test_uncross(self):
+        self.check_uncross(MatchingEngine())
+
+    def test_lazy_trades(self):
+        self.check_uncross(MatchingEngine(lazy_trades=True))
+
+    def test_tick_size(self):
+        self.check_uncross(MatchingEngine(tick_size=0.5))
+
+    def test_unfilled_market_order(self):
+        order_book = MatchingEngine()
+        order_book.start_auction()
+        _, order = order_book.match_order(quote('bid', 0, 5, 'AA',
+                                                order_type='market'))
+        order_book.match_order(quote('ask', 100, 3, 'BB'))
+        order_book.match_order(quote('ask', 100.5, 4, 'BB',
+                                     order_type='stop_limit',
+                                     stop_price=100))
+
+        trades = order_book.uncross()
+        self.assertEqual([(t['price'], t['quantity']) for t in trades],
+                         [(100, 3)])
+        self.assertNotIn(order.order_id, order_book.orders)
+        self.assertEqual(len(order_book.bids), 0)
+        # the auction trade triggers the sell stop
+        self.assertEqual(len(order_book.stops), 0)
+        self.assertEqual(order_book.get_best_ask(), 100.5)
+
+    def test_call_phase_only_good_till_cancel(self):
+        order_book = MatchingEngine()
+        order_book.start_auction()
+        with self.assertRaises(AssertionError):
+            order_book.match_order(quote('bid', 100, 5,
+                                         time_in_force='ioc'))
+
+    def test_recover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'journal')
+            with Journal(filename) as journal:
+                order_book = MatchingEngine(journal=journal)
+                order_book.start_auction()
+                order_book.match_orders(opening_orders())
+                order_book.uncross()
+                order_book.start_auction()
+                order_book.match_order(quote('ask', 98, 1, 'GG'))
+
+            recovered = MatchingEngine.recover(filename)
+            self.assertTrue(recovered.in_auction)
+            self.assertEqual(recovered.last_price, order_book.last_price)
+            self.assertEqual(recovered.bids.depth(), order_book.bids.depth())
+            self.assertEqual(recovered.asks.depth(), order_book.asks.depth())
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from dataclasses import asdict
+from datetime import datetime
+from market.quote import Quote
+from orderbook.binary_tape import BinaryTapeWriter, RECORD, read_tape, \
+    read_tapes, to_nanoseconds
+from orderbook.matching_engine import MatchingEngine
+
+
+class TestBinaryTape(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'tape.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_engine_tape(self):
+        timestamp = datetime(2020, 1, 2, 9, 30)
+        with BinaryTapeWriter(self.filename) as writer:
+            order_book = MatchingEngine(tape_writer=writer)
+            for broker, price in (('AA', 101), ('BB', 102)):
+                quote = Quote(type='limit', side='ask', quantity=5,
+                              price=price, dealer_or_broker_id=broker)
+                order_book.match_order(asdict(quote))
+            quote = asdict(Quote(type='limit', side='bid', quantity=7,
+                                 price=103, dealer_or_broker_id='CC'))
+            quote['timestamp'] = timestamp
+            _, order = order_book.match_order(quote)
+            self.assertIsNone(order)
+
+        tape = read_tape(self.filename)
+        self.assertEqual(len(tape), 2)
+        self.assertEqual(list(tape['price']), [101.0, 102.0])
+        self.assertEqual(list(tape['quantity']), [5, 2])
+        self.assertEqual(list(tape['side']), [-1, -1])
+        self.assertEqual(tape['timestamp'][0], 1577957400 * 10**9)
+        self.assertEqual(tape['resting_id'][0],
+                         order_book.tape[0].matched_order.order_id)
+        self.assertEqual(tape['aggressor_id'][1],
+                         order_book.tape[1].order.order_id)
+
+    def test_append(self):
+        timestamp = datetime(2020, 1, 2, 9, 30)
+        with BinaryTapeWriter(self.filename) as writer:
+            for lazy_trades in (False, True):
+                order_book = MatchingEngine(lazy_trades=lazy_trades)
+                order_book.start_auction()
+                order_book.match_order(asdict(Quote(
+                    type='limit', side='ask', quantity=5, price=101,
+                    dealer_or_broker_id='AA')))
+                order_book.match_order(asdict(Quote(
+                    type='limit', side='bid', quantity=8, price=103,
+                    dealer_or_broker_id='BB')))
+                trades = order_book.uncross()
+                writer.append(trades[0], timestamp)
+
+        tape = read_tape(self.filename)
+        for record in tape:
+            # auction trades are at the auction price, not the ask limit
+            self.assertEqual(record['price'], 103)
+            self.assertEqual(record['quantity'], 5)
+            self.assertEqual(record['side'], -1)
+            self.assertEqual(record['timestamp'], 1577957400 * 10**9)
+        self.assertEqual(tape['aggressor_id'][1], trades[0].aggressor_id)
+        self.assertEqual(tape['resting_id'][1], trades[0].resting_id)
+
+    def test_rotation(self):
+        with BinaryTapeWriter(self.filename, buffer_size=2 * RECORD.size,
+                              max_file_size=3 * RECORD.size) as writer:
+            for i in range(7):
+                writer.write(i, 100.0 + i, i, i, i, 1)
+
+        self.assertEqual(writer.filenames, [self.filename,
+                                            self.filename + '.1',
+                                            self.filename + '.2'])
+        self.assertEqual(len(read_tape(self.filename + '.2')), 1)
+        tape = read_tapes(writer.filenames)
+        self.assertEqual(list(tape['timestamp']), list(range(7)))
+
+    def test_empty(self):
+        BinaryTapeWriter(self.filename).close()
+        self.assertEqual(len(read_tape(self.filename)), 0)
+
+    def test_nanoseconds(self):
+        self.assertEqual(to_nanoseconds(datetime(1970, 1, 1, 0, 0, 1, 5)),
+                         1000005000)
+        self.assertEqual(to_nanoseconds(42), 42)
@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from datetime import date, timedelta
 from constants import PLACES
 from options.black_scholes import BlackScholesPricer
@@ -106,3 +107,202 @@ class TestImpliedVolatilityStatic(unittest.TestCase):
     def test_implied_vol(self):
         implied = self.contract.implied_volatility(observed_price=17.5)
         self.assertAlmostEqual(implied, 0.219213836, places=PLACES)
+
+
+class TestVectorized(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(19)
+        size = 1000
+        self.flags = rng.choice([-1, 1], size)
+        self.spots = rng.uniform(50, 150, size)
+        self.strikes = rng.uniform(50, 150, size)
+        self.times = rng.uniform(0.01, 3, size)
+        self.rates = rng.uniform(0, 0.1, size)
+        self.vols = rng.uniform(0.05, 0.8, size)
+
+    def test_prices(self):
+        prices = BlackScholesPricer.calculate_prices(self.flags,
+                                                     self.spots,
+                                                     self.strikes,
+                                                     self.times,
+                                                     self.rates,
+                                                     self.vols)
+        for i in range(0, 1000, 37):
+            price = BlackScholesPricer.calculate_price(int(self.flags[i]),
+                                                       self.spots[i],
+                                                       self.strikes[i],
+                                                       self.times[i],
+                                                       self.rates[i],
+                                                       self.vols[i])
+            self.assertAlmostEqual(prices[i], price, places=10)
+
+    def test_vegas(self):
+        vegas = BlackScholesPricer.calculate_vegas(self.spots,
+                                                   self.strikes,
+                                                   self.times,
+                                                   self.rates,
+                                                   self.vols)
+        for i in range(0, 1000, 37):
+            vega = BlackScholesPricer.calculate_vega(self.spots[i],
+                                                     self.strikes[i],
+                                                     self.times[i],
+                                                     self.rates[i],
+                                                     self.vols[i])
+            self.assertAlmostEqual(vegas[i], vega, places=10)
+
+    def test_broadcast(self):
+        strikes = np.array([[90.0], [100.0], [110.0]])
+        flags = np.array([1, -1])
+        prices = BlackScholesPricer.calculate_prices(flags, 100.0, strikes,
+                                                     1.0, 0.05, 0.2)
+        self.assertEqual(prices.shape, (3, 2))
+        # put call parity
+        parity = 100.0 - strikes[:, 0] * np.exp(-0.05)
+        np.testing.assert_allclose(prices[:, 0] - prices[:, 1], parity)
+
+        price = BlackScholesPricer.calculate_prices(1, 50.0, 100.0, 1.0,
+                                                    0.05, 0.25)
+        self.assertEqual(np.ndim(price), 0)
+        self.assertAlmostEqual(float(price), 0.027352509369436284,
+                               places=12)
+
+    def test_greeks(self):
+        greeks = BlackScholesPricer.calculate_greeks(self.flags,
+                                                     self.spots,
+                                                     self.strikes,
+                                                     self.times,
+                                                     self.rates,
+                                                     self.vols)
+        prices = BlackScholesPricer.calculate_prices(self.flags,
+                                                     self.spots,
+                                                     self.strikes,
+                                                     self.times,
+                                                     self.rates,
+                                                     self.vols)
+        np.testing.assert_allclose(greeks.price, prices)
+        np.testing.assert_allclose(greeks.vega,
+                                   BlackScholesPricer.calculate_vegas(
+                                       self.spots, self.strikes, self.times,
+                                       self.rates, self.vols))
+
+        def bump(**kwargs):
+            arguments = dict(call_put_flag=self.flags,
+                             spot=self.spots,
+                             strike=self.strikes,
+                             time_to_maturity=self.times,
+                             interest_rate=self.rates,
+                             volatility=self.vols)
+            up = dict(arguments)
+            down = dict(arguments)
+            for name, h in kwargs.items():
+                up[name] = arguments[name] + h
+                down[name] = arguments[name] - h
+            return (BlackScholesPricer.calculate_greeks(**up),
+                    BlackScholesPricer.calculate_greeks(**down))
+
+        h = 1e-4
+        up, down = bump(spot=h)
+        np.testing.assert_allclose(greeks.delta,
+                                   (up.price - down.price) / (2 * h),
+                                   rtol=1e-4, atol=1e-6)
+        np.testing.assert_allclose(greeks.gamma,
+                                   (up.delta - down.delta) / (2 * h),
+                                   rtol=1e-4, atol=1e-6)
+        up, down = bump(volatility=h)
+        np.testing.assert_allclose(greeks.vanna,
+                                   (up.delta - down.delta) / (2 * h),
+                                   rtol=1e-4, atol=1e-6)
+        np.testing.assert_allclose(greeks.volga,
+                                   (up.vega - down.vega) / (2 * h),
+                                   rtol=1e-4, atol=1e-2)
+        up, down = bump(interest_rate=h)
+        np.testing.assert_allclose(greeks.rho,
+                                   (up.price - down.price) / (2 * h),
+                                   rtol=1e-4, atol=1e-6)
+        # theta is the change of price as calendar time passes
+        up, down = bump(time_to_maturity=h)
+        np.testing.assert_allclose(greeks.theta,
+                                   -(up.price - down.price) / (2 * h),
+                                   rtol=1e-4, atol=1e-6)
+
+    def test_contract_greeks(self):
+        contract = BlackScholesPricer(spot=42.0,
+                                      strike=40.0,
+                                      discount_curve=Curve({0.001: 0.1,
+                                                            1: 0.1}),
+                                      volatility_surface=lambda t, k: 0.2,
+                                      valuation_date=date(2019, 7, 23),
+                                      maturity_date=date(2020, 1, 20),
+                                      style=OptionStyle.CALL)
+        greeks = contract.greeks
+        self.assertAlmostEqual(float(greeks.price), contract.price,
+                               places=12)
+        self.assertAlmostEqual(float(greeks.vega), contract.vega, places=12)
+        self.assertGreater(greeks.delta, 0.5)
+        self.assertLess(greeks.theta, 0)
+
+    def test_implied_vols(self):
+        prices = BlackScholesPricer.calculate_prices(self.flags,
+                                                     self.spots,
+                                                     self.strikes,
+                                                     self.times,
+                                                     self.rates,
+                                                     self.vols)
+        implied = BlackScholesPricer.implied_vols(prices,
+                                                  self.flags,
+                                                  self.spots,
+                                                  self.strikes,
+                                                  self.times,
+                                                  self.rates,
+                                                  precision=1e-10)
+        # options without time value have no meaningful volatility
+        vegas = BlackScholesPricer.calculate_vegas(self.spots,
+                                                   self.strikes,
+                                                   self.times,
+                                                   self.rates,
+                                                   self.vols)
+        sensitive = vegas > 1e-2
+        self.assertGreater(sensitive.sum(), 900)
+        np.testing.assert_allclose(implied[sensitive],
+                                   self.vols[sensitive], atol=1e-6)
+        repriced = BlackScholesPricer.calculate_prices(self.flags,
+                                                       self.spots,
+                                                       self.strikes,
+                                                       self.times,
+                                                       self.rates,
+                                                       implied)
+        np.testing.assert_allclose(repriced[sensitive], prices[sensitive],
+                                   atol=1e-9)
+
+    def test_implied_vols_bounds(self):
+        implied = BlackScholesPricer.implied_vols([5.0, -1.0, 101.0, 20.0],
+                                                  [1, 1, 1, -1],
+                                                  100.0, 100.0, 1.0, 0.0)
+        self.assertTrue(np.isnan(implied[1:3]).all())
+        prices = BlackScholesPricer.calculate_prices([1, -1], 100.0, 100.0,
+                                                     1.0, 0.0,
+                                                     implied[[0, 3]])
+        np.testing.assert_allclose(prices, [5.0, 20.0], atol=1e-5)
+
+    def test_implied_vols_wings(self):
+        rng = np.random.default_rng(23)
+        size = 20000
+        flags = rng.choice([-1, 1], size)
+        spots = rng.uniform(50, 150, size)
+        # deep in and out of the money strikes
+        strikes = rng.uniform(20, 300, size)
+        times = rng.uniform(0.01, 3, size)
+        rates = rng.uniform(0, 0.1, size)
+        vols = rng.uniform(0.05, 1, size)
+        prices = BlackScholesPricer.calculate_prices(flags, spots, strikes,
+                                                     times, rates, vols)
+        implied = BlackScholesPricer.implied_vols(prices, flags, spots,
+                                                  strikes, times, rates)
+        # the price must still depend on the volatility
+        vegas = BlackScholesPricer.calculate_vegas(spots, strikes, times,
+                                                   rates, vols)
+        sensitive = vegas > 1e-6
+        self.assertGreater((sensitive & (np.abs(spots / strikes - 1) > 0.5))
+                           .sum(), 1000)
+        np.testing.assert_allclose(implied[sensitive], vols[sensitive],
+                                   atol=1e-6)
@@ -0,0 +1,86 @@
+import unittest
+from dataclasses import asdict
+import numpy as np
+from market.limit_order import LimitOrder
+from market.quote import Quote
+from market.side import Side
+from orderbook.book_side import BookSide
+
+
+class TestBookSide(unittest.TestCase):
+    def setUp(self):
+        self.bids = BookSide(Side.BID)
+        self.orders = []
+        for broker, price, quantity in (('AA', 99, 5), ('BB', 98, 7),
+                                        ('CC', 99, 3), ('DD', 97, 1)):
+            quote = Quote(type='limit', side='bid', quantity=quantity,
+                          price=price, dealer_or_broker_id=broker)
+            order = LimitOrder(asdict(quote))
+            self.orders.append(order)
+            self.bids.add(order)
+
+    def test_levels(self):
+        self.assertEqual(len(self.bids), 4)
+        self.assertEqual(len(self.bids.levels), 3)
+        self.assertEqual(self.bids.best().price, 99)
+        self.assertEqual(self.bids.worst().price, 97)
+        self.assertEqual(self.bids.volume_at(99), 8)
+        self.assertEqual(self.bids.volume_at(96), 0)
+        self.assertEqual(self.bids.depth(), [(99, 8), (98, 7), (97, 1)])
+        self.assertEqual(self.bids.depth(2), [(99, 8), (98, 7)])
+
+    def test_depth_arrays(self):
+        prices, volumes = self.bids.depth_arrays()
+        self.assertEqual(prices.dtype, np.float64)
+        self.assertEqual(volumes.dtype, np.int64)
+        self.assertEqual(prices.tolist(), [99, 98, 97])
+        self.assertEqual(volumes.tolist(), [8, 7, 1])
+
+        prices, volumes = self.bids.depth_arrays(2)
+        self.assertEqual(prices.tolist(), [99, 98])
+        self.assertEqual(volumes.tolist(), [8, 7])
+
+        prices, volumes = BookSide(Side.ASK).depth_arrays(5)
+        self.assertEqual(len(prices), 0)
+        self.assertEqual(len(volumes), 0)
+
+    def test_priority(self):
+        brokers = [order.dealer_or_broker_id for order in self.bids]
+        self.assertEqual(brokers, ['AA', 'CC', 'BB', 'DD'])
+        self.assertEqual(self.bids[0].dealer_or_broker_id, 'AA')
+        self.assertEqual(self.bids[1].dealer_or_broker_id, 'CC')
+        self.assertEqual(self.bids[-1].dealer_or_broker_id, 'DD')
+        with self.assertRaises(IndexError):
+            _ = self.bids[4]
+
+    def test_fill(self):
+        self.bids.fill(2)
+        self.assertEqual(self.bids[0].quantity, 3)
+        self.assertEqual(self.bids.volume_at(99), 6)
+
+        self.bids.fill(3)
+        self.assertEqual(len(self.bids), 3)
+        self.assertEqual(self.bids[0].dealer_or_broker_id, 'CC')
+
+        self.bids.fill(3)
+        self.assertEqual(len(self.bids.levels), 2)
+        self.assertEqual(self.bids.best().price, 98)
+
+    def test_empty(self):
+        asks = BookSide(Side.ASK)
+        self.assertFalse(asks)
+        self.assertIsNone(asks.best())
+        self.assertIsNone(asks.worst())
+        with self.assertRaises(IndexError):
+            _ = asks[0]
+
+    def test_remove_and_reduce(self):
+        self.bids.reduce(self.orders[0], 1)
+        self.assertEqual(self.bids.volume_at(99), 4)
+        self.assertEqual(self.bids[0].dealer_or_broker_id, 'AA')
+
+        self.bids.remove(self.orders[2])
+        self.assertEqual(self.bids.volume_at(99), 1)
+        self.bids.remove(self.orders[0])
+        self.assertEqual(self.bids.best().price, 98)
+        self.assertEqual(len(self.bids), 2)
@@ -35,6 +35,12 @@ class TestBootstrap(unittest.TestCase):
 
             self.assertEqual(point, interp)
 
+    def test_add_instrument(self):
+        """adding an instrument refreshes the interpolator"""
+        self.assertAlmostEqual(self.yield_curve(2.0), 0.10808027549746793)
+        self.yield_curve.add_instrument(Bond(100, 0.75, 0., 92.))
+        self.assertEqual(self.yield_curve(0.75), self.yield_curve[0.75])
+
     def test_string_representation(self):
         expected = "{0.25: 0.10127123193715915, 0.5: 0.10469296074441839, 1.0: 0.10536051565782635, 1.5: 0.1068092638817053, 2.0: 0.10808027549746793}"  # noqa
         self.assertEqual(str(self.yield_curve), expected)
@@ -34,3 +34,10 @@ class TestCurve(unittest.TestCase):
         self.assertEqual(crv.rates, [0.951229424500714,
                                      0.9048374180359595,
                                      0.8607079764250578])
+
+    def test_invalidate(self):
+        self.assertAlmostEqual(self.discount_curve(1.0), 0.0389)
+        self.discount_curve._curve[1.0] = 0.05  # pylint: disable=W0212
+        self.assertAlmostEqual(self.discount_curve(1.0), 0.0389)
+        self.discount_curve.invalidate()
+        self.assertAlmostEqual(self.discount_curve(1.0), 0.05)
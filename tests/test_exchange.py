@@ -0,0 +1,87 @@
+import unittest
+from dataclasses import asdict
+from market.quote import Quote
+from orderbook.exchange import Exchange
+
+
+def make_quotes():
+    quotes = []
+    for symbol in ('AAPL', 'MSFT', 'IBM', 'ASML'):
+        quotes.append(asdict(Quote(type='limit', side='ask', quantity=5,
+                                   price=101, dealer_or_broker_id='AA',
+                                   symbol=symbol)))
+        quotes.append(asdict(Quote(type='limit', side='ask', quantity=5,
+                                   price=102, dealer_or_broker_id='BB',
+                                   symbol=symbol)))
+    for symbol in ('AAPL', 'MSFT', 'IBM', 'ASML'):
+        quotes.append(asdict(Quote(type='limit', side='bid', quantity=7,
+                                   price=103, dealer_or_broker_id='CC',
+                                   symbol=symbol)))
+    return quotes
+
+
+class TestExchange(unittest.TestCase):
+    def check_exchange(self, exchange):
+        trades = exchange.match_orders(make_quotes())
+        self.assertEqual(sorted(trades), ['AAPL', 'ASML', 'IBM', 'MSFT'])
+        for symbol_trades in trades.values():
+            self.assertEqual([(t['seller'], t['quantity'], t['price'])
+                              for t in symbol_trades],
+                             [('AA', 5, 101), ('BB', 2, 102)])
+
+        self.assertEqual(exchange.get_volume_at_price('IBM', 'ask', 102), 3)
+        _, order = exchange.match_order(asdict(Quote(type='limit',
+                                                     side='ask',
+                                                     quantity=4,
+                                                     price=105,
+                                                     dealer_or_broker_id='DD',
+                                                     symbol='IBM')))
+        exchange.cancel_order('IBM', order.order_id)
+        self.assertEqual(exchange.get_volume_at_price('IBM', 'ask', 105), 0)
+        with self.assertRaises(KeyError):
+            exchange.cancel_order('IBM', order.order_id)
+        with self.assertRaises(KeyError):
+            exchange.match_orders([{'type': 'limit'}])
+
+        cancelled = exchange.cancel_participant('BB')
+        self.assertEqual(sorted(cancelled), ['AAPL', 'ASML', 'IBM', 'MSFT'])
+        self.assertEqual([order.quantity for order in cancelled['IBM']], [3])
+        self.assertEqual(exchange.get_volume_at_price('IBM', 'ask', 102), 0)
+        self.assertEqual(exchange.cancel_participant('BB'), {})
+
+    def test_in_process(self):
+        exchange = Exchange()
+        self.check_exchange(exchange)
+        exchange.close()
+
+    def test_worker_processes(self):
+        with Exchange(processes=2) as exchange:
+            self.assertEqual(exchange.shard('IBM'), exchange.shard('IBM'))
+            self.check_exchange(exchange)
+
+    def test_worker_failure(self):
+        with Exchange(processes=2) as exchange:
+            self.assertNotEqual(exchange.shard('AAPL'), exchange.shard('IBM'))
+            bad, good = [asdict(Quote(type=order_type, side='ask',
+                                      quantity=5, price=1,
+                                      dealer_or_broker_id='AA',
+                                      symbol=symbol))
+                         for order_type, symbol in (('BAD', 'AAPL'),
+                                                    ('limit', 'IBM'))]
+            with self.assertRaises(KeyError):
+                exchange.match_orders([bad, good])
+            # the reply of the other worker is not left in its pipe
+            self.assertEqual(exchange.get_volume_at_price('IBM', 'ask', 1),
+                             5)
+            cancelled = exchange.cancel_participant('AA')
+            self.assertEqual([order.quantity for order in cancelled['IBM']],
+                             [5])
+            self.assertEqual(exchange.get_volume_at_price('IBM', 'ask', 1),
+                             0)
+
+    def test_tick_sizes(self):
+        exchange = Exchange(tick_sizes={'IBM': 0.5})
+        self.check_exchange(exchange)
+        shard = exchange._shards[0]     # pylint: disable=protected-access
+        self.assertEqual(shard.engine('IBM').tick_size, 0.5)
+        self.assertIsNone(shard.engine('AAPL').tick_size)
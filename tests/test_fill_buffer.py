@@ -0,0 +1,115 @@
+import csv
+import os
+import tempfile
+import unittest
+from dataclasses import asdict
+from constants import OUR_CPTY
+from market.quote import Quote
+from orderbook.fill_buffer import FillBuffer
+from orderbook.matching_engine import MatchingEngine
+from position_keeping.position import Position
+from position_keeping.trade import Trade
+
+
+def order_flow():
+    script_dir = os.path.dirname(__file__)
+    with open(os.path.join(script_dir, 'orders_test2.txt')) as csvfile:
+        quotes = list(csv.DictReader(csvfile))
+    quotes.append(asdict(Quote(type='limit', side='bid', quantity=7,
+                               price=102, dealer_or_broker_id=OUR_CPTY)))
+    quotes.append(asdict(Quote(type='market', side='ask', quantity=12,
+                               dealer_or_broker_id=OUR_CPTY)))
+    quotes.append(asdict(Quote(type='limit', side='ask', quantity=3,
+                               price=97, dealer_or_broker_id='FF')))
+    return quotes
+
+
+def as_tuples(trades):
+    return [(t.price, t.quantity, t.buyer, t.seller, t.aggressor_id,
+             t.resting_id) for t in trades]
+
+
+class TestFillBuffer(unittest.TestCase):
+    def test_grow(self):
+        fills = FillBuffer(capacity=2)
+        for i in range(5):
+            fills.append(100.0 + i, i, 'AA', 'BB', i, 10 + i, -1)
+        self.assertEqual(len(fills), 5)
+        self.assertGreaterEqual(fills.capacity, 5)
+        self.assertEqual(fills.participants, ['AA', 'BB'])
+        self.assertEqual(list(fills.columns()['price']),
+                         [100.0, 101.0, 102.0, 103.0, 104.0])
+        trade = fills[-1]
+        self.assertIsInstance(trade, Trade)
+        self.assertEqual(trade['price'], 104.0)
+        self.assertEqual(trade['buyer'], 'AA')
+        self.assertEqual(trade.resting_id, 14)
+        with self.assertRaises(IndexError):
+            _ = fills[5]
+        view = fills.view(1, 3)
+        self.assertEqual([t.quantity for t in view], [1, 2])
+        self.assertEqual(view[-1].quantity, 2)
+
+    def test_lazy_engine(self):
+        eager = MatchingEngine()
+        lazy = MatchingEngine(lazy_trades=True)
+        quotes = order_flow()
+        eager_trades = eager.match_orders(quotes)
+        lazy_trades = lazy.match_orders(quotes)
+
+        # order ids differ between the two engines
+        self.assertEqual([t[:4] for t in as_tuples(lazy_trades)],
+                         [t[:4] for t in as_tuples(eager_trades)])
+        self.assertEqual(len(lazy.tape), len(eager_trades))
+
+        trades, _ = lazy.match_order(asdict(Quote(
+            type='limit', side='bid', quantity=1, price=104,
+            dealer_or_broker_id='GG')))
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]['seller'], 'CC')
+        self.assertEqual(trades[0]['price'], 101)
+        self.assertIn('***Trades***', str(lazy))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'tape.txt')
+            lazy.tape_dump(filename, tapemode='wipe')
+            with open(filename) as dump:
+                self.assertEqual(len(dump.readlines()), len(eager_trades) + 1)
+        self.assertEqual(len(lazy.tape), 0)
+
+        # views returned before the wipe keep their fills
+        trades, _ = lazy.match_order(asdict(Quote(
+            type='limit', side='bid', quantity=2, price=104,
+            dealer_or_broker_id='HH')))
+        self.assertEqual([t['buyer'] for t in trades], ['HH'])
+        self.assertEqual(len(lazy.tape), 1)
+        self.assertEqual(len(lazy_trades), len(eager_trades))
+        self.assertEqual(as_tuples(lazy_trades)[0][:4],
+                         as_tuples(eager_trades)[0][:4])
+
+    def test_position(self):
+        eager = MatchingEngine()
+        lazy = MatchingEngine(lazy_trades=True)
+        quotes = order_flow()
+
+        from_trades = Position()
+        from_trades.append(eager.match_orders(quotes))
+        from_fills = Position()
+        from_fills.append(lazy.match_orders(quotes))
+
+        self.assertEqual(from_fills.buys, from_trades.buys)
+        self.assertEqual(from_fills.sells, from_trades.sells)
+        self.assertAlmostEqual(from_fills.position_value,
+                               from_trades.position_value)
+        self.assertEqual(from_fills.long_short, from_trades.long_short)
+
+        # reading a position does not add participants to the buffer
+        other = MatchingEngine(lazy_trades=True)
+        fills = other.match_orders(quotes[:-3])
+        participants = list(other.fills.participants)
+        position = Position()
+        position.append(fills)
+        self.assertEqual(position.buys, 0)
+        self.assertEqual(position.sells, sum(t.quantity for t in fills))
+        self.assertEqual(other.fills.participants, participants)
+        self.assertNotIn(OUR_CPTY, other.fills.codes)
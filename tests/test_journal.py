@@ -0,0 +1,177 @@
+import os
+import random
+import tempfile
+import unittest
+from dataclasses import asdict
+from market.quote import Quote
+from orderbook.binary_tape import BinaryTapeWriter, read_tape
+from orderbook.journal import Journal, load_snapshot, read_journal
+from orderbook.matching_engine import MatchingEngine
+from tests.quotes import quote
+
+
+def book_state(engine):
+    return ([(o.order_id, o.limit, o.quantity) for o in engine.bids],
+            [(o.order_id, o.limit, o.quantity) for o in engine.asks],
+            sorted(engine.stops.orders), engine.last_price,
+            engine.best_bid_offer)
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal_filename = os.path.join(self.directory.name, 'journal')
+        self.snapshot_filename = os.path.join(self.directory.name, 'snapshot')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def simulate(self, engine, messages=300, seed=7):
+        rnd = random.Random(seed)
+        for _ in range(messages):
+            action = rnd.random()
+            if engine.orders and action < 0.2:
+                engine.cancel_order(rnd.choice(sorted(engine.orders)))
+            elif engine.orders and action < 0.3:
+                order_id = rnd.choice(sorted(engine.orders))
+                engine.amend_order(order_id, quantity=rnd.randint(0, 20),
+                                   price=rnd.choice((None, 99, 100, 101)))
+            elif action < 0.35:
+                engine.match_order(asdict(Quote(type='market',
+                                                dealer_or_broker_id='MM',
+                                                side=rnd.choice(('bid',
+                                                                 'ask')),
+                                                quantity=rnd.randint(1, 20))))
+            else:
+                side = rnd.choice(('bid', 'ask'))
+                price = 100 + rnd.randint(-5, 5) * 0.5
+                engine.match_order(asdict(Quote(type='limit',
+                                                dealer_or_broker_id='AA',
+                                                side=side,
+                                                quantity=rnd.randint(1, 20),
+                                                price=price)))
+
+    def test_replay(self):
+        with Journal(self.journal_filename) as journal:
+            engine = MatchingEngine(journal=journal)
+            self.simulate(engine)
+
+        records = list(read_journal(self.journal_filename))
+        self.assertEqual([r[0] for r in records],
+                         list(range(1, len(records) + 1)))
+        kinds = {r[1] for r in records}
+        self.assertEqual(kinds, {'order', 'cancel', 'amend', 'trade'})
+        trades = [r for r in records if r[1] == 'trade']
+        self.assertEqual(len(trades), len(engine.tape))
+
+        recovered = MatchingEngine.recover(self.journal_filename)
+        self.assertEqual(book_state(recovered), book_state(engine))
+        self.assertEqual(len(recovered.tape), len(engine.tape))
+
+        # new orders do not reuse journaled ids
+        _, order = recovered.match_order(asdict(Quote(
+            type='limit', dealer_or_broker_id='ZZ', side='bid', quantity=1,
+            price=1)))
+        self.assertGreater(order.order_id,
+                           max(r[2]['order_id'] for r in records
+                               if r[1] == 'order'))
+
+    def test_snapshot(self):
+        journal = Journal(self.journal_filename,
+                          snapshot_filename=self.snapshot_filename,
+                          snapshot_interval=50)
+        engine = MatchingEngine(journal=journal)
+        self.simulate(engine)
+        journal.close()
+
+        snapshot = load_snapshot(self.snapshot_filename)
+        self.assertGreater(snapshot['sequence'], 0)
+        self.assertLess(journal.sequence - snapshot['sequence'], 60)
+
+        recovered = MatchingEngine.recover(self.journal_filename,
+                                           self.snapshot_filename)
+        self.assertEqual(book_state(recovered), book_state(engine))
+
+        # appending continues the sequence
+        with Journal(self.journal_filename) as reopened:
+            self.assertEqual(reopened.sequence, journal.sequence)
+            recovered.journal = reopened
+            recovered.match_order(asdict(Quote(type='limit',
+                                               dealer_or_broker_id='ZZ',
+                                               side='bid', quantity=1,
+                                               price=1)))
+        self.assertEqual(list(read_journal(self.journal_filename))[-1][0],
+                         journal.sequence + 1)
+
+    def test_cancel_participant(self):
+        with Journal(self.journal_filename,
+                     snapshot_filename=self.snapshot_filename,
+                     snapshot_interval=50) as journal:
+            engine = MatchingEngine(journal=journal)
+            self.simulate(engine, messages=60)
+            engine.match_order(asdict(Quote(type='limit',
+                                            dealer_or_broker_id='BB',
+                                            side='bid', quantity=1,
+                                            price=1)))
+            engine.cancel_participant('AA')
+        self.assertEqual(list(engine.participants), ['BB'])
+
+        recovered = MatchingEngine.recover(self.journal_filename,
+                                           self.snapshot_filename)
+        self.assertEqual(book_state(recovered), book_state(engine))
+        self.assertEqual(list(recovered.participants), ['BB'])
+
+    def test_rejected_orders_are_not_journaled(self):
+        with Journal(self.journal_filename) as journal:
+            engine = MatchingEngine(journal=journal, tick_size=0.5)
+            _, order = engine.match_order(quote('bid', 10))
+            with self.assertRaises(AssertionError):
+                engine.match_order(quote('bid', 10.3))
+            with self.assertRaises(AssertionError):
+                engine.match_orders([quote('bid', 10.3)], fast=True)
+            with self.assertRaises(AssertionError):
+                engine.amend_order(order.order_id, price=10.3)
+            engine.start_auction()
+            with self.assertRaises(AssertionError):
+                engine.match_order(quote('bid', 10, time_in_force='ioc'))
+            engine.match_order(quote('bid', 10.5))
+
+        self.assertEqual([r[1] for r in read_journal(self.journal_filename)],
+                         ['order', 'auction', 'order'])
+        recovered = MatchingEngine.recover(self.journal_filename,
+                                           tick_size=0.5)
+        self.assertEqual(book_state(recovered), book_state(engine))
+
+    def test_truncated_record(self):
+        with Journal(self.journal_filename) as journal:
+            engine = MatchingEngine(journal=journal)
+            self.simulate(engine, messages=50)
+        records = list(read_journal(self.journal_filename))
+        size = os.path.getsize(self.journal_filename)
+        # a crash while writing the last record
+        with open(self.journal_filename, 'rb+') as journal_file:
+            journal_file.truncate(size - 5)
+
+        self.assertEqual(list(read_journal(self.journal_filename)),
+                         records[:-1])
+        MatchingEngine.recover(self.journal_filename)
+        with Journal(self.journal_filename) as journal:
+            self.assertEqual(journal.sequence, records[-2][0])
+            journal.record('cancel', 1)
+        self.assertEqual([r[0] for r in read_journal(self.journal_filename)],
+                         [r[0] for r in records])
+
+    def test_recover_does_not_rewrite_tape(self):
+        tape_filename = os.path.join(self.directory.name, 'tape.bin')
+        with Journal(self.journal_filename) as journal, \
+                BinaryTapeWriter(tape_filename) as writer:
+            engine = MatchingEngine(journal=journal, tape_writer=writer)
+            self.simulate(engine, messages=50)
+        trades = len(read_tape(tape_filename))
+        self.assertEqual(trades, len(engine.tape))
+
+        with BinaryTapeWriter(tape_filename) as writer:
+            recovered = MatchingEngine.recover(self.journal_filename,
+                                               tape_writer=writer)
+            self.assertIs(recovered.tape_writer, writer)
+        self.assertEqual(len(read_tape(tape_filename)), trades)
@@ -0,0 +1,104 @@
+import unittest
+from datetime import date
+import numpy as np
+from options.black_scholes import BlackScholesPricer
+from options.exercise_style import ExerciseStyle
+from options.lattice import LatticePricer, LatticeType, lattice_prices
+from options.option_style import OptionStyle
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+
+# american put on spot 100, strike 100, one year, 5% rate and 20% volatility
+AMERICAN_PUT = 6.0904
+
+
+class TestLattice(unittest.TestCase):
+    def setUp(self):
+        self.flags = np.array([1, -1])
+        self.strikes = np.array([[90.0], [100.0], [110.0]])
+        self.european = BlackScholesPricer.calculate_prices(self.flags,
+                                                            100.0,
+                                                            self.strikes,
+                                                            1.0, 0.05, 0.2)
+
+    def test_european(self):
+        for lattice, tolerance in ((LatticeType.COX_ROSS_RUBINSTEIN, 2e-2),
+                                   (LatticeType.LEISEN_REIMER, 1e-4),
+                                   (LatticeType.TRINOMIAL, 1e-2)):
+            prices = lattice_prices(self.flags, 100.0, self.strikes, 1.0,
+                                    0.05, 0.2, lattice=lattice,
+                                    exercise=ExerciseStyle.EUROPEAN)
+            self.assertEqual(prices.shape, (3, 2))
+            np.testing.assert_allclose(prices, self.european, atol=tolerance)
+
+    def test_richardson(self):
+        for lattice in LatticeType:
+            plain = lattice_prices(self.flags, 100.0, self.strikes, 1.0,
+                                   0.05, 0.2, steps=200, lattice=lattice,
+                                   exercise=ExerciseStyle.EUROPEAN)
+            extrapolated = lattice_prices(self.flags, 100.0, self.strikes,
+                                          1.0, 0.05, 0.2, steps=200,
+                                          lattice=lattice,
+                                          exercise=ExerciseStyle.EUROPEAN,
+                                          richardson=True)
+            self.assertLess(np.abs(extrapolated - self.european).max(),
+                            np.abs(plain - self.european).max())
+
+        price = lattice_prices(-1, 100.0, 100.0, 1.0, 0.05, 0.2,
+                               richardson=True)
+        self.assertAlmostEqual(float(price), AMERICAN_PUT, places=3)
+
+    def test_american(self):
+        for lattice in LatticeType:
+            price = lattice_prices(-1, 100.0, 100.0, 1.0, 0.05, 0.2,
+                                   steps=1000, lattice=lattice)
+            self.assertEqual(np.ndim(price), 0)
+            self.assertAlmostEqual(float(price), AMERICAN_PUT, places=2)
+
+        prices = lattice_prices(self.flags, 100.0, self.strikes, 1.0, 0.05,
+                                0.2)
+        europeans = lattice_prices(self.flags, 100.0, self.strikes, 1.0,
+                                   0.05, 0.2,
+                                   exercise=ExerciseStyle.EUROPEAN)
+        # early exercise of a call only pays with dividends
+        np.testing.assert_allclose(prices[:, 0], europeans[:, 0])
+        self.assertTrue((prices[:, 1] > europeans[:, 1]).all())
+
+        call = lattice_prices(1, 100.0, 100.0, 1.0, 0.05, 0.2,
+                              dividend_yield=0.08)
+        european_call = lattice_prices(1, 100.0, 100.0, 1.0, 0.05, 0.2,
+                                       dividend_yield=0.08,
+                                       exercise=ExerciseStyle.EUROPEAN)
+        self.assertGreater(call, european_call)
+
+        # deep in the money the put is exercised at once
+        price = lattice_prices(-1, 100.0, 200.0, 1.0, 0.05, 0.2)
+        self.assertAlmostEqual(float(price), 100.0, places=10)
+
+    def test_batch(self):
+        strikes = np.linspace(80.0, 120.0, 9)
+        for lattice in LatticeType:
+            prices = lattice_prices(-1, 100.0, strikes, 0.5, 0.03, 0.3,
+                                    steps=101, lattice=lattice)
+            for strike, price in zip(strikes, prices):
+                self.assertAlmostEqual(price,
+                                       float(lattice_prices(
+                                           -1, 100.0, strike, 0.5, 0.03,
+                                           0.3, steps=101, lattice=lattice)),
+                                       places=12)
+
+    def test_pricer(self):
+        pricer = LatticePricer(spot=100.0,
+                               strike=100.0,
+                               discount_curve=Curve({0.001: 0.05,
+                                                     1: 0.05, 2: 0.05}),
+                               volatility_surface=Surface(
+                                   [0.01, 1, 2], [95.0, 100.0, 105.0],
+                                   [[0.2, 0.2, 0.2]] * 3),
+                               valuation_date=date(2019, 7, 23),
+                               maturity_date=date(2020, 7, 23),
+                               style=OptionStyle.PUT,
+                               richardson=True)
+        self.assertAlmostEqual(pricer.price, AMERICAN_PUT, places=3)
+        pricer.exercise = ExerciseStyle.EUROPEAN
+        self.assertAlmostEqual(pricer.price, self.european[1, 1], places=6)
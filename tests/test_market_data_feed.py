@@ -0,0 +1,101 @@
+import unittest
+from market.side import Side
+from orderbook.market_data_feed import LevelUpdate
+from orderbook.matching_engine import MatchingEngine
+from tests.quotes import quote
+
+
+class TestMarketDataFeed(unittest.TestCase):
+    def setUp(self):
+        self.order_book = MatchingEngine()
+        self.feed = self.order_book.market_data_feed
+        self.received = []
+
+    def test_callback(self):
+        self.feed.subscribe(self.received.append)
+        self.order_book.match_order(quote('ask', 101))
+        self.order_book.match_order(quote('ask', 101, broker='BB'))
+        self.order_book.match_order(quote('bid', 99))
+        self.assertEqual(self.received,
+                         [LevelUpdate(1, Side.ASK, 101.0, 5),
+                          LevelUpdate(2, Side.ASK, 101.0, 10),
+                          LevelUpdate(3, Side.BID, 99.0, 5)])
+
+        del self.received[:]
+        self.order_book.match_order(quote('bid', 102, quantity=7))
+        self.assertEqual(self.received,
+                         [LevelUpdate(4, Side.ASK, 101.0, 5),
+                          LevelUpdate(5, Side.ASK, 101.0, 3)])
+
+        self.feed.unsubscribe(self.received.append)
+        self.assertFalse(self.feed.active)
+
+    def test_cancel_and_amend(self):
+        _, order = self.order_book.match_order(quote('bid', 99))
+        self.feed.subscribe(self.received.append)
+        self.order_book.amend_order(order.order_id, quantity=2)
+        self.order_book.cancel_order(order.order_id)
+        self.assertEqual([(u.side, u.price, u.volume) for u in self.received],
+                         [(Side.BID, 99.0, 2), (Side.BID, 99.0, 0)])
+
+    def test_snapshot_and_deltas(self):
+        self.order_book.match_order(quote('ask', 101))
+        self.order_book.match_order(quote('ask', 103))
+        self.order_book.match_order(quote('bid', 99))
+
+        snapshot, subscription = self.feed.subscribe_with_snapshot()
+        self.assertEqual(snapshot.bids, [(99.0, 5)])
+        self.assertEqual(snapshot.asks, [(101.0, 5), (103.0, 5)])
+
+        self.order_book.match_order(quote('bid', 102, quantity=6))
+        updates = list(subscription.updates())
+        self.assertEqual([(u.side, u.price, u.volume) for u in updates],
+                         [(Side.ASK, 101.0, 0), (Side.BID, 102.0, 1)])
+        self.assertTrue(all(u.sequence > snapshot.sequence for u in updates))
+        self.assertEqual(list(subscription.updates()), [])
+
+        subscription.close()
+        self.order_book.match_order(quote('bid', 98))
+        self.assertEqual(list(subscription.updates()), [])
+
+
+class TestBestBidOffer(unittest.TestCase):
+    def setUp(self):
+        self.order_book = MatchingEngine()
+        self.received = []
+        self.order_book.market_data_feed.subscribe_best_bid_offer(
+            self.received.append)
+
+    def test_empty(self):
+        self.assertIsNone(self.order_book.get_best_bid())
+        self.assertIsNone(self.order_book.get_best_ask())
+        self.assertIsNone(self.order_book.get_spread())
+
+    def test_changes(self):
+        self.order_book.match_order(quote('ask', 101))
+        self.order_book.match_order(quote('bid', 99))
+        self.assertEqual(len(self.received), 2)
+        self.assertEqual(self.order_book.get_spread(), 2)
+
+        # levels behind the top do not notify
+        self.order_book.match_order(quote('ask', 103))
+        _, order = self.order_book.match_order(quote('bid', 97))
+        self.order_book.cancel_order(order.order_id)
+        self.assertEqual(len(self.received), 2)
+
+        self.order_book.match_order(quote('bid', 99, broker='BB'))
+        self.assertEqual(self.received[-1].bid_volume, 10)
+
+        self.order_book.match_order(quote('bid', 102, quantity=5))
+        best = self.received[-1]
+        self.assertEqual((best.bid, best.ask, best.ask_volume),
+                         (99.0, 103.0, 5))
+        self.assertEqual(self.order_book.best_bid_offer, best)
+        self.assertEqual(len(self.received), 4)
+
+    def test_amend(self):
+        _, order = self.order_book.match_order(quote('bid', 99))
+        self.order_book.match_order(quote('bid', 98))
+        self.order_book.amend_order(order.order_id, price=97)
+        self.assertEqual(self.order_book.get_best_bid(), 98)
+        self.assertEqual(len(self.received), 2)
@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime
 from market.quote import Quote
 from market.market_order import MarketOrder
 from dataclasses import asdict
@@ -23,3 +24,16 @@ class TestAlgoSim(unittest.TestCase):
     def test_limit(self):
         self.assertEqual(self.ask_order.limit, 0.0)
         self.assertEqual(self.bid_order.limit, float("inf"))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.ask_order, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.ask_order.price = 1.0
+
+    def test_timestamp(self):
+        self.assertIsInstance(self.ask_order.timestamp, datetime)
+        self.assertIs(self.ask_order.timestamp, self.ask_order.timestamp)
+        quote = asdict(Quote(type='market', side='ask', quantity=40,
+                             dealer_or_broker_id=111))
+        quote['timestamp'] = datetime(2020, 1, 2)
+        self.assertEqual(MarketOrder(quote).timestamp, datetime(2020, 1, 2))
@@ -5,6 +5,8 @@ import unittest
 from dataclasses import asdict
 from market.quote import Quote
 from orderbook.matching_engine import MatchingEngine
+from tests.quotes import quote
+from orderbook.self_trade_prevention import SelfTradePrevention
 from position_keeping.trade import Trade
 
 
@@ -308,6 +310,18 @@ class TestExample(unittest.TestCase):
         self.assertEqual(self.order_book.get_volume_at_price('ask', 101),
                          15)
 
+    def test_depth(self):
+        """ depth as numpy arrays
+        """
+        prices, volumes = self.order_book.get_depth('bid', levels=2)
+        self.assertEqual(prices.tolist(), [99, 98])
+        self.assertEqual(volumes.tolist(), [10, 5])
+
+        depth = self.order_book.get_depth_all()
+        self.assertEqual(depth['bid'][0].tolist(), [99, 98, 97])
+        self.assertEqual(depth['ask'][0].tolist(), [101, 103])
+        self.assertEqual(depth['ask'][1].tolist(), [15, 5])
+
     def test_robustness(self):
         """ test exceptions
         """
@@ -358,3 +372,312 @@ class TestExample(unittest.TestCase):
                          'price': 100,
                          'trade_id': 123}
             (_, _) = self.order_book.match_order(bad_order)
+
+
+class TestCancelAmend(unittest.TestCase):
+    """ cancel and amend resting orders by order id
+    """
+    def setUp(self):
+        self.order_book = MatchingEngine()
+        self.order_ids = {}
+        script_dir = os.path.dirname(__file__)
+        with open(os.path.join(script_dir, 'orders_test2.txt')) as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                _, order = self.order_book.match_order(row)
+                key = (row['dealer_or_broker_id'], row['side'])
+                self.order_ids[key] = order.order_id
+        # orderbook
+        #               BID                                     ASK
+        #    broker     limit   quantity     |    broker     limit   quantity
+        #        AA      99      5           |        AA      101         5
+        #        CC      99      5           |        CC      101         5
+        #        BB      98      5           |        DD      101         5
+        #        DD      97      5           |        BB      103         5
+
+    def test_cancel_order(self):
+        order_id = self.order_ids[('AA', 'ask')]
+        order = self.order_book.cancel_order(order_id)
+        self.assertEqual(order.order_id, order_id)
+        self.assertEqual(len(self.order_book.asks), 3)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 101), 10)
+        self.assertEqual(self.order_book.asks[0].dealer_or_broker_id, 'CC')
+        with self.assertRaises(KeyError):
+            self.order_book.cancel_order(order_id)
+
+        self.order_book.cancel_order(self.order_ids[('DD', 'bid')])
+        self.assertEqual(self.order_book.get_worst_bid(), 98)
+
+    def test_filled_order_can_not_be_cancelled(self):
+        order_id = self.order_ids[('AA', 'ask')]
+        quote = Quote(type='limit', side='bid', quantity=5, price=102,
+                      dealer_or_broker_id='EE')
+        self.order_book.match_order(asdict(quote))
+        with self.assertRaises(KeyError):
+            self.order_book.cancel_order(order_id)
+        self.assertEqual(len(self.order_book.orders), 7)
+
+    def test_decrease_keeps_priority(self):
+        order_id = self.order_ids[('AA', 'ask')]
+        trades, order = self.order_book.amend_order(order_id, quantity=2)
+        self.assertEqual(trades, [])
+        self.assertEqual(order.quantity, 2)
+        self.assertEqual(self.order_book.asks[0].order_id, order_id)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 101), 12)
+
+    def test_increase_loses_priority(self):
+        order_id = self.order_ids[('AA', 'ask')]
+        _, order = self.order_book.amend_order(order_id, quantity=8)
+        self.assertEqual(order.order_id, order_id)
+        self.assertEqual(self.order_book.asks[0].dealer_or_broker_id, 'CC')
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 101), 18)
+
+    def test_price_change(self):
+        order_id = self.order_ids[('BB', 'ask')]
+        _, order = self.order_book.amend_order(order_id, price=101)
+        self.assertEqual(order.limit, 101)
+        self.assertEqual(self.order_book.get_worst_ask(), 101)
+        self.assertEqual(self.order_book.asks[-1].order_id, order_id)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 101), 20)
+
+        # moving the bid through the asks trades
+        order_id = self.order_ids[('AA', 'bid')]
+        trades, order = self.order_book.amend_order(order_id, price=102)
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]['buyer'], 'AA')
+        self.assertEqual(trades[0]['seller'], 'AA')
+        self.assertIsNone(order)
+        self.assertNotIn(order_id, self.order_book.orders)
+
+    def test_amend_to_zero_cancels(self):
+        order_id = self.order_ids[('CC', 'bid')]
+        trades, order = self.order_book.amend_order(order_id, quantity=0)
+        self.assertEqual(trades, [])
+        self.assertIsNone(order)
+        self.assertEqual(self.order_book.get_volume_at_price('bid', 99), 5)
+        with self.assertRaises(KeyError):
+            self.order_book.amend_order(order_id, quantity=1)
+
+    def test_quote_can_not_choose_order_id(self):
+        order_book = MatchingEngine()
+        orders = [order_book.match_order(dict(asdict(Quote(
+            type='limit', side='bid', quantity=5, price=90,
+            dealer_or_broker_id=broker)), order_id=7))[1]
+            for broker in ('XX', 'YY')]
+        self.assertNotEqual(orders[0].order_id, orders[1].order_id)
+        self.assertNotIn(7, [order.order_id for order in orders])
+
+        order_book.cancel_order(orders[0].order_id)
+        self.assertEqual(order_book.get_volume_at_price('bid', 90), 5)
+        self.assertNotIn('XX', order_book.participants)
+        self.assertEqual(list(order_book.participants['YY']),
+                         [orders[1].order_id])
+
+    def test_rejected_amend_keeps_order(self):
+        order_book = MatchingEngine(tick_size=0.5)
+        _, order = order_book.match_order(asdict(Quote(
+            type='limit', side='bid', quantity=5, price=10,
+            dealer_or_broker_id='AA')))
+        with self.assertRaises(AssertionError):
+            order_book.amend_order(order.order_id, price=10.3)
+        with self.assertRaises(ValueError):
+            order_book.amend_order(order.order_id, quantity=8, price='x')
+        self.assertIs(order_book.orders[order.order_id], order)
+        self.assertEqual((order.limit, order.quantity), (10, 5))
+        self.assertEqual(order_book.get_volume_at_price('bid', 10), 5)
+        self.assertIn(order.order_id, order_book.participants['AA'])
+
+        _, order = order_book.amend_order(order.order_id, price=10.5)
+        self.assertEqual(order_book.get_best_bid(), 10.5)
+
+
+class TestSelfTradePrevention(unittest.TestCase):
+    """ orders of the same dealer or broker do not trade
+    """
+    def book(self, self_trade_prevention):
+        order_book = MatchingEngine(
+            self_trade_prevention=self_trade_prevention)
+        order_book.match_order(quote('ask', 101, broker='AA'))
+        order_book.match_order(quote('ask', 101, broker='BB'))
+        return order_book
+
+    def test_none(self):
+        order_book = self.book(SelfTradePrevention.NONE)
+        trades, _ = order_book.match_order(quote('bid', 102, 7))
+        self.assertEqual([t['seller'] for t in trades], ['AA', 'BB'])
+
+    def test_cancel_newest(self):
+        order_book = self.book(SelfTradePrevention.CANCEL_NEWEST)
+        trades, order = order_book.match_order(quote('bid', 102, 7))
+        self.assertEqual(trades, [])
+        self.assertIsNone(order)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 10)
+        self.assertEqual(order_book.get_best_bid(), None)
+
+    def test_cancel_oldest(self):
+        order_book = self.book(SelfTradePrevention.CANCEL_OLDEST)
+        trades, order = order_book.match_order(quote('bid', 102, 7))
+        self.assertEqual([(t['seller'], t['quantity']) for t in trades],
+                         [('BB', 5)])
+        self.assertEqual(order.quantity, 2)
+        self.assertEqual(order_book.get_best_bid(), 102)
+        self.assertIsNone(order_book.get_best_ask())
+        self.assertEqual(list(order_book.participants['AA']),
+                         [order.order_id])
+
+    def test_decrement(self):
+        order_book = self.book(SelfTradePrevention.DECREMENT)
+        trades, order = order_book.match_order(quote('bid', 102, 3))
+        self.assertEqual(trades, [])
+        self.assertIsNone(order)
+        self.assertEqual(order_book.asks[0].quantity, 2)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 7)
+
+        trades, order = order_book.match_order(quote('bid', 102, 4))
+        self.assertEqual([(t['seller'], t['quantity']) for t in trades],
+                         [('BB', 2)])
+        self.assertIsNone(order)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 3)
+        self.assertNotIn('AA', order_book.participants)
+
+    def test_decrement_iceberg(self):
+        order_book = MatchingEngine(
+            self_trade_prevention=SelfTradePrevention.DECREMENT)
+        _, iceberg = order_book.match_order(dict(quote('ask', 101, 10),
+                                                 type='iceberg',
+                                                 display_quantity=3))
+        order_book.match_order(quote('ask', 101, broker='BB'))
+
+        trades, _ = order_book.match_order(quote('bid', 102, 3))
+        self.assertEqual(trades, [])
+        self.assertIn(iceberg.order_id, order_book.orders)
+        self.assertEqual((iceberg.quantity, iceberg.hidden_quantity), (3, 4))
+        # the reserve is shown at the back of the queue
+        self.assertEqual(order_book.asks[0].dealer_or_broker_id, 'BB')
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 8)
+
+    def test_fill_or_kill(self):
+        for self_trade_prevention in SelfTradePrevention:
+            order_book = self.book(self_trade_prevention)
+            trades, order = order_book.match_order(
+                dict(quote('bid', 102, 10), time_in_force='fok'))
+            self.assertIsNone(order)
+            if self_trade_prevention == SelfTradePrevention.NONE:
+                self.assertEqual(sum(t['quantity'] for t in trades), 10)
+            else:
+                self.assertEqual(trades, [])
+                self.assertEqual(order_book.get_volume_at_price('ask', 101),
+                                 10)
+
+            order_book = self.book(self_trade_prevention)
+            trades, _ = order_book.match_order(
+                dict(quote('bid', 102, 5, broker='CC'),
+                     time_in_force='fok'))
+            self.assertEqual([t['seller'] for t in trades], ['AA'])
+
+        # other volume ahead of the own order fills with cancel newest
+        order_book = MatchingEngine(
+            self_trade_prevention=SelfTradePrevention.CANCEL_NEWEST)
+        order_book.match_order(quote('ask', 101, broker='BB'))
+        order_book.match_order(quote('ask', 101, broker='AA'))
+        trades, _ = order_book.match_order(
+            dict(quote('bid', 102, 5), time_in_force='fok'))
+        self.assertEqual([t['seller'] for t in trades], ['BB'])
+
+    def test_cancel_participant(self):
+        order_book = self.book(SelfTradePrevention.NONE)
+        order_book.match_order(quote('bid', 99, broker='AA'))
+        order_book.match_order(quote('bid', 98, broker='BB'))
+        order_book.match_order(dict(quote('ask', 0), type='stop',
+                                    stop_price=97))
+        self.assertEqual(len(order_book.participants['AA']), 3)
+
+        cancelled = order_book.cancel_participant('AA')
+        self.assertEqual(len(cancelled), 3)
+        self.assertNotIn('AA', order_book.participants)
+        self.assertEqual(len(order_book.stops), 0)
+        self.assertEqual(order_book.get_best_bid(), 98)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 5)
+        self.assertEqual(order_book.cancel_participant('AA'), [])
+
+
+class TestBatch(unittest.TestCase):
+    """ batch submission of orders
+    """
+    def setUp(self):
+        script_dir = os.path.dirname(__file__)
+        with open(os.path.join(script_dir, 'orders_test2.txt')) as csvfile:
+            self.quotes = list(csv.DictReader(csvfile))
+        self.crossing = [asdict(Quote(type='limit', side='bid', quantity=7,
+                                      price=102, dealer_or_broker_id='EE')),
+                         asdict(Quote(type='market', side='ask', quantity=12,
+                                      dealer_or_broker_id='FF'))]
+
+    def check_book(self, order_book, trades):
+        self.assertEqual([(t['buyer'], t['seller'], t['quantity'])
+                          for t in trades],
+                         [('EE', 'AA', 5), ('EE', 'CC', 2), ('AA', 'FF', 5),
+                          ('CC', 'FF', 5), ('BB', 'FF', 2)])
+        self.assertEqual(len(order_book.bids), 2)
+        self.assertEqual(len(order_book.asks), 3)
+        self.assertEqual(order_book.get_volume_at_price('ask', 101), 8)
+
+    def test_match_orders(self):
+        order_book = MatchingEngine()
+        trades = order_book.match_orders(self.quotes + self.crossing)
+        self.check_book(order_book, trades)
+
+    def test_fast(self):
+        order_book = MatchingEngine()
+        trades = order_book.match_orders(iter(self.quotes + self.crossing),
+                                         fast=True)
+        self.check_book(order_book, trades)
+
+    def test_columns(self):
+        quotes = self.quotes + self.crossing
+        columns = {field: [quote[field] for quote in quotes]
+                   for field in ('type', 'side', 'quantity', 'price',
+                                 'dealer_or_broker_id')}
+        order_book = MatchingEngine()
+        trades = order_book.match_orders(columns, fast=True)
+        self.check_book(order_book, trades)
+
+    def test_unknown_type(self):
+        with self.assertRaises(KeyError):
+            MatchingEngine().match_orders([{'type': 'gtc'}], fast=True)
+
+
+class TestTickSize(unittest.TestCase):
+    """ prices in integer ticks
+    """
+    def setUp(self):
+        self.order_book = MatchingEngine(tick_size=0.01)
+
+    def test_levels(self):
+        self.order_book.match_order(quote('ask', 1.01))
+        self.order_book.match_order(quote('ask', 0.1 + 0.91))
+        self.order_book.match_order(quote('ask', '1.02'))
+        self.assertEqual(len(self.order_book.asks.levels), 2)
+        self.assertEqual(list(self.order_book.asks.levels), [101, 102])
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 1.01), 10)
+        self.assertEqual(self.order_book.get_best_ask(), 1.01)
+        self.assertEqual(self.order_book.asks.depth(),
+                         [(1.01, 10), (1.02, 5)])
+
+        trades, order = self.order_book.match_order(
+            quote('bid', 1.02, quantity=12, broker='BB'))
+        self.assertEqual([t['price'] for t in trades], [1.01, 1.01])
+        self.assertEqual(order.quantity, 2)
+        self.assertEqual(order.ticks, 102)
+
+    def test_off_grid(self):
+        with self.assertRaises(AssertionError):
+            self.order_book.match_order(quote('bid', 1.015))
+
+    def test_market_order(self):
+        self.order_book.match_order(quote('bid', 0.99))
+        trades, _ = self.order_book.match_order(
+            asdict(Quote(type='market', side='ask', quantity=2,
+                         dealer_or_broker_id='BB')))
+        self.assertEqual(trades[0]['price'], 0.99)
+        self.assertEqual(self.order_book.get_volume_at_price('bid', 0.99), 3)
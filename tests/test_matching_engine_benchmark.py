@@ -0,0 +1,36 @@
+import json
+import unittest
+from datetime import datetime
+from benchmarks.matching_engine_benchmark import cancel_heavy_flow, \
+    compare, poisson_order_flow, run_benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_reproducible_flow(self):
+        self.assertEqual(list(poisson_order_flow(50, seed=3)),
+                         list(poisson_order_flow(50, seed=3)))
+        timestamps = [quote['timestamp']
+                      for _, quote in poisson_order_flow(50, seed=3)]
+        self.assertTrue(all(isinstance(timestamp, datetime)
+                            for timestamp in timestamps))
+        self.assertEqual(timestamps, sorted(timestamps))
+        messages = list(cancel_heavy_flow(500, seed=3, min_resting=10))
+        self.assertTrue(any(kind == 'cancel' for kind, _ in messages))
+
+    def test_run_benchmark(self):
+        results = run_benchmark(orders=400, seed=2)
+        self.assertEqual(sorted(results['scenarios']),
+                         ['cancel_heavy', 'deep_book', 'market_sweep',
+                          'poisson'])
+        for result in results['scenarios'].values():
+            self.assertGreater(result['orders_per_second'], 0)
+            self.assertLessEqual(result['p50_latency_us'],
+                                 result['p99_latency_us'])
+
+        results = json.loads(json.dumps(results))
+        ratios = compare(results, results)
+        self.assertEqual(ratios['poisson']['orders_per_second'], 1.0)
+
+    def test_select_scenario(self):
+        results = run_benchmark(orders=100, names=['poisson'])
+        self.assertEqual(list(results['scenarios']), ['poisson'])
@@ -0,0 +1,111 @@
+import unittest
+from datetime import date
+from options.black_scholes import BlackScholesPricer
+from options.monte_carlo import (AsianPayoff, BarrierPayoff, BarrierType,
+                                 EuropeanPayoff, LookbackPayoff,
+                                 MonteCarloPricer, monte_carlo_price)
+from options.option_style import OptionStyle
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+
+
+MARKET = dict(spot=100.0, interest_rate=0.05, volatility=0.2,
+              time_to_maturity=1.0)
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_european(self):
+        for style in (OptionStyle.CALL, OptionStyle.PUT):
+            expected = BlackScholesPricer.calculate_price(int(style), 100.0,
+                                                          105.0, 1.0, 0.05,
+                                                          0.2)
+            result = monte_carlo_price(EuropeanPayoff(105.0, style),
+                                       steps=1, paths=50000,
+                                       control_variate=False, seed=1,
+                                       **MARKET)
+            self.assertLess(abs(result.price - expected),
+                            4 * result.standard_error)
+            self.assertEqual(result.paths, 50000)
+
+    def test_variance_reduction(self):
+        payoff = AsianPayoff(100.0)
+        plain = monte_carlo_price(payoff, steps=50, paths=20000,
+                                  antithetic=False, control_variate=False,
+                                  seed=3, **MARKET)
+        reduced = monte_carlo_price(payoff, steps=50, paths=20000, seed=3,
+                                    **MARKET)
+        self.assertLess(reduced.standard_error, plain.standard_error / 2)
+        self.assertLess(abs(reduced.price - plain.price),
+                        4 * plain.standard_error)
+        # averaging lowers the volatility, the asian is cheaper
+        european = BlackScholesPricer.calculate_price(1, 100.0, 100.0, 1.0,
+                                                      0.05, 0.2)
+        self.assertLess(reduced.price, european)
+
+    def test_reproducible(self):
+        payoff = LookbackPayoff(OptionStyle.CALL)
+        first = monte_carlo_price(payoff, steps=20, paths=9000,
+                                  block_size=2000, seed=7, **MARKET)
+        second = monte_carlo_price(payoff, steps=20, paths=9000,
+                                   block_size=2000, seed=7, **MARKET)
+        self.assertEqual(first, second)
+        self.assertEqual(first.paths, 9000)
+
+        pooled = monte_carlo_price(payoff, steps=20, paths=9000,
+                                   block_size=2000, seed=7, processes=2,
+                                   **MARKET)
+        self.assertAlmostEqual(pooled.price, first.price, places=10)
+        other = monte_carlo_price(payoff, steps=20, paths=9000,
+                                  block_size=2000, seed=8, **MARKET)
+        self.assertNotEqual(other.price, first.price)
+
+    def test_barrier_parity(self):
+        european = monte_carlo_price(EuropeanPayoff(100.0), steps=50,
+                                     paths=10000, control_variate=False,
+                                     seed=11, **MARKET)
+        for knock_out, knock_in in ((BarrierType.UP_AND_OUT,
+                                     BarrierType.UP_AND_IN),
+                                    (BarrierType.DOWN_AND_OUT,
+                                     BarrierType.DOWN_AND_IN)):
+            barrier = 120.0 if knock_out == BarrierType.UP_AND_OUT else 90.0
+            out = monte_carlo_price(BarrierPayoff(100.0, barrier, knock_out),
+                                    steps=50, paths=10000,
+                                    control_variate=False, seed=11, **MARKET)
+            into = monte_carlo_price(BarrierPayoff(100.0, barrier, knock_in),
+                                     steps=50, paths=10000,
+                                     control_variate=False, seed=11,
+                                     **MARKET)
+            self.assertGreater(out.price, 0)
+            self.assertGreater(into.price, 0)
+            self.assertAlmostEqual(out.price + into.price, european.price,
+                                   places=10)
+
+    def test_lookback(self):
+        floating = monte_carlo_price(LookbackPayoff(OptionStyle.PUT),
+                                     steps=50, paths=10000, seed=5, **MARKET)
+        fixed = monte_carlo_price(LookbackPayoff(OptionStyle.CALL, 100.0),
+                                  steps=50, paths=10000, seed=5, **MARKET)
+        european = BlackScholesPricer.calculate_price(1, 100.0, 100.0, 1.0,
+                                                      0.05, 0.2)
+        self.assertGreater(fixed.price, european)
+        self.assertGreater(floating.price, 0)
+
+    def test_pricer(self):
+        pricer = MonteCarloPricer(spot=100.0,
+                                  payoff=EuropeanPayoff(100.0),
+                                  discount_curve=Curve({0.001: 0.05,
+                                                        1: 0.05, 2: 0.05}),
+                                  volatility_surface=Surface(
+                                      [0.01, 1, 2], [95.0, 100.0, 105.0],
+                                      [[0.2, 0.2, 0.2]] * 3),
+                                  valuation_date=date(2019, 7, 23),
+                                  maturity_date=date(2020, 7, 23),
+                                  steps=1,
+                                  paths=20000,
+                                  seed=2)
+        expected = BlackScholesPricer.calculate_price(1, 100.0, 100.0, 1.0,
+                                                      0.05, 0.2)
+        result = pricer.simulate()
+        # the european control variate makes the estimate exact
+        self.assertAlmostEqual(result.price, expected, places=8)
+        self.assertEqual(pricer.price, result.price)
@@ -0,0 +1,19 @@
+import unittest
+import numpy as np
+from scipy.stats import norm
+from options.normal_distribution import cdf, cdf_array, pdf, pdf_array
+
+
+class TestNormalDistribution(unittest.TestCase):
+    def test_scalar(self):
+        for x in np.linspace(-10, 10, 101):
+            self.assertEqual(cdf(float(x)), norm.cdf(x))
+            self.assertAlmostEqual(pdf(float(x)), norm.pdf(x), places=15)
+        self.assertIsInstance(cdf(0.5), float)
+        self.assertEqual(cdf(0.0), 0.5)
+
+    def test_array(self):
+        x = np.linspace(-10, 10, 1001).reshape(7, 143)
+        np.testing.assert_array_equal(cdf_array(x), norm.cdf(x))
+        np.testing.assert_allclose(pdf_array(x), norm.pdf(x), rtol=1e-14)
+        self.assertEqual(cdf_array(x).shape, (7, 143))
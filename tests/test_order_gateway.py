@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from api.order_gateway import OrderGateway
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, gateway):
+        host, port = gateway.address
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def send(self, **message):
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+
+    async def receive(self):
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        return json.loads(line)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def order(side, price, quantity=5, broker='AA', **kwargs):
+    return dict(action='order', type='limit', side=side, price=price,
+                quantity=quantity, dealer_or_broker_id=broker, **kwargs)
+
+
+class TestOrderGateway(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.gateway = OrderGateway()
+        await self.gateway.start()
+
+    async def asyncTearDown(self):
+        await self.gateway.close()
+
+    async def test_order_and_fills(self):
+        seller = await Client.connect(self.gateway)
+        buyer = await Client.connect(self.gateway)
+        watcher = await Client.connect(self.gateway)
+        await watcher.send(action='subscribe', stream='trades')
+        await watcher.send(action='subscribe', stream='market_data')
+        snapshot = await watcher.receive()
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual(snapshot['asks'], [])
+
+        await seller.send(**order('ask', 101, broker='AA', request_id=1))
+        ack = await seller.receive()
+        self.assertEqual((ack['type'], ack['quantity'], ack['request_id']),
+                         ('ack', 5, 1))
+        resting_id = ack['order_id']
+        self.assertEqual(await watcher.receive(),
+                         {'type': 'level', 'sequence': 1, 'side': 'ask',
+                          'price': 101.0, 'volume': 5})
+
+        await buyer.send(**order('bid', 102, quantity=3, broker='BB'))
+        ack = await buyer.receive()
+        self.assertEqual(ack['quantity'], 0)
+        self.assertEqual(await buyer.receive(),
+                         {'type': 'fill', 'order_id': ack['order_id'],
+                          'price': 101.0, 'quantity': 3})
+        self.assertEqual(await seller.receive(),
+                         {'type': 'fill', 'order_id': resting_id,
+                          'price': 101.0, 'quantity': 3})
+        self.assertEqual((await watcher.receive())['volume'], 2)
+        self.assertEqual(await watcher.receive(),
+                         {'type': 'trade', 'price': 101.0, 'quantity': 3})
+
+        # only the owner can cancel
+        await buyer.send(action='cancel', order_id=resting_id, request_id=7)
+        reject = await buyer.receive()
+        self.assertEqual((reject['type'], reject['request_id']),
+                         ('reject', 7))
+        await seller.send(action='amend', order_id=resting_id, quantity=1)
+        self.assertEqual((await seller.receive())['quantity'], 1)
+        await seller.send(action='cancel', order_id=resting_id)
+        self.assertEqual((await seller.receive())['type'], 'ack')
+        self.assertEqual(self.gateway.engine.get_best_ask(), None)
+        self.assertEqual(self.gateway.owners, {})
+
+        await seller.send(action='unknown')
+        self.assertEqual((await seller.receive())['type'], 'reject')
+        seller.writer.write(b'not json\n')
+        self.assertEqual((await seller.receive())['type'], 'reject')
+
+        for client in (seller, buyer, watcher):
+            await client.close()
+
+    async def test_malformed_orders(self):
+        client = await Client.connect(self.gateway)
+        await client.send(**order(1, 101, request_id=1))
+        reject = await client.receive()
+        self.assertEqual((reject['type'], reject['request_id']),
+                         ('reject', 1))
+        self.assertIn('AttributeError', reject['error'])
+        client.writer.write(b'{"action": "order", "type": "limit", '
+                            b'"side": "bid", "price": 101, '
+                            b'"quantity": 1e400, "request_id": 2}\n')
+        reject = await client.receive()
+        self.assertEqual((reject['type'], reject['request_id']),
+                         ('reject', 2))
+
+        # the engine keeps serving
+        await client.send(**order('bid', 99, request_id=3))
+        ack = await client.receive()
+        self.assertEqual((ack['type'], ack['quantity'], ack['request_id']),
+                         ('ack', 5, 3))
+        self.assertFalse(self.gateway._engine_task.done())
+        self.assertEqual(list(self.gateway.owners), [ack['order_id']])
+        await client.close()
+
+    async def test_cancel_on_disconnect(self):
+        client = await Client.connect(self.gateway)
+        await client.send(**order('bid', 99))
+        await client.send(**order('bid', 98))
+        await client.receive()
+        await client.receive()
+        self.assertEqual(len(self.gateway.engine.orders), 2)
+
+        await client.close()
+        while self.gateway.sessions:
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(self.gateway.engine.orders), 0)
+        self.assertEqual(self.gateway.owners, {})
+
+    async def test_many_clients(self):
+        clients = await asyncio.gather(*(Client.connect(self.gateway)
+                                         for _ in range(200)))
+        await asyncio.gather(*(
+            client.send(**order('bid' if i % 2 else 'ask', 100,
+                                broker='C%d' % i))
+            for i, client in enumerate(clients)))
+        acks = await asyncio.gather(*(client.receive()
+                                      for client in clients))
+        self.assertEqual({ack['type'] for ack in acks}, {'ack'})
+        self.assertEqual(len({ack['order_id'] for ack in acks}), 200)
+        self.assertEqual(self.gateway.engine.get_volume_at_price('bid', 100),
+                         500)
+
+        for client in clients:
+            await client.close()
+
+
+class TestUnixSocket(unittest.IsolatedAsyncioTestCase):
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'gateway.sock')
+            async with OrderGateway() as gateway:
+                await gateway.start(path=path)
+                client = Client(*await asyncio.open_unix_connection(path))
+                await client.send(**order('ask', 101))
+                self.assertEqual((await client.receive())['quantity'], 5)
+                await client.close()
@@ -0,0 +1,182 @@
+import unittest
+from market.iceberg_order import IcebergOrder
+from market.order_factory import create_order
+from market.time_in_force import TimeInForce
+from orderbook.matching_engine import MatchingEngine
+from tests.quotes import quote
+
+
+class TestOrderTypes(unittest.TestCase):
+    def setUp(self):
+        self.order_book = MatchingEngine()
+        # orderbook
+        #    broker     limit   quantity     |    broker     limit   quantity
+        #        AA      99      5           |        AA      101         5
+        #        BB      98      5           |        BB      102         5
+        for broker, bid, ask in (('AA', 99, 101), ('BB', 98, 102)):
+            self.order_book.match_order(quote('bid', bid, broker=broker))
+            self.order_book.match_order(quote('ask', ask, broker=broker))
+
+    def test_factory(self):
+        order = create_order(quote('bid', 99, time_in_force='ioc'))
+        self.assertEqual(order.time_in_force, TimeInForce.IOC)
+        self.assertEqual(order['time_in_force'], 'ioc')
+        self.assertEqual(create_order(quote('bid', 99))['time_in_force'],
+                         'gtc')
+        with self.assertRaises(KeyError):
+            create_order(quote('bid', 99, time_in_force='day'))
+        with self.assertRaises(AssertionError):
+            create_order(quote('bid', order_type='stop'))
+        with self.assertRaises(AssertionError):
+            create_order(quote('bid', 99, order_type='iceberg'))
+
+    def test_immediate_or_cancel(self):
+        trades, order = self.order_book.match_order(
+            quote('bid', 103, quantity=12, broker='CC', time_in_force='ioc'))
+        self.assertEqual(sum(t.quantity for t in trades), 10)
+        self.assertIsNone(order)
+        self.assertEqual(len(self.order_book.bids), 2)
+        self.assertEqual(len(self.order_book.asks), 0)
+
+    def test_fill_or_kill(self):
+        trades, order = self.order_book.match_order(
+            quote('bid', 103, quantity=12, broker='CC', time_in_force='fok'))
+        self.assertEqual(trades, [])
+        self.assertIsNone(order)
+        self.assertEqual(len(self.order_book.asks), 2)
+
+        trades, order = self.order_book.match_order(
+            quote('ask', 97, quantity=10, broker='CC', time_in_force='fok'))
+        self.assertEqual([t.quantity for t in trades], [5, 5])
+        self.assertIsNone(order)
+        self.assertEqual(len(self.order_book.bids), 0)
+
+    def test_stop(self):
+        _, stop = self.order_book.match_order(
+            quote('bid', quantity=3, broker='CC', order_type='stop',
+                  stop_price=101))
+        self.assertIn(stop.order_id, self.order_book.stops)
+        self.assertEqual(len(self.order_book.bids), 2)
+
+        # a trade at 101 triggers the buy stop, it lifts the rest of 101
+        # and part of 102
+        trades, _ = self.order_book.match_order(
+            quote('bid', 101.5, quantity=4, broker='DD'))
+        self.assertEqual([(t['buyer'], t['price'], t.quantity)
+                          for t in trades],
+                         [('DD', 101, 4), ('CC', 101, 1), ('CC', 102, 2)])
+        self.assertEqual(len(self.order_book.stops), 0)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 102), 3)
+
+    def test_stop_limit_cascade_and_cancel(self):
+        _, first = self.order_book.match_order(
+            quote('ask', 97.5, quantity=5, broker='CC',
+                  order_type='stop_limit', stop_price=99))
+        _, second = self.order_book.match_order(
+            quote('ask', quantity=5, broker='DD', order_type='stop',
+                  stop_price=97))
+        _, third = self.order_book.match_order(
+            quote('ask', quantity=5, broker='EE', order_type='stop',
+                  stop_price=90))
+        self.assertEqual(len(self.order_book.stops), 3)
+        self.order_book.cancel_order(third.order_id)
+        self.assertNotIn(third.order_id, self.order_book.stops)
+
+        # selling at 99 triggers CC, which trades at 98 but leaves DD waiting
+        trades, _ = self.order_book.match_order(
+            quote('ask', 98.5, quantity=5, broker='FF'))
+        self.assertEqual([(t['seller'], t['price']) for t in trades],
+                         [('FF', 99), ('CC', 98)])
+        self.assertIn(second.order_id, self.order_book.stops)
+        self.assertNotIn(first.order_id, self.order_book.stops)
+        self.assertEqual(self.order_book.last_price, 98)
+
+    def test_off_grid_stop_limit_rejected(self):
+        order_book = MatchingEngine(tick_size=0.5)
+        order_book.match_order(quote('bid', 99, broker='AA'))
+        order_book.match_order(quote('ask', 100, broker='BB'))
+        with self.assertRaises(AssertionError):
+            order_book.match_order(quote('ask', 98.3, broker='CC',
+                                         order_type='stop_limit',
+                                         stop_price=99))
+        self.assertEqual(len(order_book.stops), 0)
+        self.assertNotIn('CC', order_book.participants)
+
+        # a trade at 99 later has nothing to trigger
+        trades, _ = order_book.match_order(quote('ask', 98.5, broker='DD'))
+        self.assertEqual([t.quantity for t in trades], [5])
+        self.assertIsNone(order_book.get_best_bid())
+
+    def test_stop_triggered_within_sweep(self):
+        order_book = MatchingEngine()
+        order_book.match_order(quote('ask', 102, quantity=1, broker='AA'))
+        order_book.match_order(quote('bid', 102.5, quantity=1, broker='BB'))
+        self.assertEqual(order_book.last_price, 102)
+
+        order_book.match_order(quote('bid', 98, broker='CC'))
+        _, stop = order_book.match_order(
+            quote('ask', quantity=2, broker='DD', order_type='stop',
+                  stop_price=101.5))
+        order_book.match_order(quote('ask', 101, broker='EE'))
+        order_book.match_order(quote('ask', 103, broker='EE'))
+
+        # the sweep ends at 103 but traded through the stop at 101
+        trades, _ = order_book.match_order(
+            quote('bid', 103.5, quantity=10, broker='FF'))
+        self.assertEqual([(t['seller'], t['price']) for t in trades],
+                         [('EE', 101), ('EE', 103), ('DD', 98)])
+        self.assertNotIn(stop.order_id, order_book.stops)
+        self.assertEqual(order_book.last_price, 98)
+
+    def test_stop_triggers_on_arrival(self):
+        self.order_book.match_order(quote('bid', 101.5, quantity=1))
+        trades, order = self.order_book.match_order(
+            quote('bid', quantity=2, broker='CC', order_type='stop',
+                  stop_price=100))
+        self.assertEqual([t.quantity for t in trades], [2])
+        self.assertIsNone(order)
+
+    def test_iceberg(self):
+        _, iceberg = self.order_book.match_order(
+            quote('ask', 100, quantity=10, broker='CC', order_type='iceberg',
+                  display_quantity=4))
+        self.assertIsInstance(iceberg, IcebergOrder)
+        self.assertEqual(iceberg.quantity, 4)
+        self.assertEqual(iceberg.hidden_quantity, 6)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 100), 4)
+
+        self.order_book.match_order(quote('ask', 100, quantity=1,
+                                          broker='DD'))
+        # the iceberg is refilled at the back of the queue after DD
+        trades, _ = self.order_book.match_order(
+            quote('bid', 100.5, quantity=7, broker='EE'))
+        self.assertEqual([(t['seller'], t.quantity) for t in trades],
+                         [('CC', 4), ('DD', 1), ('CC', 2)])
+        self.assertEqual(iceberg.quantity, 2)
+        self.assertEqual(iceberg.hidden_quantity, 2)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 100), 2)
+
+        self.order_book.cancel_order(iceberg.order_id)
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 100), 0)
+
+    def test_amend_iceberg(self):
+        _, iceberg = self.order_book.match_order(
+            quote('ask', 100, quantity=10, broker='CC', order_type='iceberg',
+                  display_quantity=3))
+        self.order_book.match_order(quote('ask', 100, quantity=1,
+                                          broker='DD'))
+
+        # a decrease comes out of the reserve and keeps priority
+        _, order = self.order_book.amend_order(iceberg.order_id, quantity=5)
+        self.assertIs(order, iceberg)
+        self.assertEqual((iceberg.quantity, iceberg.hidden_quantity), (3, 2))
+        _, order = self.order_book.amend_order(iceberg.order_id, quantity=2)
+        self.assertEqual((iceberg.quantity, iceberg.hidden_quantity), (2, 0))
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 100), 3)
+        self.assertEqual(self.order_book.asks[0].order_id, iceberg.order_id)
+
+        # an increase goes to the back of the queue with a new reserve
+        _, order = self.order_book.amend_order(iceberg.order_id, quantity=8)
+        self.assertEqual((iceberg.quantity, iceberg.hidden_quantity), (3, 5))
+        self.assertEqual(self.order_book.asks[0].dealer_or_broker_id, 'DD')
+        self.assertEqual(self.order_book.get_volume_at_price('ask', 100), 4)
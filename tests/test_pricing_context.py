@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+from unittest import mock
+import numpy as np
+from options.black_scholes import BlackScholesPricer
+from options.option_style import OptionStyle
+from options.pricing_context import PricingContext
+from term_structures.curve import Curve
+from term_structures.surface import Surface
+from utils.date.yearfrac import DayCntCnvEnum
+
+
+class TestPricingContext(unittest.TestCase):
+    def setUp(self):
+        self.curve = Curve({0.001: 0.01, 1: 0.05, 2: 0.1})
+        self.surface = Surface([0.01, 1, 2], [95.0, 100.0, 105.0],
+                               [[0.25, 0.25, 0.25],
+                                [0.25, 0.25, 0.25],
+                                [0.25, 0.25, 0.25]])
+        self.valuation_date = date(2019, 7, 23)
+        self.context = PricingContext(self.curve, self.surface,
+                                      self.valuation_date,
+                                      DayCntCnvEnum.basis_30_360_isda)
+
+    def test_same_price(self):
+        maturity = date(2020, 7, 23)
+        for style in (OptionStyle.CALL, OptionStyle.PUT):
+            contract = BlackScholesPricer(spot=50.0,
+                                          strike=100.0,
+                                          discount_curve=self.curve,
+                                          volatility_surface=self.surface,
+                                          valuation_date=self.valuation_date,
+                                          maturity_date=maturity,
+                                          style=style)
+            cached = BlackScholesPricer.from_context(self.context,
+                                                     spot=50.0,
+                                                     strike=100.0,
+                                                     maturity_date=maturity,
+                                                     style=style)
+            self.assertEqual(cached.price, contract.price)
+            self.assertEqual(cached.vega, contract.vega)
+            self.assertEqual(cached.greeks, contract.greeks)
+
+    def test_memoized(self):
+        maturity = date(2020, 7, 23)
+        with mock.patch.object(self.context.day_count_convention,
+                               'year_fraction',
+                               wraps=self.context.day_count_convention.
+                               year_fraction) as year_fraction, \
+                mock.patch.object(self.context, 'volatility_surface',
+                                  wraps=self.surface) as surface:
+            for spot in range(40, 60):
+                pricer = BlackScholesPricer.from_context(self.context,
+                                                         float(spot),
+                                                         100.0,
+                                                         maturity)
+                _ = pricer.price
+                _ = pricer.vega
+            self.assertEqual(year_fraction.call_count, 1)
+            self.assertEqual(surface.call_count, 1)
+
+    def test_market_data(self):
+        maturities = [date(2020, 7, 23), date(2021, 1, 23)] * 3
+        strikes = [95.0, 100.0, 105.0] * 2
+        times, rates, vols = self.context.market_data(maturities, strikes)
+        np.testing.assert_allclose(times, [1.0, 1.5] * 3)
+        self.assertEqual(rates[0], self.curve(1.0))
+        np.testing.assert_allclose(vols, 0.25)
+        prices = BlackScholesPricer.calculate_prices(1, 50.0, strikes, times,
+                                                     rates, vols)
+        self.assertEqual(prices.shape, (6,))
+
+    def test_invalidate(self):
+        maturity = date(2020, 7, 23)
+        self.assertAlmostEqual(self.context.interest_rate(maturity), 0.05)
+        self.assertAlmostEqual(self.context.volatility(maturity, 100.0), 0.25)
+
+        self.curve._curve[1] = 0.06     # pylint: disable=W0212
+        self.assertAlmostEqual(self.context.interest_rate(maturity), 0.05)
+        self.context.invalidate_curve()
+        self.assertAlmostEqual(self.context.interest_rate(maturity), 0.06)
+
+        self.context.invalidate_surface(Surface([0.01, 1, 2],
+                                                [95.0, 100.0, 105.0],
+                                                [[0.3, 0.3, 0.3]] * 3))
+        self.assertAlmostEqual(self.context.volatility(maturity, 100.0), 0.3)
+
+        # a new valuation date is a new key
+        self.context.valuation_date = date(2020, 1, 23)
+        self.assertAlmostEqual(self.context.time_to_maturity(maturity), 0.5)
+        self.context.invalidate()
+        self.assertAlmostEqual(self.context.time_to_maturity(maturity), 0.5)
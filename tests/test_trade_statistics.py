@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from orderbook.matching_engine import MatchingEngine
+from orderbook.trade_statistics import RollingStatistics, TradeStatistics
+from tests.quotes import quote
+
+
+class TestTradeStatistics(unittest.TestCase):
+    def test_session(self):
+        statistics = TradeStatistics()
+        self.assertIsNone(statistics.vwap)
+        for price, quantity in ((100, 5), (102, 10), (99, 5)):
+            statistics.update(price, quantity)
+        self.assertEqual(statistics.count, 3)
+        self.assertEqual(statistics.volume, 20)
+        self.assertAlmostEqual(statistics.vwap, 100.75)
+        self.assertEqual((statistics.high, statistics.low, statistics.last),
+                         (102, 99, 99))
+
+        statistics.reset()
+        self.assertEqual(statistics.count, 0)
+        self.assertIsNone(statistics.high)
+
+    def test_rolling(self):
+        statistics = RollingStatistics(window=10)
+        statistics.update(105, 1, time=0)
+        statistics.update(100, 2, time=4)
+        statistics.update(103, 1, time=8)
+        self.assertEqual(statistics.count, 3)
+        self.assertEqual((statistics.high, statistics.low), (105, 100))
+        self.assertAlmostEqual(statistics.vwap, 102)
+
+        # the trade at 0 leaves the window
+        statistics.update(101, 4, time=10)
+        self.assertEqual(statistics.count, 3)
+        self.assertEqual(statistics.volume, 7)
+        self.assertEqual((statistics.high, statistics.low), (103, 100))
+        self.assertAlmostEqual(statistics.vwap, (200 + 103 + 404) / 7)
+
+        statistics.expire(14)
+        self.assertEqual((statistics.count, statistics.high), (2, 103))
+        self.assertEqual(statistics.low, 101)
+        statistics.expire(100)
+        self.assertEqual(statistics.count, 0)
+        self.assertIsNone(statistics.vwap)
+        self.assertIsNone(statistics.high)
+        self.assertIsNone(statistics.last)
+
+
+class TestBoundedTape(unittest.TestCase):
+    def test_engine(self):
+        order_book = MatchingEngine(tape_capacity=3, statistics_window=60)
+        start = datetime(2024, 1, 2, 9, 0)
+        for i in range(10):
+            order_book.match_order(quote('ask', 100 + i, 2))
+        for i in range(5):
+            order_book.match_order(quote(
+                'bid', quantity=4, broker='BB', order_type='market',
+                timestamp=start + timedelta(seconds=30 * i)))
+
+        self.assertEqual(len(order_book.tape), 3)
+        self.assertEqual([t['price'] for t in order_book.tape],
+                         [107, 108, 109])
+        self.assertEqual(order_book.statistics.count, 10)
+        self.assertEqual(order_book.statistics.volume, 20)
+        self.assertAlmostEqual(order_book.statistics.vwap, 104.5)
+        self.assertEqual(order_book.statistics.low, 100)
+
+        # the last 60 seconds hold the trades at 90 and 120 seconds
+        rolling = order_book.rolling_statistics
+        self.assertEqual(rolling.count, 4)
+        self.assertEqual((rolling.low, rolling.high, rolling.last),
+                         (106, 109, 109))
+        self.assertAlmostEqual(rolling.vwap, 107.5)
+
+        with self.assertRaises(AssertionError):
+            MatchingEngine(lazy_trades=True, tape_capacity=3)
+
+    def test_triggered_stop(self):
+        order_book = MatchingEngine(statistics_window=10)
+        start = datetime(2024, 1, 2, 9, 0)
+
+        def at(seconds):
+            return start + timedelta(seconds=seconds)
+
+        # a buy stop entered at 0 triggers at 20 and trades at 100
+        order_book.match_order(quote('bid', quantity=1, order_type='stop',
+                                     stop_price=99, timestamp=at(0)))
+        for price in (99, 100):
+            order_book.match_order(quote('ask', price, 1, timestamp=at(20)))
+        order_book.match_order(quote('bid', 99.5, 1, timestamp=at(20)))
+        rolling = order_book.rolling_statistics
+        self.assertEqual(len(order_book.tape), 2)
+        self.assertEqual((rolling.low, rolling.high), (99, 100))
+
+        # both trades are still in the window 5 seconds later
+        order_book.match_order(quote('ask', 98, 1, timestamp=at(25)))
+        order_book.match_order(quote('bid', 98.5, 1, timestamp=at(25)))
+        self.assertEqual((rolling.count, rolling.low, rolling.high),
+                         (3, 98, 100))
+        rolling.expire(start.replace(tzinfo=timezone.utc).timestamp() + 30)
+        self.assertEqual((rolling.count, rolling.high), (1, 98))